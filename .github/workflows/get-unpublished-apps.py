@@ -1,22 +1,17 @@
 import requests
 import argparse
-import json
 from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from neurodesk import catalog  # noqa: E402
 
 def get_apps():
     """
     Get the list of apps from app.json file
     """
-    with open(Path("./neurodesk/apps.json"), "r") as json_file:
-        menu_entries = json.load(json_file)
-
-    app_list = []
-    for menu_name, menu_data in menu_entries.items():
-        for app_name, app_data in menu_data.get("apps", {}).items():
-            if app_data.get("exec") == "":
-                IMAGENAME_VERSION = app_name.split(" ")[0] + "_" + app_name.split(" ")[-1] + "_" + app_data.get("version")
-                app_list.append(IMAGENAME_VERSION)
-    return app_list
+    return [app.image for app in catalog.load(Path("./neurodesk/apps.json")) if app.exec == ""]
 
 def fetch_zenodo_dois(zenodo_token):
     """
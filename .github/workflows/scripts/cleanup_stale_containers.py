@@ -17,23 +17,10 @@ def run_command(cmd: List[str]) -> None:
 
 def generate_log(log_path: Path) -> None:
     print("[DEBUG] Generating log file from neurodesk/apps.json ...")
-    run_command(["python3", "neurodesk/write_log.py"])
+    run_command(["python3", "neurodesk/write_log.py", "--output", str(log_path)])
     if not log_path.exists():
         raise SystemExit(f"[ERROR] {log_path} was not created by neurodesk/write_log.py")
-
-
-def normalize_log(log_path: Path) -> None:
-    lines = []
-    for raw_line in log_path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
-        line = line.replace("[", "").replace("]", "").strip()
-        if line:
-            lines.append(line)
-
-    log_path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
-    print("[DEBUG] Normalized log file:")
+    print("[DEBUG] Log file:")
     print(log_path.read_text(encoding="utf-8"), end="")
 
 
@@ -356,7 +343,6 @@ def main() -> None:
     log_path = Path(args.log_path)
     if not args.skip_log_generation:
         generate_log(log_path)
-        normalize_log(log_path)
     expected_keys = load_expected_keys(log_path)
     if args.releases_dir:
         release_keys = load_release_keys(Path(args.releases_dir))
@@ -155,7 +155,7 @@ def _add_build_directories(build_menu_path: Path, names: list[str]) -> None:
     if not match:
         raise ValueError(f"{build_menu_path}: directory creation block was not found")
     additions = "".join(
-        f'        write_directory_file("{name}", directories_path, icon_dir)\n'
+        f'        write_directory_file("{name}", directories_path, icon_dir, manifest)\n'
         for name in names
     )
     updated_calls = match.group("calls") + additions
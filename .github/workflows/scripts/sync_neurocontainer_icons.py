@@ -7,11 +7,14 @@ import argparse
 import base64
 import binascii
 from dataclasses import dataclass, field
-import json
 from pathlib import Path
 import re
 import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from neurodesk import catalog  # noqa: E402
+
 
 DATA_URI_RE = re.compile(
     r"^data:image/(?P<media_type>[a-zA-Z0-9.+-]+);base64,(?P<payload>[A-Za-z0-9+/=\s]+)$"
@@ -47,30 +50,11 @@ def _parse_top_level_scalar(text: str, key: str) -> str | None:
     return value
 
 
-def _visibility_flag(data: dict, name: str, default: bool = True) -> bool:
-    return data.get(name, default) is not False
-
-
 def _load_app_icon_names(apps_json_path: Path) -> dict[str, set[str]]:
-    with apps_json_path.open() as apps_json_file:
-        apps = json.load(apps_json_file)
-
-    if not isinstance(apps, dict):
-        raise ValueError(f"{apps_json_path} must contain a JSON object")
-
-    app_icon_names = {}
-    for menu_name, menu_data in apps.items():
-        icon_names = {menu_name}
-        if isinstance(menu_data, dict):
-            default_show_in_menu = _visibility_flag(menu_data, "show_in_menu")
-            for app_name, app_data in (menu_data.get("apps") or {}).items():
-                if not isinstance(app_data, dict):
-                    app_data = {}
-                if _visibility_flag(app_data, "show_in_menu", default_show_in_menu):
-                    icon_names.add(app_name.split()[0])
-        app_icon_names[menu_name] = icon_names
-
-    return app_icon_names
+    return {
+        menu.name: {menu.name} | {app.name.split()[0] for app in menu.apps if app.show_in_menu}
+        for menu in catalog.load(apps_json_path).menus.values()
+    }
 
 
 def _decode_base64_payload(payload: str, source: Path) -> bytes:
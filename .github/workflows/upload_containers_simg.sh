@@ -289,18 +289,9 @@ main() {
     echo "checking if containers are built"
 
     # creating logfile with available containers
-    python3 neurodesk/write_log.py
+    python3 neurodesk/write_log.py --output log.txt
     pip3 install requests
 
-    # remove empty lines
-    sed -i '/^$/d' log.txt
-
-    # remove square brackets
-    sed -i 's/[][]//g' log.txt
-
-    # remove spaces around
-    sed -i -e 's/^[ \t]*//' -e 's/[ \t]*$//' log.txt
-
     echo "[debug] logfile:"
     cat log.txt
     echo "[debug] logfile is at: $PWD"
@@ -0,0 +1,165 @@
+"""Benchmark a full build_menu run against synthetic catalogs.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_build_menu
+    python -m benchmarks.bench_build_menu --sizes 1000 --rebuild --output bench.json
+
+Each size is built in a fresh interpreter, so peak RSS and the module-level
+caches belong to that build alone. The install directory is created on tmpfs
+(``/dev/shm``) when available so disk speed does not dominate the numbers.
+Synthetic tools have no icon of their own and use the fallback icon.
+"""
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import write_catalog
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+
+def default_tmpdir() -> str:
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return str(shm)
+    return tempfile.gettempdir()
+
+
+def snapshot(root: Path) -> Dict[str, Tuple[int, int, int]]:
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            st = os.lstat(path)
+            files[path] = (st.st_ino, st.st_mtime_ns, st.st_size)
+    return files
+
+
+def written_since(before: Dict[str, Tuple[int, int, int]], root: Path) -> Tuple[int, int]:
+    """Return the number and total size of files created or replaced since ``before``."""
+    after = snapshot(root)
+    changed = [stats for path, stats in after.items() if before.get(path) != stats]
+    return len(changed), sum(size for _, _, size in changed)
+
+
+def prepare_workdir(workdir: Path, apps: int) -> None:
+    """Mirror the repository layout build_menu reads, with a synthetic apps.json."""
+    package = workdir / "neurodesk"
+    package.mkdir()
+    for entry in (ROOT / "neurodesk").iterdir():
+        if entry.name != "apps.json":
+            (package / entry.name).symlink_to(entry)
+    write_catalog(package / "apps.json", apps)
+    (workdir / "config.ini").touch()
+
+
+def timed_build(installdir: Path, deskenv: str, jobs: int) -> dict:
+    from neurodesk.build_menu import build_menu
+
+    before = snapshot(installdir)
+    start = time.perf_counter()
+    build_menu(installdir, deskenv, "", jobs)
+    seconds = time.perf_counter() - start
+    files, size = written_since(before, installdir)
+    return {"seconds": round(seconds, 3), "files_written": files, "bytes_written": size}
+
+
+def measure(apps: int, deskenv: str, jobs: int, rebuild: bool, tmpdir: str) -> dict:
+    """Build a catalog of ``apps`` apps in this process and return its metrics."""
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="bench_build_menu.", dir=tmpdir) as tmp:
+        workdir = Path(tmp) / "work"
+        installdir = Path(tmp) / "install"
+        workdir.mkdir()
+        prepare_workdir(workdir, apps)
+        for name in ("icons", "desktop-directories"):
+            (installdir / name).mkdir(parents=True)
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            row = {"apps": apps, "deskenv": deskenv, "jobs": jobs}
+            row["build"] = timed_build(installdir, deskenv, jobs)
+            if rebuild:
+                row["rebuild"] = timed_build(installdir, deskenv, jobs)
+        finally:
+            os.chdir(cwd)
+    row["peak_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return row
+
+
+def run(sizes: List[int], deskenv: str, jobs: int, rebuild: bool, tmpdir: str) -> List[dict]:
+    results = []
+    for apps in sizes:
+        command = [
+            sys.executable, "-m", "benchmarks.bench_build_menu", "--single", str(apps),
+            "--deskenv", deskenv, "--jobs", str(jobs), "--tmpdir", tmpdir,
+        ]
+        if rebuild:
+            command.append("--rebuild")
+        output = subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def git_commit() -> Optional[str]:
+    if shutil.which("git") is None:
+        return None
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True)
+    return result.stdout.strip() or None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--deskenv", default="lxde")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--rebuild", action="store_true", help="Also time an unchanged second build.")
+    parser.add_argument("--tmpdir", default=default_tmpdir(), help="Where install directories are created.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file.")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        print(json.dumps(measure(args.single, args.deskenv, args.jobs, args.rebuild, args.tmpdir)))
+        return 0
+
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "tmpdir": args.tmpdir,
+        "results": run(args.sizes, args.deskenv, args.jobs, args.rebuild, args.tmpdir),
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'apps':>6} {'seconds':>8} {'files':>7} {'bytes':>10} {'rebuild s':>10} {'peak RSS MiB':>13}")
+    for row in report["results"]:
+        build = row["build"]
+        rebuild_seconds = row["rebuild"]["seconds"] if "rebuild" in row else ""
+        print(
+            f"{row['apps']:>6} {build['seconds']:>8.3f} {build['files_written']:>7}"
+            f" {build['bytes_written']:>10} {rebuild_seconds:>10} {row['peak_rss_kib'] / 1024:>13.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
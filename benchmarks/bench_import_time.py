@@ -0,0 +1,103 @@
+"""Measure the startup import time of ``python -m neurodesk`` against a budget.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --check --json
+
+Each run imports ``neurodesk.neurodesk`` in a fresh interpreter under
+``-X importtime`` and the median cumulative time is compared with
+``BUDGET_MS``. ``--check`` exits 1 when the budget is exceeded or when one of
+``LAZY_MODULES`` is imported at startup.
+"""
+import argparse
+import json
+from pathlib import Path
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MODULE = "neurodesk.neurodesk"
+
+# Median cumulative import time of neurodesk.neurodesk, in milliseconds. It
+# was about 45 ms on the machine the budget was recorded on (it was 265 ms
+# while distutils was imported at startup); the budget leaves room for
+# slower hosts.
+BUDGET_MS = 100
+
+# Modules only needed by some phases of a build; importing any of them when
+# the CLI starts is a regression.
+LAZY_MODULES = (
+    "distutils",
+    "xml.dom.minidom",
+    "xml.etree.ElementTree",
+    "concurrent.futures",
+    "cProfile",
+    "ctypes",
+)
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_times(module: str = MODULE) -> Dict[str, Tuple[int, int]]:
+    """Return ``{module: (self_us, cumulative_us)}`` for one fresh import of ``module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, check=True, stderr=subprocess.PIPE, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+
+def run(runs: int, top: int) -> dict:
+    samples = [import_times() for _ in range(runs)]
+    totals = [times[MODULE][1] / 1000 for times in samples]
+    median_ms = statistics.median(totals)
+    last = samples[-1]
+    slowest: List[Tuple[str, int]] = sorted(
+        ((name, self_us) for name, (self_us, _) in last.items()), key=lambda item: item[1], reverse=True)
+    return {
+        "module": MODULE,
+        "runs": runs,
+        "median_ms": round(median_ms, 2),
+        "min_ms": round(min(totals), 2),
+        "budget_ms": BUDGET_MS,
+        "within_budget": median_ms <= BUDGET_MS,
+        "lazy_modules_imported": sorted(name for name in LAZY_MODULES if name in last),
+        "slowest_self_us": [{"module": name, "self_us": us} for name, us in slowest[:top]],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules listed.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when the budget is not met.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{MODULE}: median {report['median_ms']} ms, min {report['min_ms']} ms"
+              f" over {args.runs} runs (budget {BUDGET_MS} ms)")
+        for row in report["slowest_self_us"]:
+            print(f"  {row['self_us']:>8} us  {row['module']}")
+        for name in report["lazy_modules_imported"]:
+            print(f"  imported at startup: {name}")
+
+    if args.check and (not report["within_budget"] or report["lazy_modules_imported"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
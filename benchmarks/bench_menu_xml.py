@@ -0,0 +1,135 @@
+"""Benchmark how menu XML assembly scales with the number of tools.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_menu_xml
+    python -m benchmarks.bench_menu_xml --sizes 200 500 1000 --compare-legacy
+
+Each synthetic tool gets an "All Applications" submenu plus one to three
+category submenus, mirroring what ``apps_from_json`` adds for apps.json.
+"""
+import argparse
+import json
+from pathlib import Path
+import re
+import tempfile
+import time
+from typing import List, Tuple
+import xml.etree.ElementTree as et
+from xml.dom import minidom
+
+from neurodesk.build_menu import MENU_DOCTYPE, MenuTree
+
+
+ROOT = Path(__file__).resolve().parents[1]
+MENU_TEMPLATE = ROOT / "neurodesk" / "neurodesk-applications.menu"
+DEFAULT_SIZES = [200, 500, 1000, 2000, 5000]
+
+
+def template_categories() -> List[str]:
+    menu = MenuTree(MENU_TEMPLATE)
+    return [slug for slug in menu.categories if slug not in ("Neurodesk", "all-applications")]
+
+
+def synthetic_submenus(tools: int) -> List[Tuple[str, str]]:
+    """Return ``(tool, category)`` pairs in the order apps_from_json adds them."""
+    categories = template_categories()
+    submenus = []
+    for index in range(tools):
+        name = f"tool{index:05d}"
+        submenus.append((name, "all applications"))
+        for offset in range(index % 3 + 1):
+            submenus.append((name, categories[(index + offset * 7) % len(categories)]))
+    return submenus
+
+
+def single_pass(submenus: List[Tuple[str, str]]) -> str:
+    menu = MenuTree(MENU_TEMPLATE)
+    for name, category in submenus:
+        menu.add_submenu(name, category, f"{name}.directory")
+    return menu.tostring()
+
+
+def legacy_per_submenu(submenus: List[Tuple[str, str]], menu_path: Path) -> str:
+    """The previous add_menu: re-read, parse, prettify and rewrite per submenu."""
+    menu_path.write_text(MENU_TEMPLATE.read_text())
+    for name, category in submenus:
+        s = re.sub(r"\s+(?=<)", "", menu_path.read_text())
+        root = et.fromstring(s)
+        category_name = category.lower().replace(" ", "-")
+        for menu_el in root.findall(".//Menu/Menu"):
+            if menu_el[2][0][0].text == category_name:
+                sub_el = et.SubElement(menu_el, "Menu")
+                et.SubElement(sub_el, "Name").text = name.capitalize()
+                et.SubElement(sub_el, "Directory").text = f"neurodesk/apps/{name}.directory"
+                and_el = et.SubElement(et.SubElement(sub_el, "Include"), "And")
+                et.SubElement(and_el, "Category").text = name
+                xmlstr = minidom.parseString(et.tostring(root)).toprettyxml(indent="\t")
+                menu_path.write_text(MENU_DOCTYPE + xmlstr[xmlstr.find("?>") + 3 :])
+                break
+    return menu_path.read_text()
+
+
+def timed(func, *args) -> Tuple[float, str]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run(sizes: List[int], compare_legacy: bool, legacy_limit: int) -> List[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        menu_path = Path(tmp) / "neurodesk-applications.menu"
+        for tools in sizes:
+            submenus = synthetic_submenus(tools)
+            seconds, output = timed(single_pass, submenus)
+            row = {
+                "tools": tools,
+                "submenus": len(submenus),
+                "single_pass_seconds": round(seconds, 4),
+                "single_pass_us_per_submenu": round(seconds / len(submenus) * 1e6, 1),
+            }
+            if compare_legacy and tools <= legacy_limit:
+                legacy_seconds, legacy_output = timed(legacy_per_submenu, submenus, menu_path)
+                if legacy_output != output:
+                    raise RuntimeError(f"legacy and single-pass output differ for {tools} tools")
+                row["legacy_seconds"] = round(legacy_seconds, 4)
+                row["speedup"] = round(legacy_seconds / seconds, 1)
+            results.append(row)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--compare-legacy",
+        action="store_true",
+        help="Also time the previous per-submenu rewrite (quadratic, slow).",
+    )
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=1000,
+        help="Largest tool count timed with --compare-legacy.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.compare_legacy, args.legacy_limit)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'tools':>6} {'submenus':>9} {'seconds':>9} {'us/submenu':>11} {'legacy s':>9} {'speedup':>8}")
+    for row in results:
+        print(
+            f"{row['tools']:>6} {row['submenus']:>9} {row['single_pass_seconds']:>9.4f}"
+            f" {row['single_pass_us_per_submenu']:>11.1f}"
+            f" {row.get('legacy_seconds', ''):>9} {row.get('speedup', ''):>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
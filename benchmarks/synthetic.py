@@ -0,0 +1,52 @@
+"""Synthetic apps.json catalogs for the benchmarks.
+
+Tools are modelled on the real ``neurodesk/apps.json``: synthetic tool ``i``
+copies the versions, GUI sub-apps (such as ``sumaGUI-afni``), categories and
+menu flags of real tool ``i`` modulo the number of real tools, under a unique
+name. Catalogs therefore keep the real category fan-out and versions per tool
+at any size.
+"""
+import json
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+APPS_JSON = ROOT / "neurodesk" / "apps.json"
+
+
+def _rename(app_name: str, tool: str, synthetic: str) -> str:
+    # "sumaGUI-afni 21.2.00" -> "sumaGUI-afni00012 21.2.00"
+    head, sep, version = app_name.rpartition(" ")
+    if not sep:
+        head, version = app_name, ""
+    if head.endswith(tool):
+        head = head[: len(head) - len(tool)] + synthetic
+    else:
+        head = f"{head}-{synthetic}"
+    return f"{head}{sep}{version}"
+
+
+def synthetic_catalog(apps: int, template: Path = APPS_JSON) -> Dict[str, dict]:
+    """Return a catalog with exactly ``apps`` app entries."""
+    with open(template, "r") as fh:
+        real = [(name, data) for name, data in json.load(fh).items() if data.get("apps")]
+    catalog: Dict[str, dict] = {}
+    remaining = apps
+    index = 0
+    while remaining > 0:
+        tool, data = real[index % len(real)]
+        synthetic = f"{tool}{index:05d}"
+        entry = {key: value for key, value in data.items() if key != "apps"}
+        entry["apps"] = {}
+        for app_name, app_data in list(data["apps"].items())[:remaining]:
+            entry["apps"][_rename(app_name, tool, synthetic)] = dict(app_data)
+        remaining -= len(entry["apps"])
+        catalog[synthetic] = entry
+        index += 1
+    return catalog
+
+
+def write_catalog(path: Path, apps: int) -> Path:
+    with open(path, "w") as fh:
+        json.dump(synthetic_catalog(apps), fh, indent=1)
+    return path
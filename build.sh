@@ -41,6 +41,10 @@ while [[ $# -gt 0 ]]
       runsudo=true
       shift # past argument
       ;;
+      --delta)
+      delta=true
+      shift # past argument
+      ;;
       --default)
       DEFAULT=YES
       shift # past argument
@@ -172,7 +176,6 @@ function build_apps () {
         mkdir -p $neurodesk_installdir/desktop-directories
         mkdir -p $neurodesk_installdir/icons
         cp $neurodesk_appmenu $neurodesk_installdir/local-applications.menu.template
-        cp neurodesk/icons/*.png $neurodesk_installdir/icons
 
         # Test Applications Directory
         echo "Checking appdir> $neurodesk_appdir"
@@ -233,6 +236,22 @@ function update_neurocommand_repo () {
         sudo_prefix=(sudo)
     fi
 
+    # Files replaced by a delta update are not local changes; restore them so
+    # that the autostash of the pull does not conflict with upstream.
+    local fetched=() fetched_output
+    if fetched_output="$(PYTHONPATH="${_base}${PYTHONPATH:+:$PYTHONPATH}" python3 -m neurodesk.update --repo "${_base}" --fetched)"; then
+        if [ -n "$fetched_output" ]; then
+            mapfile -t fetched <<< "$fetched_output"
+            mapfile -t fetched < <(git ls-files -- "${fetched[@]}")
+        fi
+    else
+        echo "[WARNING] Could not list the files of an earlier delta update; pulling without restoring them."
+    fi
+    if [ ${#fetched[@]} -gt 0 ]; then
+        echo "[INFO] Restoring files of an earlier delta update: ${fetched[*]}"
+        "${sudo_prefix[@]}" git checkout -- "${fetched[@]}"
+    fi
+
     if "${sudo_prefix[@]}" git rev-parse --abbrev-ref --symbolic-full-name '@{upstream}' >/dev/null 2>&1; then
         "${sudo_prefix[@]}" git pull --rebase --autostash
     else
@@ -243,6 +262,24 @@ function update_neurocommand_repo () {
     fi
 }
 
+# Fetch only apps.json and the helper scripts that changed (see
+# neurodesk/update.py); fall back to a full pull when that fails.
+function update_neurocommand_files () {
+    local sudo_prefix=()
+    if [ "$1" = "sudo" ]; then
+        sudo_prefix=(sudo)
+    fi
+
+    if [ "$delta" = true ]; then
+        if "${sudo_prefix[@]}" env PYTHONPATH="${_base}${PYTHONPATH:+:$PYTHONPATH}" \
+            python3 -m neurodesk.update --repo "${_base}"; then
+            return
+        fi
+        echo "[WARNING] Delta update failed; updating the whole repository."
+    fi
+    update_neurocommand_repo "$1"
+}
+
 if [ "$runsudo" = "true" ]; then
     runsudo="y"
 elif [ -w "$neurodesk_installdir" ]; then
@@ -261,14 +298,14 @@ case "$runsudo" in
     [nN][oO]|[nN])
         echo $neurodesk_installdir
         if [ "$update" = true ]; then
-            update_neurocommand_repo
+            update_neurocommand_files
         fi
         build_apps
         ;;
     *)  
         echo $neurodesk_installdir
         if [ "$update" = true ]; then
-            update_neurocommand_repo sudo
+            update_neurocommand_files sudo
         fi
         sudo bash -c "$(declare -f build_apps); build_apps"
         ;;
@@ -8,6 +8,12 @@ if [[ -z "$1" ]] || [ "$1" = "-h" ] || [ "$1" = "--help" ] ; then
     echo "  $0 --all       # Installs all available Neurodesk containers"
     echo "  $0 PATTERN     # Shows all containers that match PATTERN"
     echo "  $0 --PATTERN   # Installs all containers that match PATTERN"
+    echo "  $0 --json PATTERN [--category CATEGORY]"
+    echo "                 # Prints the containers that match PATTERN as JSON"
+    echo
+    echo "PATTERN matches tool names, versions, categories and the commands"
+    echo "a container provides; containers whose name matches are listed first."
+    echo "--PATTERN only installs the containers whose tool name contains PATTERN."
     echo
     echo "Examples:"
     echo "  $0 all"
@@ -19,13 +25,27 @@ fi
 
 _script="$(readlink -f ${BASH_SOURCE[0]})" ## who am i? ##
 _base="$(dirname $_script)" ## Delete last component from $_script ##
+
+search_containers() {
+    PYTHONPATH="${_base}${PYTHONPATH:+:$PYTHONPATH}" python3 -m neurodesk.search --log "${_base}/cvmfs/log.txt" "$@"
+}
+
+if [ "$1" = "--json" ]; then
+    search_containers --json "${@:2}"
+    exit
+fi
+
 source neurodesk/configparser.sh ${_base}/config.ini
 
 install="false"
 pattern=$1
+search_args=("$pattern")
 if [ ${1:0:2} = '--' ]; then
     install="true"
     pattern=${1:2}
+    # Only install containers named like the pattern, never everything that
+    # merely matches a category or an exposed command.
+    search_args=(--tool-only "$pattern")
 fi
 
 echo "--------------------------------------" 
@@ -40,16 +60,10 @@ fi
 echo "--------------------------------------"
 echo
 
-while read appsh; do
+while IFS=$'\t' read -r apptool appversion appdate appcat; do
 
-    arrayIn=(${appsh//_/ })
-    if [ "$pattern" != "all" ] && [[ ${arrayIn[0]} != *${pattern}* ]]; then
-        continue
-    fi
-    appcat=${arrayIn[@]:3}
-    appcat_clean=${appcat:11:-1}                                                                                                                                                           
-    apphead="| ${arrayIn[0]} | ${arrayIn[1]} | ${arrayIn[2]} | ${appcat_clean} | Run:"
-    appfetch="${neurodesk_installdir}/fetch_containers.sh ${arrayIn[0]} ${arrayIn[1]} ${arrayIn[2]}"
+    apphead="| ${apptool} | ${appversion} | ${appdate} | ${appcat} | Run:"
+    appfetch="${neurodesk_installdir}/fetch_containers.sh ${apptool} ${appversion} ${appdate}"
 
     eval $(echo printf '"%.0s-"' {1..${#apphead}})
     echo
@@ -63,7 +77,7 @@ while read appsh; do
         eval $appfetch
         err=$?
         if [ $err -eq 0 ] ; then
-            installmsg="| SUCCESS | ${arrayIn[0]} ${arrayIn[1]} ${arrayIn[2]} | $(date)"
+            installmsg="| SUCCESS | ${apptool} ${appversion} ${appdate} | $(date)"
             eval $(echo printf '"%.0s-"' {1..${#installmsg}})
             echo
             echo $installmsg
@@ -72,7 +86,7 @@ while read appsh; do
             echo
             echo
         else
-            installmsg="| FAILED | ${arrayIn[0]} ${arrayIn[1]} ${arrayIn[2]} | $(date)"
+            installmsg="| FAILED | ${apptool} ${appversion} ${appdate} | $(date)"
             eval $(echo printf '"%.0s-"' {1..${#installmsg}})
             echo
             echo $installmsg
@@ -85,4 +99,4 @@ while read appsh; do
         fi
     fi
 
-done < cvmfs/log.txt
+done < <(search_containers "${search_args[@]}")
@@ -1,10 +1,20 @@
 import argparse
+import gzip
 import json
 from pathlib import Path
+import sys
 
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it no .br copies are published
+    brotli = None
 
-def visibility_flag(data, name, default=True):
-    return data.get(name, default) is not False
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from neurodesk import catalog  # noqa: E402
+from neurodesk.fsutil import content_digest, replace_atomic  # noqa: E402
+
+MANIFEST = "manifest.json"
 
 
 def app_log_app_id(app_name):
@@ -19,16 +29,7 @@ def hidden_applist_app_ids(apps_json_path):
     if apps_json_path is None or not apps_json_path.exists():
         return set()
 
-    with apps_json_path.open() as json_file:
-        menu_entries = json.load(json_file)
-
-    hidden = set()
-    for menu_data in menu_entries.values():
-        default_show_in_applist = visibility_flag(menu_data, "show_in_applist")
-        for app_name, app_data in menu_data.get("apps", {}).items():
-            if not visibility_flag(app_data, "show_in_applist", default_show_in_applist):
-                hidden.add(app_log_app_id(app_name))
-    return hidden
+    return {app.app_id for app in catalog.load(apps_json_path) if not app.show_in_applist}
 
 
 def default_apps_json_path():
@@ -63,11 +64,71 @@ def process_text_to_json(log_path=Path("log.txt"), output_path=Path("applist.jso
         json.dump(my_dict, fp, sort_keys=True, indent=4)
 
 
+def write_if_changed(path, data):
+    """Atomically write ``data`` to ``path`` unless it already holds it; return whether it was written."""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    replace_atomic(path, data, mode=0o644)
+    return True
+
+
+def _encodings(name, data):
+    """Yield the ``(encoding, name, data)`` of the precompressed copies of ``data``."""
+    # mtime=0 keeps the gzip output, and so its hash, identical for identical input.
+    yield "gzip", f"{name}.gz", gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield "br", f"{name}.br", brotli.compress(data)
+
+
+def publish_artifacts(paths, manifest_path=None):
+    """Write the minified and precompressed copies of ``paths`` and a manifest of them.
+
+    A JSON file gets a minified copy next to it (``applist.min.json``), which
+    is compressed instead of the indented original; any other file is
+    compressed as is. Every copy is written only when its content changed,
+    so it keeps its modification time otherwise. The manifest, by default
+    ``manifest.json`` next to the first path, maps the name of every file to
+    its size and sha256 and, for the compressed copies, the file they
+    decompress to and their encoding, so that clients can skip downloading
+    a file whose hash they already have. Brotli copies are only written when
+    the ``brotli`` module is installed; stale ones are removed otherwise.
+    """
+    paths = [Path(path) for path in paths]
+    if manifest_path is None:
+        manifest_path = paths[0].parent / MANIFEST
+    manifest = {}
+
+    def record(path, data, **extra):
+        manifest[path.name] = {"sha256": content_digest(data), "size": len(data), **extra}
+
+    for path in paths:
+        data = path.read_bytes()
+        record(path, data)
+        if path.suffix == ".json":
+            path = path.with_name(f"{path.stem}.min.json")
+            data = json.dumps(json.loads(data), sort_keys=True, separators=(",", ":")).encode()
+            write_if_changed(path, data)
+            record(path, data)
+        for encoding, name, compressed in _encodings(path.name, data):
+            write_if_changed(path.with_name(name), compressed)
+            record(path.with_name(name), compressed, content=path.name, encoding=encoding)
+        if brotli is None and path.with_name(f"{path.name}.br").exists():
+            path.with_name(f"{path.name}.br").unlink()
+
+    write_if_changed(manifest_path, (json.dumps(manifest, sort_keys=True, indent=4) + "\n").encode())
+    return manifest
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Convert cvmfs/log.txt to applist.json.")
     parser.add_argument("--log-path", default=Path("log.txt"), type=Path)
     parser.add_argument("--output", default=Path("applist.json"), type=Path)
     parser.add_argument("--apps-json", default=default_apps_json_path(), type=Path)
+    parser.add_argument("--no-publish", dest="publish", action="store_false",
+                        help=f"do not write the minified and compressed copies and {MANIFEST}")
     args = parser.parse_args()
 
     process_text_to_json(
@@ -75,3 +136,5 @@ if __name__ == '__main__':
         output_path=args.output,
         apps_json_path=args.apps_json,
     )
+    if args.publish:
+        publish_artifacts([args.output, args.log_path])
@@ -12,6 +12,8 @@ from typing import Optional
 
 
 EXPOSED_COMMANDS_MARKER = "neurodesk-exposed-commands"
+# Reverse index of the exposed commands, below the containers directory.
+COMMAND_INDEX = "command-index.tsv"
 EXPOSED_COMMANDS_BLOCK = re.compile(
     rf"(?m)^(?:--|#) {re.escape(EXPOSED_COMMANDS_MARKER)}\r?\n"
     r"(?:"
@@ -130,6 +132,24 @@ def exposed_commands(commands_path: Path) -> tuple[str, ...]:
     return tuple(sorted(commands))
 
 
+def render_command_index(
+    containers_root: Path, latest_by_key: dict[tuple[str, str], ContainerEntry]
+) -> str:
+    """Return one ``<command>\t<tool>/<version>/<builddate> ...`` line per command.
+
+    Lines are sorted by command, so ``neurodesk.which`` can bisect the file
+    without reading it whole or visiting the container directories.
+    """
+    providers: dict[str, list[str]] = {}
+    for (tool, version), entry in sorted(latest_by_key.items()):
+        for command in exposed_commands(containers_root / entry.image / "commands.txt"):
+            providers.setdefault(command, []).append(f"{tool}/{version}/{entry.builddate}")
+    return "".join(
+        f"{command}\t{' '.join(provided_by)}\n"
+        for command, provided_by in sorted(providers.items())
+    )
+
+
 def lua_double_quoted(text: str) -> str:
     return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
 
@@ -357,6 +377,13 @@ def plan_module_reconciliation(repo_root: Path, log_path: Path) -> list[PlannedC
                     f"sync public {category}/{tool}/{filename} from canonical module",
                 )
 
+    add_change(
+        changes,
+        containers_root / COMMAND_INDEX,
+        render_command_index(containers_root, latest_by_key),
+        "update command index",
+    )
+
     return [changes[path] for path in sorted(changes)]
 
 
@@ -194,29 +194,37 @@ neurocommand_has_upstream_updates() {
     return 0
 }
 
+# Files the sync generates from apps.json and commits back to neurocommand.
+GENERATED_METADATA=("cvmfs/log.txt" "cvmfs/applist.json" "cvmfs/log.changes.jsonl")
+
+# Whether the complete sync recorded in state file $2 ("<journal seq> <commit>")
+# covers journal sequence $3 of checkout $1: the journal has no newer entry and
+# nothing but the metadata the sync commits itself changed in git since.
+sync_state_is_current() {
+    local repo_path="$1"
+    local state="$2"
+    local seq="$3"
+    local last_seq last_head
+    [[ -f "$state" ]] || return 1
+    read -r last_seq last_head < "$state"
+    [[ "$last_seq" == "$seq" && -n "$last_head" ]] || return 1
+    git -C "$repo_path" diff --quiet "$last_head" HEAD -- . "${GENERATED_METADATA[@]/#/:(exclude)}" 2>/dev/null
+}
+
 regenerate_metadata_from_apps_json() {
     local repo_path="$1"
-    local generated_log="$repo_path/log.txt"
     local target_log="$repo_path/cvmfs/log.txt"
+    local target_changes="$repo_path/cvmfs/log.changes.jsonl"
     local target_applist="$repo_path/cvmfs/applist.json"
 
     echo "[INFO] Regenerating CVMFS metadata from neurodesk/apps.json."
 
-    rm -f "$generated_log"
-
-    if ! (cd "$repo_path" && python3 neurodesk/write_log.py); then
+    # write_log.py leaves $target_log untouched when it is already current.
+    if ! (cd "$repo_path" && python3 neurodesk/write_log.py --output "$target_log" --changes "$target_changes"); then
         echo "[ERROR] Failed to generate log.txt from neurodesk/apps.json."
         exit 2
     fi
 
-    # Keep the same formatting conventions as the container upload pipeline.
-    sed -i '/^$/d' "$generated_log"
-    sed -i 's/[][]//g' "$generated_log"
-    sed -i -e 's/^[ \t]*//' -e 's/[ \t]*$//' "$generated_log"
-
-    mv -f "$generated_log" "$target_log"
-    echo "[INFO] Updated $target_log"
-
     if ! python3 "$repo_path/cvmfs/json_gen.py" \
         --log-path "$target_log" \
         --output "$target_applist" \
@@ -246,9 +254,17 @@ git_pull_rebase_non_interactive() {
 
 commit_generated_metadata_to_github_if_changed() {
     local repo_path="$1"
-    local generated_rel_paths=("cvmfs/log.txt" "cvmfs/applist.json")
+    local generated_rel_paths=()
+    local path
 
-    if git -C "$repo_path" diff --quiet -- "${generated_rel_paths[@]}"; then
+    # The change journal only exists once write_log.py has recorded a change.
+    for path in "${GENERATED_METADATA[@]}"; do
+        if [[ -e "$repo_path/$path" ]]; then
+            generated_rel_paths+=("$path")
+        fi
+    done
+
+    if [[ -z "$(git -C "$repo_path" status --porcelain -- "${generated_rel_paths[@]}")" ]]; then
         echo "[INFO] No generated metadata changes; skipping git commit/push."
         return 0
     fi
@@ -309,6 +325,29 @@ if ! git_pull_rebase_non_interactive "$NEUROCOMMAND_LOCAL_REPO"; then
     echo "[WARNING] Continuing with local checkout because pull --rebase failed."
 fi
 regenerate_metadata_from_apps_json "$NEUROCOMMAND_LOCAL_REPO"
+
+# The journal sequence and neurocommand commit of the last sync that completed
+# without errors. When the journal has no newer entry and only the generated
+# metadata changed in git since, no module or container changes are pending;
+# otherwise the journal says which images were removed since.
+SYNC_STATE="$HOME/.neurodesk-sync-state"
+SYNC_SEQ="$(PYTHONPATH="$NEUROCOMMAND_LOCAL_REPO" python3 -m neurodesk.log_changes --last-seq)"
+SYNC_MARK="$SYNC_SEQ $(git -C "$NEUROCOMMAND_LOCAL_REPO" rev-parse HEAD)"
+SYNC_INCOMPLETE=0
+LOG_UNCHANGED=0
+LOG_DELTA=0
+LOG_CHANGES=""
+if [[ -f "$SYNC_STATE" && -z "${SYNC_FULL:-}" ]]; then
+    read -r LAST_SYNC_SEQ _ < "$SYNC_STATE"
+    if sync_state_is_current "$NEUROCOMMAND_LOCAL_REPO" "$SYNC_STATE" "$SYNC_SEQ"; then
+        echo "[INFO] log.txt and neurocommand are unchanged since the last complete sync."
+        LOG_UNCHANGED=1
+    elif LOG_CHANGES="$(PYTHONPATH="$NEUROCOMMAND_LOCAL_REPO" python3 -m neurodesk.log_changes --after "$LAST_SYNC_SEQ")"; then
+        echo "[INFO] log.txt changes since the last complete sync:"
+        echo "${LOG_CHANGES:-none}"
+        LOG_DELTA=1
+    fi
+fi
 cd cvmfs
 
 # check if there is enough free space - otherwise don't do anything:
@@ -348,6 +387,7 @@ do
         # this publisher before opening a transaction or downloading the SIF.
         if ! "$NEUROCOMMAND_LOCAL_REPO/cvmfs/ensure_binfmt.sh" "$IMAGENAME_BUILDDATE"; then
             echo "[ERROR] Cannot deploy $IMAGENAME_BUILDDATE without working QEMU/binfmt support."
+            SYNC_INCOMPLETE=1
             continue
         fi
 
@@ -358,6 +398,7 @@ do
         if ! cd /cvmfs/neurodesk.ardc.edu.au/containers/; then
             echo "[ERROR] Cannot enter the CVMFS containers directory. Aborting transaction."
             abort_cvmfs_transaction neurodesk.ardc.edu.au
+            SYNC_INCOMPLETE=1
             continue
         fi
 
@@ -374,6 +415,7 @@ do
            ! cp -a "$NEUROCOMMAND_LOCAL_REPO/neurodesk/transparent-singularity/." "$IMAGENAME_BUILDDATE/"; then
             echo "[ERROR] Failed to stage transparent-singularity for $IMAGENAME_BUILDDATE. Aborting transaction."
             abort_cvmfs_transaction neurodesk.ardc.edu.au
+            SYNC_INCOMPLETE=1
             continue
         fi
 
@@ -382,6 +424,7 @@ do
             if ! cd "$IMAGENAME_BUILDDATE"; then
                 echo "[ERROR] Cannot enter container directory: $IMAGENAME_BUILDDATE. Aborting transaction."
                 abort_cvmfs_transaction neurodesk.ardc.edu.au
+                SYNC_INCOMPLETE=1
                 continue
             fi
             export SINGULARITY_BINDPATH=/cvmfs
@@ -402,6 +445,7 @@ do
         if [ $retVal -ne 0 ]; then
             echo "Error in Transparent singularity. Check the log. Aborting!"
             abort_cvmfs_transaction neurodesk.ardc.edu.au
+            SYNC_INCOMPLETE=1
         else
             publish_cvmfs_transaction neurodesk.ardc.edu.au "added $IMAGENAME_BUILDDATE"
         fi
@@ -423,7 +467,9 @@ do
 done < "$NEUROCOMMAND_LOCAL_REPO/cvmfs/log.txt"
 
 echo "[INFO] Checking that module files point to the latest kept container builds."
-if python3 "$NEUROCOMMAND_LOCAL_REPO/cvmfs/reconcile_module_files.py" \
+if [[ $LOG_UNCHANGED -eq 1 ]]; then
+    RECONCILE_STATUS=0
+elif python3 "$NEUROCOMMAND_LOCAL_REPO/cvmfs/reconcile_module_files.py" \
     --repo-root /cvmfs/neurodesk.ardc.edu.au \
     --log "$NEUROCOMMAND_LOCAL_REPO/cvmfs/log.txt" \
     --check; then
@@ -455,7 +501,22 @@ fi
 CONTAINERS_ROOT="/cvmfs/neurodesk.ardc.edu.au/containers"
 STALE_IMAGES=()
 
-for CONTAINER_PATH in "$CONTAINERS_ROOT"/*; do
+# After a complete sync only the images removed from log.txt since can be
+# stale; otherwise every container directory is checked.
+if [[ $LOG_UNCHANGED -eq 1 ]]; then
+    STALE_CANDIDATES=()
+elif [[ $LOG_DELTA -eq 1 ]]; then
+    STALE_CANDIDATES=()
+    while read -r CHANGE_KIND CHANGE_IMAGE; do
+        if [[ "$CHANGE_KIND" == "removed" ]]; then
+            STALE_CANDIDATES+=("$CONTAINERS_ROOT/$CHANGE_IMAGE")
+        fi
+    done <<< "$LOG_CHANGES"
+else
+    STALE_CANDIDATES=("$CONTAINERS_ROOT"/*)
+fi
+
+for CONTAINER_PATH in "${STALE_CANDIDATES[@]}"; do
     [[ -d "$CONTAINER_PATH" ]] || continue
     CONTAINER_NAME="$(basename "$CONTAINER_PATH")"
 
@@ -578,6 +639,13 @@ fi
 
 commit_generated_metadata_to_github_if_changed "$NEUROCOMMAND_LOCAL_REPO"
 
+if [[ $SYNC_INCOMPLETE -eq 0 ]]; then
+    echo "$SYNC_MARK" > "$SYNC_STATE"
+else
+    echo "[INFO] Some containers were not synced; the next run checks everything again."
+    rm -f "$SYNC_STATE"
+fi
+
 echo "[INFO] Deleting lockfile: $LOCKFILE"
 sudo rm -rf "$LOCKFILE"
 mv ~/cronjob.log ~/cronjob_previous_run.log
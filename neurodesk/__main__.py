@@ -1,2 +1,8 @@
+import sys
+
+if sys.argv[1:2] == ["which"]:
+    from neurodesk import which
+    sys.exit(which.main(sys.argv[2:]))
+
 from neurodesk import neurodesk
 neurodesk.main()
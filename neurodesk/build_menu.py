@@ -1,20 +1,40 @@
 """Generate the menu items."""
+from collections import Counter
+from contextlib import nullcontext
 import configparser
+import io
 import json
 import os
-import sys
 from pathlib import Path
+import pwd
 import re
-from typing import Callable, List, Optional, Text, TextIO
-import xml.etree.ElementTree as et
-from xml.dom import minidom
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, List, Optional, Sequence, Text, TextIO, Tuple
 import shutil
 import shlex
+import stat
 import logging
-import distutils.dir_util
+import threading
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime, by the code that parses the menu.
+    import xml.etree.ElementTree as et
+
+from neurodesk import catalog as app_catalog
+from neurodesk import profiling
+from neurodesk.catalog import visibility_flag
+from neurodesk.fsutil import atomic_tmp_path, content_digest, file_digest, replace_atomic
+from neurodesk.generations import Generations, STAGED_PATHS
+
+# XML and thread pool modules are imported where they are used, so
+# that `python -m neurodesk --deskenv cli` does not pay for them at startup
+# (see benchmarks/bench_import_time.py).
 
 APP_MENU_KWARGS = {"version", "exec", "terminal", "apptainer_args"}
 
+# How build_menu treats files of the previous build that are no longer
+# backed by apps.json: delete them, keep them, or only list them.
+PRUNE_MODES = ("yes", "no", "dry-run")
+
 # MIME types claimed by document-editing executables, keyed by the app's exec
 # name. Entries here get a MimeType= declaration and a %F field code in their
 # .desktop file so file managers can open documents with them via double-click.
@@ -77,8 +97,251 @@ def _restore_mode(path: Path, existed_before: bool, was_recreated: bool, previou
         os.chmod(path, previous_mode)
 
 
-def writefile_with_mode(path: Path, writer: Callable[[TextIO], None], mode: Optional[int] = None) -> None:
-    """Write file content with fallback for non-writable existing files."""
+# Serialises writers of the same output path (icons shared by several apps)
+# while emit_apps runs concurrently; the locks are dropped when it returns.
+_path_locks: Optional[Dict[str, threading.Lock]] = None
+_path_locks_guard = threading.Lock()
+
+
+def _path_lock(path: Path) -> ContextManager:
+    with _path_locks_guard:
+        if _path_locks is None:
+            return nullcontext()
+        return _path_locks.setdefault(str(path), threading.Lock())
+
+
+
+class BuildManifest:
+    """Content hashes of the files written by build_menu, keyed by install path.
+
+    The manifest from the previous build is loaded from ``installdir`` so that
+    files whose rendered content, size and mtime are unchanged are not
+    rewritten. Every path seen during the current build is recorded and saved
+    back once the build finishes.
+
+    With a ``stage`` directory, the :data:`STAGED_PATHS` are written below it
+    instead of the install (see :meth:`target`); the manifest stays keyed by
+    the install paths that generated files refer to.
+
+    With ``check`` nothing is written: the writers compare the rendered
+    content with the files on disk and :meth:`plan` collects the files that a
+    build would add, change or remove in :attr:`pending`.
+    """
+
+    FILENAME = ".build-manifest.json"
+
+    def __init__(self, installdir: Path, stage: Optional[Path] = None, check: bool = False):
+        self.installdir = installdir
+        self.stage = stage
+        self.check = check
+        self.path = installdir/self.FILENAME
+        self.previous = self._load()
+        self.current: Dict[str, dict] = {}
+        self.pending: Dict[str, dict] = {}
+        self.written = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable build manifest {self.path}: {e}")
+            return {}
+        files = data.get("files") if isinstance(data, dict) else None
+        return files if isinstance(files, dict) else {}
+
+    def key(self, path: Path) -> str:
+        try:
+            return Path(path).relative_to(self.installdir).as_posix()
+        except ValueError:
+            return str(path)
+
+    def target(self, path: Path) -> Path:
+        """Return the path that is written for install path ``path``."""
+        if self.stage is None:
+            return path
+        key = self.key(path)
+        if key.split("/", 1)[0] in STAGED_PATHS:
+            return self.stage/key
+        return path
+
+    def unchanged(self, path: Path, digest: str) -> bool:
+        """Return whether ``path`` still holds the content recorded as ``digest``.
+
+        Paths already written earlier in this build (icons and directory files
+        shared by several apps) are checked against that write first.
+        """
+        key = self.key(path)
+        entry = self.current.get(key) or self.previous.get(key)
+        if not entry or entry.get("sha256") != digest:
+            return False
+        try:
+            st = os.stat(self.target(path))
+        except OSError:
+            return False
+        return st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns")
+
+    def record(self, path: Path, digest: str, written: bool) -> None:
+        st = os.stat(self.target(path))
+        with self._lock:
+            self.current[self.key(path)] = {
+                "sha256": digest,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+            if written:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+    def plan(self, path: Path, digest: str, size: int, same: Optional[bool] = None) -> None:
+        """Record, in check mode, that ``path`` would be written with content ``digest``.
+
+        Unless ``same`` says otherwise, the file on disk is unchanged when it
+        holds the same content.
+        """
+        target = self.target(path)
+        try:
+            st = os.lstat(target)
+        except FileNotFoundError:
+            st = None
+        if same is None:
+            same = st is not None and stat.S_ISREG(st.st_mode) and st.st_size == size and file_digest(target) == digest
+        if same:
+            self.record(path, digest, written=False)
+            return
+        with self._lock:
+            self.current[self.key(path)] = {"sha256": digest, "size": size}
+            self.written += 1
+        self.add_pending(path, "change" if st is not None else "add", size)
+
+    def add_pending(self, path: Path, action: Text, size: int) -> None:
+        with self._lock:
+            self.pending[self.key(path)] = {"action": action, "bytes": size}
+
+    def summary(self) -> dict:
+        """Return the files and bytes :attr:`pending` by action, in the format of ``--check``."""
+        actions = ("add", "change", "remove")
+        paths = {action: sorted(key for key, entry in self.pending.items() if entry["action"] == action)
+                 for action in actions}
+        return {
+            "changed": bool(self.pending),
+            "files": {action: len(paths[action]) for action in actions},
+            "bytes": {action: sum(self.pending[key]["bytes"] for key in paths[action]) for action in actions},
+            "paths": paths,
+        }
+
+    def orphans(self) -> List[Path]:
+        """Return the files of the previous build that this build did not write."""
+        return [
+            self.installdir/key
+            for key in sorted(self.previous)
+            if key not in self.current and not Path(key).is_absolute() and ".." not in Path(key).parts
+        ]
+
+    def keep_orphans(self) -> None:
+        """Keep the previous build's orphans owned so a later build can prune them."""
+        for path in self.orphans():
+            key = self.key(path)
+            self.current[key] = self.previous[key]
+
+    def prune(self, dry_run: bool = False) -> Tuple[int, int]:
+        """Delete orphaned files and return the number of files and bytes reclaimed.
+
+        Files modified since they were recorded are no longer considered
+        owned and are kept. Bytes are counted once per inode and only when all
+        of its links are removed, so unlinking an icon whose store object is
+        still in use reclaims nothing. With ``dry_run`` the orphans are only
+        listed and stay in the manifest.
+        """
+        candidates = self._prune_candidates()
+        links = Counter((st.st_dev, st.st_ino) for _, st in candidates)
+        reclaimed = 0
+        for path, st in candidates:
+            inode = (st.st_dev, st.st_ino)
+            if stat.S_ISREG(st.st_mode) and links[inode] >= st.st_nlink:
+                reclaimed += st.st_size
+                links[inode] = 0
+            if dry_run:
+                logging.info(f"Would remove orphan {path}")
+            else:
+                self.target(path).unlink(missing_ok=True)
+
+        if dry_run:
+            self.keep_orphans()
+            logging.info(f"Would remove {len(candidates)} orphaned file(s), reclaiming {reclaimed} bytes")
+        else:
+            logging.info(f"Removed {len(candidates)} orphaned file(s), reclaimed {reclaimed} bytes")
+        return len(candidates), reclaimed
+
+    def _prune_candidates(self) -> List[Tuple[Path, os.stat_result]]:
+        candidates = []
+        for path in self.orphans():
+            entry = self.previous[self.key(path)]
+            try:
+                st = os.lstat(self.target(path))
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(st.st_mode) and (
+                st.st_size != entry.get("size") or st.st_mtime_ns != entry.get("mtime_ns")
+            ):
+                logging.warning(f"Keeping modified orphan {path}")
+                continue
+            candidates.append((path, st))
+        return candidates
+
+    def plan_prune(self) -> None:
+        """Record, in check mode, the orphans that :meth:`prune` would remove."""
+        for path, st in self._prune_candidates():
+            self.add_pending(path, "remove", st.st_size if stat.S_ISREG(st.st_mode) else 0)
+
+    def save(self) -> None:
+        data = json.dumps({"version": 1, "files": self.current}, indent=1, sort_keys=True)
+        replace_atomic(self.target(self.path), (data + "\n").encode(), mode=0o644)
+        logging.info(f"Build manifest: {self.written} file(s) written, {self.skipped} unchanged")
+
+
+def writefile_with_mode(
+    path: Path,
+    writer: Callable[[TextIO], None],
+    mode: Optional[int] = None,
+    manifest: Optional[BuildManifest] = None,
+) -> None:
+    """Write file content with fallback for non-writable existing files.
+
+    With a ``manifest`` the content is rendered in memory first and the write
+    is skipped when it matches what the previous build left on disk.
+    """
+    with _path_lock(path):
+        _writefile_with_mode(path, writer, mode, manifest)
+
+
+def _writefile_with_mode(
+    path: Path,
+    writer: Callable[[TextIO], None],
+    mode: Optional[int],
+    manifest: Optional[BuildManifest],
+) -> None:
+    if manifest is not None:
+        buffer = io.StringIO()
+        writer(buffer)
+        content = buffer.getvalue()
+        digest = content_digest(content.encode())
+        if manifest.unchanged(path, digest):
+            manifest.record(path, digest, written=False)
+            return
+        if manifest.check:
+            manifest.plan(path, digest, len(content.encode()))
+            return
+        if manifest.target(path) != path:
+            replace_atomic(manifest.target(path), content.encode(), mode)
+            manifest.record(path, digest, written=True)
+            return
+        writer = lambda fh: fh.write(content)
     path_existed = path.exists()
     previous_mode = _stat_mode(path)
     was_recreated = False
@@ -95,10 +358,41 @@ def writefile_with_mode(path: Path, writer: Callable[[TextIO], None], mode: Opti
     if mode is not None:
         chmod_if_new(path, mode, path_existed)
     _restore_mode(path, path_existed, was_recreated, previous_mode)
+    if manifest is not None:
+        manifest.record(path, digest, written=True)
 
 
-def copyfile_with_mode(src: Path, dest: Path, mode: Optional[int] = None) -> None:
+def copyfile_with_mode(
+    src: Path,
+    dest: Path,
+    mode: Optional[int] = None,
+    manifest: Optional[BuildManifest] = None,
+) -> None:
     """Copy a file and optionally chmod only when destination is newly created."""
+    with _path_lock(dest):
+        _copyfile_with_mode(src, dest, mode, manifest)
+
+
+def _copyfile_with_mode(
+    src: Path,
+    dest: Path,
+    mode: Optional[int],
+    manifest: Optional[BuildManifest],
+) -> None:
+    if manifest is not None:
+        with open(src, "rb") as fh:
+            data = fh.read()
+        digest = content_digest(data)
+        if manifest.unchanged(dest, digest):
+            manifest.record(dest, digest, written=False)
+            return
+        if manifest.check:
+            manifest.plan(dest, digest, len(data))
+            return
+        if manifest.target(dest) != dest:
+            replace_atomic(manifest.target(dest), data, mode)
+            manifest.record(dest, digest, written=True)
+            return
     dest_existed = dest.exists()
     previous_mode = _stat_mode(dest)
     was_recreated = False
@@ -115,9 +409,174 @@ def copyfile_with_mode(src: Path, dest: Path, mode: Optional[int] = None) -> Non
     if mode is not None:
         chmod_if_new(dest, mode, dest_existed)
     _restore_mode(dest, dest_existed, was_recreated, previous_mode)
+    if manifest is not None:
+        manifest.record(dest, digest, written=True)
+
+
+# Icons are stored once per content hash in this directory below ``icons``;
+# the named icons referenced by desktop entries are links to these objects.
+ICON_STORE = ".store"
+
+
+def _copy_atomic(src: Path, dest: Path) -> None:
+    tmp = atomic_tmp_path(dest)
+    try:
+        shutil.copyfile(src, tmp)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, dest)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _copy2_atomic(src: Path, dest: Path) -> None:
+    tmp = atomic_tmp_path(dest)
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def sync_tree(
+    src: Path, dest: Path, checksum: bool = False, manifest: Optional[BuildManifest] = None
+) -> Tuple[int, int]:
+    """Make ``dest`` a copy of the tree ``src``, copying only what changed.
+
+    Files are compared by size and mtime, or by size and content hash with
+    ``checksum``. Changed files are replaced atomically and keep the mode and
+    mtime of ``src``, as ``distutils.dir_util.copy_tree`` did, so scripts
+    copied from the install with ``cp -u`` are still refreshed. Entries of
+    ``dest`` that no longer exist in ``src`` are removed. Returns the number
+    of files copied and of entries removed. With a checking ``manifest``
+    nothing is changed; the copies and removals are planned in it.
+    """
+    check = manifest is not None and manifest.check
+    copied = removed = 0
+    if dest.is_symlink() or (dest.exists() and not dest.is_dir()):
+        if not check:
+            dest.unlink()
+        else:
+            manifest.add_pending(dest, "remove", 0)
+            for dirpath, _, filenames in os.walk(src):
+                for filename in filenames:
+                    path = Path(dirpath, filename)
+                    manifest.add_pending(dest/path.relative_to(src), "add", path.stat().st_size)
+                    copied += 1
+            return copied, removed + 1
+    if not check:
+        dest.mkdir(exist_ok=True)
+    src_entries = {entry.name: entry for entry in os.scandir(src)}
+    for entry in (os.scandir(dest) if dest.is_dir() else ()):
+        src_entry = src_entries.get(entry.name)
+        is_dir = entry.is_dir(follow_symlinks=False)
+        if src_entry is not None and is_dir == src_entry.is_dir():
+            continue
+        if check:
+            manifest.add_pending(Path(entry.path), "remove", 0 if is_dir else entry.stat(follow_symlinks=False).st_size)
+        elif is_dir:
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+        removed += 1
+
+    for name, entry in sorted(src_entries.items()):
+        target = dest/name
+        if entry.is_dir():
+            sub_copied, sub_removed = sync_tree(Path(entry.path), target, checksum, manifest)
+            copied += sub_copied
+            removed += sub_removed
+            continue
+        src_st = entry.stat()
+        try:
+            dest_st = os.lstat(target)
+        except FileNotFoundError:
+            dest_st = None
+        if dest_st is None or not stat.S_ISREG(dest_st.st_mode) or dest_st.st_size != src_st.st_size or (
+            file_digest(Path(entry.path)) != file_digest(target) if checksum
+            else dest_st.st_mtime_ns != src_st.st_mtime_ns
+        ):
+            if check:
+                manifest.add_pending(target, "change" if dest_st is not None else "add", src_st.st_size)
+            else:
+                _copy2_atomic(Path(entry.path), target)
+            copied += 1
+        elif stat.S_IMODE(dest_st.st_mode) != stat.S_IMODE(src_st.st_mode):
+            if check:
+                manifest.add_pending(target, "change", 0)
+            else:
+                os.chmod(target, stat.S_IMODE(src_st.st_mode))
+    return copied, removed
+
+
+def _target(path: Path, manifest: Optional[BuildManifest]) -> Path:
+    return manifest.target(path) if manifest is not None else path
+
+
+def _mkdir(path: Path, manifest: Optional[BuildManifest]) -> None:
+    if manifest is None or not manifest.check:
+        _target(path, manifest).mkdir(exist_ok=True)
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """Atomically make ``dest`` a hard link, symlink or copy of ``src``."""
+    tmp = atomic_tmp_path(dest)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        try:
+            os.symlink(os.path.relpath(src, dest.parent), tmp)
+        except OSError:
+            _copy_atomic(src, dest)
+            return
+    try:
+        os.replace(tmp, dest)
+    except OSError:
+        tmp.unlink()
+        raise
+
+
+def install_icon(icon_src: Path, icon_path: Path, manifest: Optional[BuildManifest] = None) -> None:
+    """Install ``icon_src`` as ``icon_path`` through the shared icon store.
+
+    The icon content is written at most once to ``icons/.store/<sha256>.png``
+    and ``icon_path`` is a hard link to that object, so icons shared by many
+    apps (including the ``neurodesk.png`` fallback) take the space of one.
+    Where hard links are not possible a relative symlink is used, and a plain
+    copy across filesystems.
+    """
+    digest = file_digest(icon_src)
+    store_path = icon_path.parent/ICON_STORE/f"{digest}{icon_path.suffix}"
+    store_target = _target(store_path, manifest)
+    icon_target = _target(icon_path, manifest)
+    check = manifest is not None and manifest.check
+    with _path_lock(store_path):
+        store_written = not store_target.exists()
+        if store_written and not check:
+            store_target.parent.mkdir(exist_ok=True)
+            _copy_atomic(icon_src, store_target)
+    if store_written and check:
+        manifest.plan(store_path, digest, icon_src.stat().st_size, same=False)
+    elif manifest is not None:
+        manifest.record(store_path, digest, written=store_written)
+
+    with _path_lock(icon_path):
+        try:
+            linked = os.path.samefile(icon_target, store_target)
+        except OSError:
+            linked = False
+        written = not linked and not (manifest is not None and manifest.unchanged(icon_path, digest))
+        if written and check:
+            manifest.plan(icon_path, digest, icon_src.stat().st_size)
+            return
+        if written:
+            _link_or_copy(store_target, icon_target)
+        if manifest is not None:
+            manifest.record(icon_path, digest, written=written)
 
 
-def write_directory_file(name, file_dir, icon_dir):
+def write_directory_file(name, file_dir, icon_dir, manifest: Optional[BuildManifest] = None):
     logging.info(f"Adding submenu for '{name}'")
     file_path = file_dir/f"{name.lower().replace(' ', '-')}.directory"
     icon_path = icon_dir/f"{name.lower().split()[0]}.png"
@@ -125,11 +584,11 @@ def write_directory_file(name, file_dir, icon_dir):
         icon_path = icon_dir/f"aedapt.png"
     icon_src = (Path(__file__).parent/'icons'/icon_path.name)
     try:
-        copyfile_with_mode(icon_src, icon_path)
+        install_icon(icon_src, icon_path, manifest)
     except FileNotFoundError:
         logging.warning(f'{icon_src} not found')
         icon_src = (Path(__file__).parent/'icons/neurodesk.png')
-        copyfile_with_mode(icon_src, icon_path)
+        install_icon(icon_src, icon_path, manifest)
 
     # Generate `.directory` file
     entry = configparser.ConfigParser()
@@ -140,62 +599,221 @@ def write_directory_file(name, file_dir, icon_dir):
         "Icon": icon_path,
         "Type": "Directory",
     }
-    file_dir.mkdir(exist_ok=True)
+    _mkdir(file_dir, manifest)
     def _write_directory(directory_file):
         entry.write(directory_file, space_around_delimiters=False)
-    writefile_with_mode(file_path, _write_directory, mode=0o644)
+    writefile_with_mode(file_path, _write_directory, mode=0o644, manifest=manifest)
     return file_path
 
 
-def add_menu(installdir: Path, name: Text, category: Text) -> None:
+MENU_DOCTYPE = (
+    '<!DOCTYPE Menu PUBLIC "-//freedesktop//DTD Menu 1.0//EN"\n '
+    '"http://www.freedesktop.org/standards/menu-spec/1.0/menu.dtd">\n\n'
+)
+
+
+class MenuTree:
+    """In-memory ``neurodesk-applications.menu`` that is serialised once.
+
+    Submenus are appended to the parsed template as apps.json is walked and
+    the whole tree is pretty-printed and written in a single pass by
+    :meth:`write`, instead of re-reading and rewriting the file per submenu.
+    The template is only parsed once a submenu is added, so a build without
+    menu entries (CLI mode) writes it back verbatim without loading the XML
+    modules.
+    """
+
+    def __init__(self, template: Path):
+        with open(template, "r") as xml_file:
+            self.source = xml_file.read()
+        self.changed = False
+        self._root = None
+        self._categories = None
+
+    @property
+    def root(self):
+        if self._root is None:
+            import xml.etree.ElementTree as et
+            self._root = et.fromstring(re.sub(r"\s+(?=<)", "", self.source))
+        return self._root
+
+    @property
+    def categories(self) -> Dict[Text, "et.Element"]:
+        """Category slug -> menu element, first match in document order."""
+        if self._categories is None:
+            self._categories = {}
+            for menu_el in self.root.findall(".//Menu/Menu"):
+                self._categories.setdefault(menu_el[2][0][0].text, menu_el)
+        return self._categories
+
+    def add_submenu(self, name: Text, category: Text, directory_file: Text) -> None:
+        """Add submenu ``name`` below the menu of ``category`` if it exists."""
+        import xml.etree.ElementTree as et
+        category_name = f'{category.lower().replace(" ", "-")}'
+        menu_el = self.categories.get(category_name)
+        if menu_el is None:
+            return
+        sub_el = et.SubElement(menu_el, "Menu")
+        name_el = et.SubElement(sub_el, "Name")
+        name_el.text = name.capitalize()
+        dir_el = et.SubElement(sub_el, "Directory")
+        dir_el.text = f'neurodesk/apps/{directory_file}'
+        include_el = et.SubElement(sub_el, "Include")
+        and_el = et.SubElement(include_el, "And")
+        cat_el = et.SubElement(and_el, "Category")
+        cat_el.text = name.replace(" ", "-")
+        self.changed = True
+
+    def tostring(self) -> Text:
+        if not self.changed:
+            return self.source
+        import xml.etree.ElementTree as et
+        from xml.dom import minidom
+        xmlstr = minidom.parseString(et.tostring(self.root)).toprettyxml(indent="\t")
+        return MENU_DOCTYPE + xmlstr[xmlstr.find("?>") + 3 :]
+
+    def write(self, menu_path: Path, manifest: Optional[BuildManifest] = None) -> None:
+        content = self.tostring()
+        def _write_menu(f):
+            f.write(content)
+        writefile_with_mode(menu_path, _write_menu, mode=0o644, manifest=manifest)
+
+
+def add_menu(
+    menu: MenuTree,
+    installdir: Path,
+    name: Text,
+    category: Text,
+    manifest: Optional[BuildManifest] = None,
+) -> None:
     """Add a submenu to 'Neurodesk' menu.
 
     Parameters
     ----------
+    menu : MenuTree
+        The in-memory menu the submenu is added to.
     name : Text
         The name of the submenu.
+    category : Text
+        The category menu the submenu is placed in.
     """
 
     # Generate `.directory` file
     file_dir = installdir/"desktop-directories/apps"
     icon_dir = installdir/f"icons"
-    file_path = write_directory_file(name, file_dir, icon_dir)
+    file_path = write_directory_file(name, file_dir, icon_dir, manifest)
 
-    # Add entry to `.menu` file
-    menu_path = installdir/"neurodesk-applications.menu"
-    with open(menu_path, "r") as xml_file:
-        s = xml_file.read()
-    s = re.sub(r"\s+(?=<)", "", s)
-    root = et.fromstring(s)
-    category_name = f'{category.lower().replace(" ", "-")}'
-    for menu_el in root.findall(".//Menu/Menu"):
-        if menu_el[2][0][0].text == category_name:
-        # menu_el = root.findall("./Menu/Menu")[0]
-            sub_el = et.SubElement(menu_el, "Menu")
-            name_el = et.SubElement(sub_el, "Name")
-            name_el.text = name.capitalize()
-            dir_el = et.SubElement(sub_el, "Directory")
-            dir_el.text = f'neurodesk/apps/{file_path.name}'
-            include_el = et.SubElement(sub_el, "Include")
-            and_el = et.SubElement(include_el, "And")
-            cat_el = et.SubElement(and_el, "Category")
-            cat_el.text = name.replace(" ", "-")
-            cat_el.text = f"{cat_el.text}"
-            xmlstr = minidom.parseString(et.tostring(root)).toprettyxml(indent="\t")
-            def _write_menu(f):
-                f.write('<!DOCTYPE Menu PUBLIC "-//freedesktop//DTD Menu 1.0//EN"\n ')
-                f.write('"http://www.freedesktop.org/standards/menu-spec/1.0/menu.dtd">\n\n')
-                f.write(xmlstr[xmlstr.find("?>") + 3 :])
-            writefile_with_mode(menu_path, _write_menu, mode=0o644)
-            break
+    # Add entry to the in-memory `.menu` tree
+    menu.add_submenu(name, category, file_path.name)
 
 
 def app_menu_data(app_data: dict) -> dict:
     return {key: app_data[key] for key in APP_MENU_KWARGS if key in app_data}
 
 
-def visibility_flag(data: dict, name: Text, default: bool = True) -> bool:
-    return data.get(name, default) is not False
+def parse_menu_versions(value: Optional[Text]) -> Optional[int]:
+    """Parse a ``menu_versions`` setting: ``all``, ``latest`` or a count.
+
+    Returns the number of versions per tool that get desktop entries, or
+    ``None`` when every version is shown.
+    """
+    value = (value or "all").strip().lower()
+    if value == "all":
+        return None
+    if value == "latest":
+        return 1
+    try:
+        count = int(value)
+    except ValueError:
+        raise ValueError(f"menu_versions must be 'all', 'latest' or a positive number, not {value!r}")
+    if count < 1:
+        raise ValueError(f"menu_versions must be 'all', 'latest' or a positive number, not {value!r}")
+    return count
+
+
+def _version_key(version: Text) -> Tuple:
+    return tuple(
+        (1, int(part), "") if part.isdigit() else (0, 0, part)
+        for part in re.findall(r"\d+|[^\d.]+", version)
+    )
+
+
+def newest_versions(apps: Dict[Text, dict], count: int) -> set:
+    """Return the ``count`` newest container versions among ``apps``.
+
+    Versions are ranked by version number, comparing numeric parts as
+    numbers, with the builddate only breaking ties: old versions are rebuilt
+    regularly, so the builddate alone does not identify the newest release.
+    GUI sub-apps such as ``sumaGUI-afni 24.3.00`` follow their container
+    version.
+    """
+    builddates: Dict[Text, Text] = {}
+    for app_name, app_data in apps.items():
+        version = app_name.rsplit(" ", 1)[1] if " " in app_name else ""
+        builddate = str(app_data.get("version", ""))
+        builddates[version] = max(builddates.get(version, ""), builddate)
+    ranked = sorted(
+        builddates,
+        key=lambda version: (_version_key(version), builddates[version]),
+        reverse=True,
+    )
+    return set(ranked[:count])
+
+
+# How launchers are installed in bin/: one generated script per app, or
+# symlinks to neurodesk-dispatch.sh, which looks up their command in a table.
+LAUNCHER_MODES = ("scripts", "dispatcher")
+DISPATCHER = "neurodesk-dispatch.sh"
+LAUNCHER_TABLE = ".neurodesk-launchers.tsv"
+
+
+class LauncherTable:
+    """Commands of the launchers that run through ``neurodesk-dispatch.sh``.
+
+    Each launcher is a symlink to the dispatcher, which finds its command by
+    the launcher's name in ``bin/.neurodesk-launchers.tsv``. The command is
+    the line the generated script would have held, so launching behaves the
+    same; a build writes one table instead of a script per app.
+    """
+
+    def __init__(self, installdir: Path):
+        self.installdir = installdir
+        self.dispatcher = installdir/DISPATCHER
+        self.commands: Dict[Text, Text] = {}
+        self._lock = threading.Lock()
+
+    def add(self, sh_path: Path, command: Text, manifest: Optional[BuildManifest] = None) -> bool:
+        """Link ``sh_path`` to the dispatcher and list ``command`` for it.
+
+        Returns ``False`` for a command that does not fit on one line of the
+        table; its launcher is then written as a script.
+        """
+        if any(char in command for char in "\t\r\n"):
+            return False
+        with self._lock:
+            self.commands[sh_path.name] = command
+        link_target = str(self.dispatcher)
+        target = _target(sh_path, manifest)
+        digest = content_digest(f"-> {link_target}".encode())
+        with _path_lock(sh_path):
+            written = not (target.is_symlink() and os.readlink(target) == link_target)
+            if written and manifest is not None and manifest.check:
+                manifest.plan(sh_path, digest, 0, same=False)
+                return True
+            if written:
+                tmp = atomic_tmp_path(target)
+                os.symlink(link_target, tmp)
+                os.replace(tmp, target)
+            if manifest is not None:
+                manifest.record(sh_path, digest, written=written)
+        return True
+
+    def write(self, manifest: Optional[BuildManifest] = None) -> None:
+        def _write_table(fh):
+            for name in sorted(self.commands):
+                fh.write(f"{name}\t{self.commands[name]}\n")
+        writefile_with_mode(
+            self.installdir/"bin"/LAUNCHER_TABLE, _write_table, mode=0o644, manifest=manifest)
 
 
 class NeurodeskApp:
@@ -210,6 +828,8 @@ class NeurodeskApp:
         exec: Text = "",
         terminal: bool = True,
         apptainer_args: Optional[List[str]] = None,
+        manifest: Optional[BuildManifest] = None,
+        launchers: Optional[LauncherTable] = None,
         ):
         """Add an application to the menu.
 
@@ -225,6 +845,10 @@ class NeurodeskApp:
             The category defining the menu in which the application must be added.
         terminal : bool
             If set to ``True``, a terminal is opened when launching the application.
+        manifest : BuildManifest, optional
+            Manifest used to skip rewriting files whose content is unchanged.
+        launchers : LauncherTable, optional
+            Table of the dispatcher that runs the launcher, instead of a script.
         """
         self.deskenv = deskenv
         self.installdir = installdir
@@ -235,6 +859,11 @@ class NeurodeskApp:
         self.exec = exec #TODO change exec to safer variable name
         self.terminal = terminal
         self.apptainer_args = apptainer_args or []
+        self.manifest = manifest
+        self.launchers = launchers
+        # Set by add_app_menu; read when the applications caches are written.
+        self.desktop_path: Optional[Path] = None
+        self.desktop_entry: Dict[Text, Text] = {}
 
     def app_names(self):
         self.basename = f"{self.name.lower().replace(' ', '-').replace('.', '_')}"
@@ -251,40 +880,51 @@ class NeurodeskApp:
                 self.container_name, self.container_version = self.name, ""
             self.exec_name = self.name
 
+    def launcher_command(self, sh_exec: Text = "") -> Text:
+        """Return the command line run by the launcher of this app."""
+        if sh_exec:
+            if self.sh_prefix.strip():
+                # A prefix such as the overlay helper's ``exec`` only wraps the
+                # first simple command of a compound one like ``cd …; bash …``.
+                sh_exec = f"bash -c {shlex.quote(sh_exec)}"
+            return f"{self.sh_prefix} {sh_exec}"
+        launcher_args = [
+            shlex.quote(str(self.installdir/"fetch_and_run.sh")),
+            shlex.quote(self.container_name),
+            shlex.quote(self.container_version),
+        ]
+        if self.exec:
+            launcher_args.extend(
+                shlex.quote(argument) for argument in shlex.split(self.exec)
+            )
+        launcher_args.append('"$@"')
+        return f"{self.sh_prefix} {' '.join(launcher_args)}"
+
     def add_app_sh(self, sh_exec=""):
-        fetch_and_run_sh = self.installdir/"fetch_and_run.sh"
         self.bin_path = self.installdir/"bin"
-        self.bin_path.mkdir(exist_ok=True)
+        _mkdir(self.bin_path, self.manifest)
         self.sh_path = self.bin_path/f"{self.basename}.sh"
+        command = self.launcher_command(sh_exec)
+        if self.launchers is not None and self.launchers.add(self.sh_path, command, self.manifest):
+            return
+        sh_target = _target(self.sh_path, self.manifest)
+        if sh_target.is_symlink() and not (self.manifest is not None and self.manifest.check):
+            # Dispatcher link of an earlier build; do not write through it.
+            sh_target.unlink()
         def _write_app_sh(self_sh_file):
             self_sh_file.write("#!/usr/bin/env bash\n")
-            self_sh_file.write(f"{self.sh_prefix} ")
-            if sh_exec:
-                self_sh_file.write(f"{sh_exec}")
-            else:
-                launcher_args = [
-                    shlex.quote(str(fetch_and_run_sh)),
-                    shlex.quote(self.container_name),
-                    shlex.quote(self.container_version),
-                ]
-                if self.exec:
-                    launcher_args.extend(
-                        shlex.quote(argument) for argument in shlex.split(self.exec)
-                    )
-                launcher_args.append('"$@"')
-                self_sh_file.write(" ".join(launcher_args))
-            self_sh_file.write('\n')
-        writefile_with_mode(self.sh_path, _write_app_sh, mode=0o755)
+            self_sh_file.write(f"{command}\n")
+        writefile_with_mode(self.sh_path, _write_app_sh, mode=0o755, manifest=self.manifest)
 
     def add_app_menu(self) -> None:
         icon_path = self.installdir/f"icons/{self.name.split()[0]}.png"
         icon_src = Path(__file__).parent/'icons'/icon_path.name
         try:
-            copyfile_with_mode(icon_src, icon_path)
+            install_icon(icon_src, icon_path, self.manifest)
         except FileNotFoundError:
             logging.warning(f'{icon_src} not found')
             icon_src = (Path(__file__).parent/'icons/neurodesk.png')
-            copyfile_with_mode(icon_src, icon_path)
+            install_icon(icon_src, icon_path, self.manifest)
         # interpolation=None so Exec field codes like %F are written verbatim
         entry = configparser.ConfigParser(interpolation=None)
         entry.optionxform = str
@@ -316,45 +956,224 @@ class NeurodeskApp:
                 entry["Desktop Entry"]["MimeType"] = ";".join(mimetypes) + ";"
 
         applications_path = self.installdir/"applications"
-        applications_path.mkdir(exist_ok=True)
+        _mkdir(applications_path, self.manifest)
         desktop_path = applications_path/f"{self.basename}.desktop"
 
         def _write_desktop(desktop_file):
             entry.write(desktop_file, space_around_delimiters=False)
-        writefile_with_mode(desktop_path, _write_desktop, mode=0o644)
+        writefile_with_mode(desktop_path, _write_desktop, mode=0o644, manifest=self.manifest)
+        self.desktop_path = desktop_path
+        self.desktop_entry = dict(entry["Desktop Entry"])
 
 
-def apps_from_json(cli, deskenv: Text, installdir: Path, appsjson: Path, sh_prefix='')  -> None:
-    # Read applications file
-    with open(appsjson, "r") as json_file:
-        menu_entries = json.load(json_file)
+def emit_app(app: NeurodeskApp, menu_entry: bool) -> None:
+    """Write the launcher of ``app`` and, if requested, its desktop entry."""
+    app.app_names()
+    app.add_app_sh()
+    if menu_entry:
+        app.add_app_menu()
 
-    for menu_name, menu_data in menu_entries.items():
-        default_show_in_menu = visibility_flag(menu_data, "show_in_menu")
-        apps = menu_data.get("apps", {})
-        menu_apps = [
-            app_data
-            for app_data in apps.values()
-            if visibility_flag(app_data, "show_in_menu", default_show_in_menu)
-        ]
+
+def emit_apps(apps: Sequence[Tuple[NeurodeskApp, bool]], jobs: int = 1) -> None:
+    """Emit ``apps`` serially or, with ``jobs`` > 1, from a bounded thread pool.
+
+    Every app is attempted before an error is raised in concurrent mode, and
+    the error raised is the one from the first failing app in catalog order,
+    so a failing build reports the same app regardless of scheduling.
+    """
+    if jobs <= 1:
+        for app, menu_entry in apps:
+            emit_app(app, menu_entry)
+        return
+    global _path_locks
+    from concurrent.futures import ThreadPoolExecutor
+    _path_locks = {}
+    try:
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="build_menu") as executor:
+            futures = [executor.submit(emit_app, app, menu_entry) for app, menu_entry in apps]
+    finally:
+        with _path_locks_guard:
+            _path_locks = None
+    for future in futures:
+        future.result()
+
+
+# Builddate of every app, read by fetch_and_run.sh next to apps.json.
+BUILDDATE_TABLE = "builddates.tsv"
+
+
+def write_builddate_table(path: Path, catalog: app_catalog.Catalog, manifest: Optional[BuildManifest] = None) -> None:
+    """Write the ``<name>\t<version>\t<builddate>`` line of every app to ``path``.
+
+    The lines are sorted, so the table can be searched with ``look``. The
+    first line names the hash of ``apps.json``, so the table is rewritten,
+    and newer than ``apps.json``, whenever ``apps.json`` changes.
+    """
+    rows = {}
+    for app in catalog:
+        name, _, version = app.name.rpartition(" ")
+        if name and "\t" not in app.name + app.builddate:
+            rows.setdefault((name, version), app.builddate)
+
+    def _write_table(fh):
+        fh.write(f"# apps.json sha256 {catalog.digest}\n")
+        for (name, version), builddate in sorted(rows.items()):
+            fh.write(f"{name}\t{version}\t{builddate}\n")
+    writefile_with_mode(path, _write_table, mode=0o644, manifest=manifest)
+
+
+def apps_from_json(
+    cli,
+    deskenv: Text,
+    installdir: Path,
+    appsjson: Path,
+    sh_prefix='',
+    manifest: Optional[BuildManifest] = None,
+    menu: Optional[MenuTree] = None,
+    jobs: int = 1,
+    menu_versions: Optional[int] = None,
+    launchers: Optional[LauncherTable] = None,
+)  -> List[NeurodeskApp]:
+    """Emit the launchers, desktop entries and submenus of ``appsjson``.
+
+    Returns the apps in catalog order.
+    """
+    catalog = app_catalog.load(appsjson)
+
+    # Without a caller-provided tree, extend the installed menu in place.
+    menu_path = installdir/"neurodesk-applications.menu"
+    write_menu = menu is None and not cli
+    if write_menu:
+        menu = MenuTree(menu_path)
+
+    # Menu XML and directory files are built here in catalog order; the
+    # per-app launchers and desktop entries are emitted afterwards.
+    pending: List[Tuple[NeurodeskApp, bool]] = []
+    for catalog_menu in catalog.menus.values():
+        menu_apps = {app.name: app.data for app in catalog_menu.apps if app.show_in_menu}
+        # Older versions keep their bin/ launchers but get no desktop entry.
+        shown_versions = None
+        if menu_versions is not None:
+            shown_versions = newest_versions(menu_apps, menu_versions)
         # Add submenu
         if not cli and menu_apps:
-            add_menu(installdir, menu_name, 'all applications')
-            for category in menu_data.get("categories") or []:
-                add_menu(installdir, menu_name, category)
-        for app_name, app_data in apps.items():
-            show_in_menu = visibility_flag(app_data, "show_in_menu", default_show_in_menu)
+            add_menu(menu, installdir, catalog_menu.name, 'all applications', manifest)
+            for category in catalog_menu.categories:
+                add_menu(menu, installdir, catalog_menu.name, category, manifest)
+        for catalog_app in catalog_menu.apps:
+            show_in_menu = catalog_app.show_in_menu and (
+                shown_versions is None or catalog_app.version in shown_versions
+            )
             app = NeurodeskApp(
                 deskenv=deskenv,
                 installdir=installdir,
                 sh_prefix=sh_prefix,
-                name=app_name,
-                category=menu_name.replace(" ", "-"),
-                **app_menu_data(app_data))
-            app.app_names()
-            app.add_app_sh()
-            if not cli and show_in_menu:
-                app.add_app_menu()
+                name=catalog_app.name,
+                category=catalog_menu.name.replace(" ", "-"),
+                manifest=manifest,
+                launchers=launchers,
+                **app_menu_data(catalog_app.data))
+            pending.append((app, not cli and show_in_menu))
+    profiling.phase("emit launchers and desktop entries")
+    emit_apps(pending, jobs)
+
+    if write_menu:
+        menu.write(menu_path, manifest)
+    return [app for app, _ in pending]
+
+
+MIMEINFO_CACHE = "mimeinfo.cache"
+DESKTOP_SUMMARY = "neurodesk-desktop-entries.json"
+# install.sh links ``applications`` into the appdir as ``neurodesk``, so the
+# desktop file ID of applications/<file> is neurodesk-<file>.
+DESKTOP_ID_PREFIX = "neurodesk-"
+
+
+def desktop_file_id(app: NeurodeskApp) -> Text:
+    return DESKTOP_ID_PREFIX + app.desktop_path.name
+
+
+def write_applications_caches(
+    applications_path: Path,
+    apps: Sequence[NeurodeskApp],
+    manifest: Optional[BuildManifest] = None,
+) -> None:
+    """Write ``mimeinfo.cache`` and a summary of the desktop entries of ``apps``.
+
+    The cache has the format of ``update-desktop-database``, so the desktop
+    does not have to scan every ``.desktop`` file before the first document
+    is opened. Desktop entries claiming a MIME type are listed newest version
+    first, which makes the newest version the default handler. The summary
+    lists the keys of every Neurodesk desktop entry, by desktop file ID.
+
+    Desktops only read the ``mimeinfo.cache`` at the top of the appdir;
+    :func:`merge_mimeinfo_cache` copies these handlers there.
+    """
+    entries = [app for app in apps if app.desktop_path is not None]
+    handlers: Dict[Text, List[NeurodeskApp]] = {}
+    for app in entries:
+        for mimetype in filter(None, app.desktop_entry.get("MimeType", "").split(";")):
+            handlers.setdefault(mimetype, []).append(app)
+
+    def _write_mimeinfo(fh):
+        fh.write("[MIME Cache]\n")
+        for mimetype in sorted(handlers):
+            ranked = sorted(
+                handlers[mimetype], key=lambda app: _version_key(app.container_version), reverse=True)
+            fh.write(f"{mimetype}={''.join(f'{desktop_file_id(app)};' for app in ranked)}\n")
+    writefile_with_mode(applications_path/MIMEINFO_CACHE, _write_mimeinfo, mode=0o644, manifest=manifest)
+
+    summary = {
+        desktop_file_id(app): {key: str(value) for key, value in app.desktop_entry.items()}
+        for app in entries
+    }
+    def _write_summary(fh):
+        json.dump({"version": 1, "entries": summary}, fh, indent=1, sort_keys=True)
+        fh.write("\n")
+    writefile_with_mode(applications_path/DESKTOP_SUMMARY, _write_summary, mode=0o644, manifest=manifest)
+
+
+def _read_mimeinfo_cache(path: Path) -> Dict[Text, List[Text]]:
+    handlers: Dict[Text, List[Text]] = {}
+    try:
+        with open(path, "r") as fh:
+            for line in fh:
+                mimetype, sep, ids = line.strip().partition("=")
+                if sep and not line.startswith("["):
+                    handlers[mimetype] = [i for i in ids.split(";") if i]
+    except FileNotFoundError:
+        pass
+    return handlers
+
+
+def merge_mimeinfo_cache(appdir: Path, applications_path: Path) -> bool:
+    """Merge the handlers of ``applications_path/mimeinfo.cache`` into ``appdir/mimeinfo.cache``.
+
+    Handlers of other applications are kept first, so Neurodesk does not
+    take over their default; Neurodesk handlers from a previous build are
+    replaced. Returns whether the cache was rewritten.
+    """
+    cache = appdir/MIMEINFO_CACHE
+    merged = {
+        mimetype: [i for i in ids if not i.startswith(DESKTOP_ID_PREFIX)]
+        for mimetype, ids in _read_mimeinfo_cache(cache).items()
+    }
+    for mimetype, ids in _read_mimeinfo_cache(applications_path/MIMEINFO_CACHE).items():
+        merged.setdefault(mimetype, []).extend(ids)
+    data = "[MIME Cache]\n" + "".join(
+        f"{mimetype}={''.join(f'{i};' for i in ids)}\n" for mimetype, ids in sorted(merged.items()) if ids)
+    try:
+        with open(cache, "rb") as fh:
+            if fh.read() == data.encode():
+                return False
+    except FileNotFoundError:
+        pass
+    replace_atomic(cache, data.encode(), mode=0o644)
+    return True
+
+
+class InvalidAppMenuError(ValueError):
+    """The applications menu written by :func:`neurodesk_xml` is not valid XML."""
 
 
 def neurodesk_xml(xml: Path, newxml: Path) -> None:
@@ -381,69 +1200,309 @@ def neurodesk_xml(xml: Path, newxml: Path) -> None:
             else:
                 fh.write(line)
     writefile_with_mode(newxml, _write_xml)
+    import xml.etree.ElementTree as et
     try:
         et.parse(newxml)
-    except et.ParseError:
-        logging.error(f'InvalidXMLError with appmenu [{newxml}]')
-        logging.error('Exiting ...')
-        sys.exit()
+    except et.ParseError as e:
+        raise InvalidAppMenuError(f'InvalidXMLError with appmenu [{newxml}]') from e
+
+
+OVERLAY_ENV = "NEURODESK_OVERLAY"
+OVERLAY_HELPER = "neurodesk-overlay.sh"
+
+# Paths of a system-layer install that a user overlay links to.
+SHARED_PATHS = (
+    "bin",
+    "applications",
+    "icons",
+    "desktop-directories",
+    "neurodesk-applications.menu",
+    "fetch_and_run.sh",
+    "fetch_containers.sh",
+    "configparser.sh",
+    "apps.json",
+    "transparent-singularity",
+)
+
+
+def _sudo_user() -> Optional[pwd.struct_passwd]:
+    """Return the account that ran the build through sudo, if any."""
+    name = os.environ.get("SUDO_USER")
+    if not name:
+        return None
+    try:
+        return pwd.getpwnam(name)
+    except KeyError:
+        return None
+
+
+def overlay_dir() -> Path:
+    """Return the calling user's overlay directory, as neurodesk-overlay.sh finds it.
+
+    Under sudo, ``$HOME`` is usually root's, so the default directory is
+    looked up in the home of ``$SUDO_USER`` instead.
+    """
+    if os.environ.get(OVERLAY_ENV):
+        return Path(os.environ[OVERLAY_ENV])
+    if os.environ.get("XDG_CONFIG_HOME"):
+        return Path(os.environ["XDG_CONFIG_HOME"])/"neurodesk"
+    user = _sudo_user()
+    home = Path(user.pw_dir) if user is not None else Path.home()
+    return home/".config"/"neurodesk"
+
+
+def _give_to_sudo_user(paths: Sequence[Path]) -> None:
+    """Hand the overlay files a root build created back to the user who ran sudo."""
+    user = _sudo_user()
+    if user is None or os.geteuid() != 0:
+        return
+    for path in paths:
+        if os.path.lexists(path):
+            os.chown(path, user.pw_uid, user.pw_gid, follow_symlinks=False)
+
 
+def overlay_sh_prefix(installdir: Path) -> Text:
+    """Return the launcher prefix that runs commands through the overlay helper.
 
-def build_menu(installdir, deskenv, sh_prefix):
+    ``"$0"`` passes the launcher itself, so that the helper can look up a
+    per-user override of it.
+    """
+    return f'exec {shlex.quote(str(installdir/OVERLAY_HELPER))} "$0"'
+
+
+def _remove_empty_dirs(path: Path) -> None:
+    for dirpath, _, _ in sorted(os.walk(path), key=lambda walk: len(walk[0]), reverse=True):
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            pass
+
+
+def _link_shared_path(live: Path, target: Path) -> None:
+    if live.is_symlink():
+        if Path(os.readlink(live)) == target:
+            return
+    elif live.is_dir():
+        _remove_empty_dirs(live)
+    if os.path.lexists(live) and not live.is_symlink():
+        logging.warning(f"Keeping {live}: it holds files that are not part of an earlier build")
+        return
+    tmp = atomic_tmp_path(live)
+    os.symlink(target, tmp)
+    os.replace(tmp, live)
+
+
+def _finish_manifest(manifest: BuildManifest, prune: Text) -> None:
+    # Remove launchers, desktop entries and icons of apps that were dropped
+    # from apps.json since the previous build
+    profiling.phase("prune")
+    if manifest.check:
+        if prune == "yes":
+            manifest.plan_prune()
+        return
+    if prune == "no":
+        manifest.keep_orphans()
+    else:
+        manifest.prune(dry_run=prune == "dry-run")
+    profiling.phase("save manifest")
+    manifest.save()
+
+
+def _build_overlay(installdir, system_layer, sh_prefix, manifest, prune):
+    """Set up ``installdir`` as a thin user overlay of the shared install ``system_layer``.
+
+    The generated launchers, desktop entries, icons and menu are symlinks to
+    the system layer, so the work done here does not depend on the size of
+    the catalog. The user's ``sh_prefix`` is written to the overlay directory
+    read by the system layer's launchers; without one, the system layer's
+    ``sh_prefix`` applies. Files of an earlier full build in ``installdir``
+    are pruned before the links are made.
+    """
+    profiling.phase("user overlay")
+    overlay = overlay_dir()
+    if manifest.check:
+        copyfile_with_mode(Path('config.ini'), installdir/'config.ini', manifest=manifest)
+        _finish_manifest(manifest, prune)
+        for name in SHARED_PATHS:
+            live = installdir/name
+            if os.path.lexists(system_layer/name) and not (
+                live.is_symlink() and Path(os.readlink(live)) == system_layer/name
+            ):
+                manifest.add_pending(live, "change" if os.path.lexists(live) else "add", 0)
+        return
+    overrides = overlay/"overrides"
+    created = [path for path in (overrides, *overrides.parents) if not os.path.lexists(path)]
+    overrides.mkdir(parents=True, exist_ok=True)
+    prefix_path = overlay/"sh_prefix"
+    if sh_prefix.strip():
+        def _write_prefix(fh):
+            fh.write(f"{sh_prefix}\n")
+        writefile_with_mode(prefix_path, _write_prefix, mode=0o644)
+        created.append(prefix_path)
+    else:
+        prefix_path.unlink(missing_ok=True)
+    _give_to_sudo_user(created)
+    copyfile_with_mode(Path('config.ini'), installdir/'config.ini', manifest=manifest)
+    _finish_manifest(manifest, prune)
+
+    profiling.phase("link system layer")
+    for name in SHARED_PATHS:
+        if os.path.lexists(system_layer/name):
+            _link_shared_path(installdir/name, system_layer/name)
+    logging.info(f"{installdir} is an overlay of {system_layer} (user overlay: {overlay})")
+
+
+def build_menu(
+    installdir,
+    deskenv,
+    sh_prefix,
+    jobs=1,
+    menu_versions=None,
+    prune="yes",
+    staged=False,
+    system_layer=False,
+    overlay_of=None,
+    launchers="scripts",
+    check=False,
+):
+    """Build the launchers, desktop entries and menu of ``apps.json`` into ``installdir``.
+
+    With ``staged`` (or once an install uses generations) the files are built
+    in a staging generation and made live in one step when the build succeeds;
+    a failed or interrupted build leaves the live files untouched.
+
+    With ``system_layer`` the install is built to be shared by several users:
+    its launchers run through ``neurodesk-overlay.sh``, which applies each
+    user's overlay. With ``overlay_of``, the path of such an install, only a
+    user overlay is set up in ``installdir``.
+
+    With ``launchers="dispatcher"`` the launchers in ``bin/`` are symlinks to
+    ``neurodesk-dispatch.sh`` and their commands are written to one table
+    (see :class:`LauncherTable`).
+
+    With ``check`` nothing is written. Every file is rendered in memory and
+    compared with the install, and the summary of the files a build would
+    add, change and remove is returned (see :meth:`BuildManifest.summary`).
+    """
+    if check:
+        manifest = BuildManifest(installdir, check=True)
+        if overlay_of is not None:
+            _build_overlay(installdir, Path(overlay_of), sh_prefix, manifest, prune)
+        else:
+            _build_menu_files(
+                installdir, deskenv, sh_prefix, manifest, jobs, menu_versions, prune, system_layer, launchers)
+        return manifest.summary()
+    if overlay_of is not None:
+        _build_overlay(installdir, Path(overlay_of), sh_prefix, BuildManifest(installdir), prune)
+        return
+    if not staged and not Generations.in_use(installdir):
+        _build_menu_files(
+            installdir, deskenv, sh_prefix, BuildManifest(installdir), jobs, menu_versions, prune, system_layer,
+            launchers)
+        return
+    if not staged:
+        logging.info(f"{installdir} uses staged generations; building staged")
+    profiling.phase("stage generation")
+    generations = Generations(installdir)
+    stage = generations.begin()
+    try:
+        _build_menu_files(
+            installdir, deskenv, sh_prefix, BuildManifest(installdir, stage), jobs, menu_versions, prune,
+            system_layer, launchers)
+    except BaseException:
+        generations.abort()
+        raise
+    profiling.phase("commit generation")
+    generations.commit()
+
+
+def _build_menu_files(
+    installdir, deskenv, sh_prefix, manifest, jobs, menu_versions, prune, system_layer=False, launchers="scripts"
+):
     climode = False
     if deskenv == 'cli':
         climode = True
 
-    copyfile_with_mode(Path('neurodesk/neurodesk-applications.menu'), installdir/'neurodesk-applications.menu')
-    copyfile_with_mode(Path('neurodesk/fetch_and_run.sh'), installdir/'fetch_and_run.sh', mode=0o755)
-    copyfile_with_mode(Path('neurodesk/fetch_containers.sh'), installdir/'fetch_containers.sh', mode=0o755)
-    copyfile_with_mode(Path('neurodesk/configparser.sh'), installdir/'configparser.sh', mode=0o755)
-    copyfile_with_mode(Path('config.ini'), installdir/'config.ini')
-    copyfile_with_mode(Path('neurodesk/apps.json'), installdir/'apps.json')
-    distutils.dir_util.copy_tree('neurodesk/transparent-singularity', str(installdir/'transparent-singularity'))
+    profiling.phase("copy static files")
+    copyfile_with_mode(Path('neurodesk/fetch_and_run.sh'), installdir/'fetch_and_run.sh', mode=0o755, manifest=manifest)
+    copyfile_with_mode(Path('neurodesk/fetch_containers.sh'), installdir/'fetch_containers.sh', mode=0o755, manifest=manifest)
+    copyfile_with_mode(Path('neurodesk/configparser.sh'), installdir/'configparser.sh', mode=0o755, manifest=manifest)
+    copyfile_with_mode(Path('config.ini'), installdir/'config.ini', manifest=manifest)
+    copyfile_with_mode(Path('neurodesk/apps.json'), installdir/'apps.json', manifest=manifest)
+    write_builddate_table(installdir/BUILDDATE_TABLE, app_catalog.load(Path('neurodesk/apps.json')), manifest)
+    if system_layer:
+        # The system sh_prefix is the default of users without their own.
+        copyfile_with_mode(
+            Path(f'neurodesk/{OVERLAY_HELPER}'), installdir/OVERLAY_HELPER, mode=0o755, manifest=manifest)
+        def _write_sh_prefix(fh):
+            fh.write(f"{sh_prefix}\n")
+        writefile_with_mode(installdir/'sh_prefix', _write_sh_prefix, mode=0o644, manifest=manifest)
+        sh_prefix = overlay_sh_prefix(installdir)
+    launcher_table = None
+    if launchers == "dispatcher":
+        copyfile_with_mode(Path(f'neurodesk/{DISPATCHER}'), installdir/DISPATCHER, mode=0o755, manifest=manifest)
+        launcher_table = LauncherTable(installdir)
+    profiling.phase("transparent-singularity")
+    copied, removed = sync_tree(
+        Path('neurodesk/transparent-singularity'), installdir/'transparent-singularity', manifest=manifest)
+    logging.info(f"transparent-singularity: {copied} file(s) copied, {removed} removed")
 
+    profiling.phase("category directories")
     if not climode:
         directories_path = installdir/"desktop-directories"
         icon_dir = installdir/"icons"
-        write_directory_file("Neurodesk", directories_path, icon_dir)
-        write_directory_file("All Applications", directories_path, icon_dir)
-        write_directory_file("Functional Imaging", directories_path, icon_dir)
-        write_directory_file("Workflows", directories_path, icon_dir)
-        write_directory_file("Cryo EM", directories_path, icon_dir)
-        write_directory_file("Data Organisation", directories_path, icon_dir)
-        write_directory_file("Diffusion Imaging", directories_path, icon_dir)
-        write_directory_file("Structural Imaging", directories_path, icon_dir)
-        write_directory_file("Quantitative Imaging", directories_path, icon_dir)
-        write_directory_file("Image Segmentation", directories_path, icon_dir)
-        write_directory_file("Image Registration", directories_path, icon_dir)
-        write_directory_file("Spectroscopy", directories_path, icon_dir)
-        write_directory_file("Rodent Imaging", directories_path, icon_dir)
-        write_directory_file("Image Reconstruction", directories_path, icon_dir)
-        write_directory_file("Visualization", directories_path, icon_dir)
-        write_directory_file("Programming", directories_path, icon_dir)
-        write_directory_file("Quality Control", directories_path, icon_dir)
-        write_directory_file("Shape Analysis", directories_path, icon_dir)
-        write_directory_file("Spine", directories_path, icon_dir)
-        write_directory_file("Electrophysiology", directories_path, icon_dir)
-        write_directory_file("BIDS Apps", directories_path, icon_dir)
-        write_directory_file("Machine Learning", directories_path, icon_dir)
-        write_directory_file("Body", directories_path, icon_dir)
-        write_directory_file("Hippocampus", directories_path, icon_dir)
-        write_directory_file("Phase Processing", directories_path, icon_dir)
-        write_directory_file("Molecular Biology", directories_path, icon_dir)
-        write_directory_file("Statistics", directories_path, icon_dir)
-        write_directory_file("Fetal Imaging", directories_path, icon_dir)
+        write_directory_file("Neurodesk", directories_path, icon_dir, manifest)
+        write_directory_file("All Applications", directories_path, icon_dir, manifest)
+        write_directory_file("Functional Imaging", directories_path, icon_dir, manifest)
+        write_directory_file("Workflows", directories_path, icon_dir, manifest)
+        write_directory_file("Cryo EM", directories_path, icon_dir, manifest)
+        write_directory_file("Data Organisation", directories_path, icon_dir, manifest)
+        write_directory_file("Diffusion Imaging", directories_path, icon_dir, manifest)
+        write_directory_file("Structural Imaging", directories_path, icon_dir, manifest)
+        write_directory_file("Quantitative Imaging", directories_path, icon_dir, manifest)
+        write_directory_file("Image Segmentation", directories_path, icon_dir, manifest)
+        write_directory_file("Image Registration", directories_path, icon_dir, manifest)
+        write_directory_file("Spectroscopy", directories_path, icon_dir, manifest)
+        write_directory_file("Rodent Imaging", directories_path, icon_dir, manifest)
+        write_directory_file("Image Reconstruction", directories_path, icon_dir, manifest)
+        write_directory_file("Visualization", directories_path, icon_dir, manifest)
+        write_directory_file("Programming", directories_path, icon_dir, manifest)
+        write_directory_file("Quality Control", directories_path, icon_dir, manifest)
+        write_directory_file("Shape Analysis", directories_path, icon_dir, manifest)
+        write_directory_file("Spine", directories_path, icon_dir, manifest)
+        write_directory_file("Electrophysiology", directories_path, icon_dir, manifest)
+        write_directory_file("BIDS Apps", directories_path, icon_dir, manifest)
+        write_directory_file("Machine Learning", directories_path, icon_dir, manifest)
+        write_directory_file("Body", directories_path, icon_dir, manifest)
+        write_directory_file("Hippocampus", directories_path, icon_dir, manifest)
+        write_directory_file("Phase Processing", directories_path, icon_dir, manifest)
+        write_directory_file("Molecular Biology", directories_path, icon_dir, manifest)
+        write_directory_file("Statistics", directories_path, icon_dir, manifest)
+        write_directory_file("Fetal Imaging", directories_path, icon_dir, manifest)
 
     appsjson = Path('neurodesk/apps.json').resolve(strict=True)
-    (installdir/'icons').mkdir(exist_ok=True)
-    apps_from_json(climode, deskenv, installdir, appsjson, sh_prefix)
+    profiling.phase("icons")
+    _mkdir(installdir/'icons', manifest)
+    if not climode:
+        # Make every packaged icon available, linked through the icon store.
+        for icon_src in sorted(Path('neurodesk/icons').glob('*.png')):
+            install_icon(icon_src.resolve(), installdir/'icons'/icon_src.name, manifest)
+    profiling.phase("apps_from_json")
+    menu = MenuTree(Path('neurodesk/neurodesk-applications.menu'))
+    apps = apps_from_json(
+        climode, deskenv, installdir, appsjson, sh_prefix, manifest, menu, jobs, menu_versions, launcher_table)
+    profiling.phase("write menu")
+    menu.write(installdir/'neurodesk-applications.menu', manifest)
 
+    profiling.phase("help and update apps")
     # Neurodesk help app
     help_app = NeurodeskApp(
         deskenv=deskenv,
         installdir=installdir,
         name="Help",
-        category="Neurodesk")
+        category="Neurodesk",
+        manifest=manifest,
+        launchers=launcher_table)
     help_app.app_names()
     help_app.add_app_sh("firefox https://neurodesk.github.io/docs/neurodesktop")
     if not climode:
@@ -454,15 +1513,28 @@ def build_menu(installdir, deskenv, sh_prefix):
         deskenv=deskenv,
         installdir=installdir,
         name="Update",
-        category="Neurodesk")
+        category="Neurodesk",
+        manifest=manifest,
+        launchers=launcher_table)
     update_app.app_names()
-    update_app.add_app_sh(f"cd {installdir}/neurocommand; bash build.sh --update --runsudo; read -p \"Press enter to close this window ...\"")
+    update_app.add_app_sh(f"cd {installdir}/neurocommand; bash build.sh --update --delta --runsudo; read -p \"Press enter to close this window ...\"")
+    if launcher_table is not None:
+        launcher_table.write(manifest)
     if not climode:
         update_app.add_app_menu()
+        profiling.phase("applications caches")
+        write_applications_caches(
+            installdir/'applications', apps + [help_app, update_app], manifest)
 
+    profiling.phase("symlink cleanup")
     # Remove any symlinks from local appdir
     # Prevents symlink recursion
-    neurodesk_appdir = installdir/'applications'
+    neurodesk_appdir = _target(installdir/'applications', manifest)
     for file in neurodesk_appdir.glob('*'):
         if file.is_symlink():
-            os.unlink(file)
+            if manifest.check:
+                manifest.add_pending(file, "remove", 0)
+            else:
+                os.unlink(file)
+
+    _finish_manifest(manifest, prune)
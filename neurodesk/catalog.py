@@ -0,0 +1,166 @@
+"""The ``apps.json`` catalog, parsed once and indexed.
+
+:func:`load` returns a :class:`Catalog` of typed entries with indexes by app
+name, container, container version, category and image name, so that every
+consumer derives containers, versions, builddates and visibility the same
+way. Catalogs are keyed by the content hash of ``apps.json``.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Text, Tuple
+
+
+def visibility_flag(data: dict, name: Text, default: bool = True) -> bool:
+    return data.get(name, default) is not False
+
+
+def is_primary_container_app(menu_name: Text, app_name: Text) -> bool:
+    """Return whether an app entry represents the container itself.
+
+    GUI sub-apps conventionally use ``<label>-<container> <version>``. Concrete
+    container names may themselves contain hyphens, so a dash alone cannot
+    distinguish a sub-app from a primary entry.
+    """
+    if "-" not in app_name:
+        return True
+    container_and_version = app_name.rsplit(" ", 1)
+    return (
+        len(container_and_version) == 2
+        and container_and_version[0] == menu_name
+    )
+
+
+class CatalogApp:
+    """One app of ``apps.json``.
+
+    ``container`` and ``version`` identify the container the app runs in;
+    for a GUI sub-app such as ``fsleyesGUI-fsl 6.0.7.16`` that is ``fsl``
+    ``6.0.7.16``. The version is the last word of the name, ``builddate`` the
+    ``version`` key of the entry and ``data`` the entry itself.
+    """
+
+    __slots__ = (
+        "name", "menu", "container", "version", "builddate", "exec",
+        "show_in_menu", "show_in_applist", "primary", "data",
+    )
+
+    def __init__(self, name: Text, menu: "CatalogMenu", data: Dict[Text, Any]):
+        self.name = name
+        self.menu = menu
+        self.data = data
+        self.exec = data.get("exec") or ""
+        self.builddate = str(data.get("version", ""))
+        if " " in name:
+            container, self.version = name.rsplit(" ", 1)
+        else:
+            container, self.version = name, ""
+        if self.exec and "-" in container:
+            container = container.split("-", 1)[1]
+        self.container = container
+        self.show_in_menu = visibility_flag(data, "show_in_menu", menu.show_in_menu)
+        self.show_in_applist = visibility_flag(data, "show_in_applist", menu.show_in_applist)
+        self.primary = is_primary_container_app(menu.name, name)
+
+    @property
+    def app_id(self) -> Text:
+        """The name as it appears in ``log.txt``: ``<container>_<version>``."""
+        return self.name.replace(" ", "_")
+
+    @property
+    def image(self) -> Text:
+        """The container image name, ``<container>_<version>_<builddate>``."""
+        return f"{self.container}_{self.version}_{self.builddate}"
+
+    def __repr__(self) -> Text:
+        return f"CatalogApp({self.name!r}, menu={self.menu.name!r})"
+
+
+class CatalogMenu:
+    """A top-level entry of ``apps.json``: a menu, its categories and its apps."""
+
+    __slots__ = ("name", "categories", "show_in_menu", "show_in_applist", "apps", "data")
+
+    def __init__(self, name: Text, data: Dict[Text, Any]):
+        self.name = name
+        self.data = data
+        self.categories: List[Text] = list(data.get("categories") or [])
+        self.show_in_menu = visibility_flag(data, "show_in_menu")
+        self.show_in_applist = visibility_flag(data, "show_in_applist")
+        self.apps: List[CatalogApp] = []
+
+    def __repr__(self) -> Text:
+        return f"CatalogMenu({self.name!r}, {len(self.apps)} apps)"
+
+
+class Catalog:
+    """The menus and apps of ``apps.json``, in file order, with lookup indexes."""
+
+    def __init__(self, entries: Dict[Text, Any], digest: Text = ""):
+        if not isinstance(entries, dict):
+            raise ValueError("apps.json must contain a JSON object")
+        self.digest = digest
+        self.menus: Dict[Text, CatalogMenu] = {}
+        self.apps: List[CatalogApp] = []
+        self.by_name: Dict[Text, CatalogApp] = {}
+        self.by_container: Dict[Text, List[CatalogApp]] = {}
+        self.by_container_version: Dict[Tuple[Text, Text], List[CatalogApp]] = {}
+        self.by_category: Dict[Text, List[CatalogApp]] = {}
+        self.by_image: Dict[Text, CatalogApp] = {}
+        for menu_name, menu_data in entries.items():
+            if not isinstance(menu_data, dict):
+                menu_data = {}
+            menu = CatalogMenu(menu_name, menu_data)
+            self.menus[menu_name] = menu
+            for app_name, app_data in (menu_data.get("apps") or {}).items():
+                if not isinstance(app_data, dict):
+                    app_data = {}
+                self._add(CatalogApp(app_name, menu, app_data))
+
+    def _add(self, app: CatalogApp) -> None:
+        app.menu.apps.append(app)
+        self.apps.append(app)
+        self.by_name[app.name] = app
+        self.by_container.setdefault(app.container, []).append(app)
+        self.by_container_version.setdefault((app.container, app.version), []).append(app)
+        for category in app.menu.categories:
+            self.by_category.setdefault(category, []).append(app)
+        if app.primary:
+            self.by_image.setdefault(app.image, app)
+
+    def __iter__(self) -> Iterator[CatalogApp]:
+        return iter(self.apps)
+
+    def __len__(self) -> int:
+        return len(self.apps)
+
+    def get(self, name: Text) -> Optional[CatalogApp]:
+        return self.by_name.get(name)
+
+    def builddate(self, container: Text, version: Text) -> Text:
+        """Return the builddate of app ``<container> <version>``, or ``""``."""
+        app = self.by_name.get(f"{container} {version}")
+        return app.builddate if app is not None else ""
+
+
+_loaded: Dict[Text, Catalog] = {}
+
+
+def load(path: Path) -> Catalog:
+    """Return the catalog of the ``apps.json`` at ``path``.
+
+    The catalog is reused within the process for as long as ``apps.json``
+    has the same content.
+    """
+    with open(path, "rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()
+    catalog = _loaded.get(digest)
+    if catalog is None:
+        entries = json.loads(data)
+        if not isinstance(entries, dict):
+            raise ValueError(f"{path} must contain a JSON object")
+        catalog = Catalog(entries, digest)
+        _loaded.clear()
+        _loaded[digest] = catalog
+    return catalog
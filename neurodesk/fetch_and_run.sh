@@ -32,12 +32,18 @@ fi
 source "${_base}"/configparser.sh "${_base}"/config.ini
 LOCAL_CONTAINERS_PATH="${NEURODESKTOP_LOCAL_CONTAINERS:-${_base}/containers}"
 
-# Resolve builddate from apps.json for a given module name and version
+# Resolve builddate from apps.json for a given module name and version.
+# build_menu writes the builddates of apps.json to a sorted table next to it;
+# python only parses apps.json when that table is missing or older.
 resolve_builddate() {
     local mod_name="$1"
     local mod_vers="$2"
     local apps_json="${_base}/apps.json"
-    if [[ -f "$apps_json" ]]; then
+    local builddates="${_base}/builddates.tsv"
+    if [[ -f "$builddates" && ! "$apps_json" -nt "$builddates" ]]; then
+        awk -F '\t' -v name="$mod_name" -v vers="$mod_vers" \
+            '$1 == name && $2 == vers { print $3; exit }' "$builddates"
+    elif [[ -f "$apps_json" ]]; then
         python3 -c "
 import json, sys
 with open('${apps_json}') as f:
@@ -94,6 +100,64 @@ else
 fi
 module use ${MODS_PATH}
 
+# Index of the module files on MODS_PATH, so that a launch does not have to ask
+# Lmod, which reads every module file on the path (the whole CVMFS tree), just
+# to find out whether one module is installed. It is rebuilt when the CVMFS
+# revision or the modification time of a module directory changes.
+MODULE_INDEX="${XDG_CACHE_HOME:-$HOME/.cache}/neurodesk/module-avail.tsv"
+
+# Print one line per directory of MODS_PATH that changes when its modules do.
+module_index_key() {
+    local dir revision
+    local -a dirs
+    IFS=':' read -r -a dirs <<< "$MODS_PATH"
+    for dir in "${dirs[@]}"; do
+        if [[ "$dir" == /cvmfs/* ]]; then
+            revision=$(getfattr --only-values -n user.revision "$dir" 2>/dev/null)
+            if [[ -n "$revision" ]]; then
+                echo "$dir revision $revision"
+                continue
+            fi
+        fi
+        if [[ -d "$dir" ]]; then
+            stat -c '%n %y' "$dir" "$dir"/*/ 2>/dev/null
+        fi
+    done
+}
+
+# Write "<name>/<version>\t<module file>" lines for MODS_PATH after a "# <key>" line.
+write_module_index() {
+    local dir file module tmp
+    local -a dirs
+    mkdir -p "$(dirname "$MODULE_INDEX")" || return 1
+    tmp=$(mktemp "${MODULE_INDEX}.XXXXXX") || return 1
+    IFS=':' read -r -a dirs <<< "$MODS_PATH"
+    {
+        echo "# $1"
+        for dir in "${dirs[@]}"; do
+            for file in "$dir"/*/*; do
+                module="${file#"$dir"/}"
+                module="${module%.lua}"
+                if [[ -f "$file" && "$module" != */.* ]]; then
+                    printf '%s\t%s\n' "$module" "$file"
+                fi
+            done
+        done
+    } > "$tmp" && mv -f "$tmp" "$MODULE_INDEX"
+}
+
+# Print the module file of name/version, which is found in the first directory
+# of MODS_PATH that has it. Fails when the index does not list the module.
+module_index_lookup() {
+    local key
+    key=$(module_index_key | cksum)
+    if [[ ! -f "$MODULE_INDEX" || "$(head -n 1 "$MODULE_INDEX")" != "# $key" ]]; then
+        write_module_index "$key" || return 1
+    fi
+    awk -F '\t' -v module="$1" \
+        'NR > 1 && $1 == module { print $2; found = 1; exit } END { exit !found }' "$MODULE_INDEX"
+}
+
 fetch_container() {
     # Resolve builddate from apps.json if not provided
     if [[ -z "$MOD_DATE" ]]; then
@@ -114,11 +178,14 @@ fetch_container() {
     module use ${MODS_PATH}
 }
 
-# Check if the module is available. Ignore stale module caches so newly added
+# Check if the module is available. The module index answers for installed
+# modules; on a miss, ask Lmod, ignoring stale module caches so newly added
 # local modulefiles are visible before deciding to download the container.
 if [[ "$EXPLICIT_MOD_DATE" == "true" ]]; then
     echo "[INFO] fetch_and_run.sh line $LINENO: Explicit builddate requested; ensuring ${MOD_NAME}_${MOD_VERS}_${MOD_DATE} is installed."
     fetch_container
+elif MODULE_FILE=$(module_index_lookup "${MOD_NAME}/${MOD_VERS}"); then
+    echo "[INFO] fetch_and_run.sh line $LINENO: Module ${MOD_NAME}/${MOD_VERS} found in module index: ${MODULE_FILE}"
 elif ! module --ignore-cache avail "${MOD_NAME}/${MOD_VERS}" 2>&1 | grep -q "${MOD_NAME}/${MOD_VERS}"; then
     echo "[WARNING] fetch_and_run.sh line $LINENO: Module ${MOD_NAME}/${MOD_VERS} not found. Attempting to download container."
     fetch_container
@@ -0,0 +1,55 @@
+"""Content hashes and atomic replacement of the files Neurodesk writes."""
+import hashlib
+import os
+from pathlib import Path
+import threading
+from typing import Dict, Optional, Tuple
+
+_digest_cache: Dict[Tuple[str, int, int], str] = {}
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """Return the content hash of ``path``, cached by size and mtime."""
+    st = os.stat(path)
+    cache_key = (str(path), st.st_size, st.st_mtime_ns)
+    digest = _digest_cache.get(cache_key)
+    if digest is None:
+        with open(path, "rb") as fh:
+            digest = content_digest(fh.read())
+        _digest_cache[cache_key] = digest
+    return digest
+
+
+def atomic_tmp_path(dest: Path) -> Path:
+    """Return the temporary path next to ``dest`` that this thread writes before replacing it."""
+    return dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def replace_atomic(dest: Path, data: bytes, mode: Optional[int]) -> None:
+    """Replace ``dest`` by a new file holding ``data``, keeping its mode.
+
+    The existing file is never modified in place: in a staged build it can be
+    a hard link shared with the live generation. ``mode`` applies when
+    ``dest`` does not exist yet (default ``0o644``).
+    """
+    try:
+        previous_mode = os.stat(dest).st_mode & 0o777
+    except FileNotFoundError:
+        previous_mode = None
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = atomic_tmp_path(dest)
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        if previous_mode is not None:
+            os.chmod(tmp, previous_mode)
+        else:
+            os.chmod(tmp, mode if mode is not None else 0o644)
+        os.replace(tmp, dest)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,161 @@
+"""Staged builds of the generated menu files, made live by a symlink flip."""
+import fcntl
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+GENERATIONS_DIR = ".generations"
+
+# Paths below installdir that are built in a staging generation and made live
+# together. Everything else (fetch_and_run.sh, config.ini, apps.json, ...) is
+# shared by all generations and written in place.
+STAGED_PATHS = (
+    "bin",
+    "applications",
+    "icons",
+    "desktop-directories",
+    "neurodesk-applications.menu",
+    ".build-manifest.json",
+)
+
+
+def _link_or_copy2(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+class Generations:
+    """Generations of the staged paths, kept below ``installdir/.generations``.
+
+    ``installdir/bin`` and the other :data:`STAGED_PATHS` are symlinks through
+    ``.generations/current``, which points at the live generation. A build
+    clones the live generation into a staging directory with hard links and
+    writes its changes there by replacing files, never by modifying them, so
+    the live generation is not touched until :meth:`commit` replaces the
+    ``current`` symlink in one rename. The previous generation is kept for
+    :meth:`rollback`.
+    """
+
+    def __init__(self, installdir: Path):
+        self.installdir = installdir
+        self.root = installdir/GENERATIONS_DIR
+        self.stage: Optional[Path] = None
+        self._lock_fh = None
+
+    @staticmethod
+    def in_use(installdir: Path) -> bool:
+        return (installdir/GENERATIONS_DIR/"current").is_symlink()
+
+    def _lock(self) -> None:
+        self.root.mkdir(exist_ok=True)
+        self._lock_fh = open(self.root/".lock", "w")
+        fcntl.flock(self._lock_fh, fcntl.LOCK_EX)
+
+    def _unlock(self) -> None:
+        if self._lock_fh is not None:
+            self._lock_fh.close()
+            self._lock_fh = None
+
+    def _ids(self) -> List[int]:
+        return [int(path.name) for path in self.root.iterdir() if path.name.isdigit()]
+
+    def _generation(self, name: str) -> Optional[Path]:
+        link = self.root/name
+        if not link.is_symlink():
+            return None
+        return self.root/os.readlink(link)
+
+    def _point(self, name: str, generation: Path) -> None:
+        """Atomically point the ``name`` symlink at ``generation``."""
+        tmp = self.root/f".{name}.tmp"
+        tmp.unlink(missing_ok=True)
+        os.symlink(generation.name, tmp)
+        os.replace(tmp, self.root/name)
+
+    def _link_live_paths(self) -> None:
+        """Make every staged path of the current generation a symlink to it.
+
+        Real files and directories left by a build without generations are
+        replaced; this is the only step that is not a single atomic rename.
+        """
+        current = self.root/"current"
+        for name in STAGED_PATHS:
+            live = self.installdir/name
+            link_target = f"{GENERATIONS_DIR}/current/{name}"
+            if not os.path.lexists(current/name):
+                if live.is_symlink() and os.readlink(live) == link_target:
+                    live.unlink()
+                continue
+            if live.is_symlink() and os.readlink(live) == link_target:
+                continue
+            tmp = self.installdir/f".{name}.tmp"
+            tmp.unlink(missing_ok=True)
+            os.symlink(link_target, tmp)
+            if live.is_dir() and not live.is_symlink():
+                legacy = self.root/f".legacy-{name}"
+                os.rename(live, legacy)
+                os.replace(tmp, live)
+                shutil.rmtree(legacy)
+            else:
+                os.replace(tmp, live)
+
+    def begin(self) -> Path:
+        """Lock the install and clone the live staged paths into a staging directory."""
+        self._lock()
+        for stale in self.root.glob(".staging-*"):
+            logging.info(f"Removing interrupted build {stale}")
+            shutil.rmtree(stale)
+        self.stage = self.root/f".staging-{os.getpid()}"
+        self.stage.mkdir()
+        for name in STAGED_PATHS:
+            live = self.installdir/name
+            if live.is_dir():
+                shutil.copytree(live, self.stage/name, symlinks=True, copy_function=_link_or_copy2)
+            elif live.exists():
+                _link_or_copy2(live.resolve(), self.stage/name)
+        return self.stage
+
+    def abort(self) -> None:
+        if self.stage is not None:
+            shutil.rmtree(self.stage, ignore_errors=True)
+            self.stage = None
+        self._unlock()
+
+    def commit(self) -> Path:
+        """Make the staging directory the live generation and drop older ones."""
+        generation = self.root/str(max(self._ids(), default=0) + 1)
+        os.rename(self.stage, generation)
+        self.stage = None
+        previous = self._generation("current")
+        self._point("current", generation)
+        if previous is not None:
+            self._point("previous", previous)
+        self._link_live_paths()
+        keep = {generation.name, previous.name if previous is not None else None}
+        for old in self.root.iterdir():
+            if old.name.isdigit() and old.name not in keep:
+                shutil.rmtree(old)
+        self._unlock()
+        logging.info(f"Generation {generation.name} is live")
+        return generation
+
+    def rollback(self) -> Path:
+        """Make the previous generation live again and keep the current one as previous."""
+        self._lock()
+        try:
+            current = self._generation("current")
+            previous = self._generation("previous")
+            if current is None or previous is None or not previous.is_dir():
+                raise RuntimeError(f"No previous generation to roll back to in {self.root}")
+            self._point("current", previous)
+            self._point("previous", current)
+            self._link_live_paths()
+        finally:
+            self._unlock()
+        logging.info(f"Rolled back to generation {previous.name}")
+        return previous
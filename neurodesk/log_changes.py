@@ -0,0 +1,126 @@
+"""The change journal of ``log.txt``: the images added, removed and changed per revision.
+
+``write_log.py --changes cvmfs/log.changes.jsonl`` appends one JSON line
+per revision of ``log.txt`` that it writes::
+
+    {"added": [...], "changed": [...], "removed": [...], "seq": 12, "sha256": "..."}
+
+``seq`` increases by one per entry and ``sha256`` is the hash of the new
+``log.txt``. A consumer remembers the last ``seq`` it applied and asks for
+the net changes after it with ``python3 -m neurodesk.log_changes --after
+SEQ``. When the journal no longer reaches back to that sequence, because it
+was trimmed to :data:`MAX_ENTRIES` or replaced, the consumer has to fall
+back to reading the whole ``log.txt``.
+"""
+import argparse
+import json
+import logging
+from pathlib import Path
+import sys
+from typing import Dict, Iterable, List, Optional, Text
+
+from neurodesk.fsutil import replace_atomic
+
+# Entries kept in the journal; older ones are dropped.
+MAX_ENTRIES = 1000
+
+# Exit status of --after when the journal does not reach back far enough.
+EXIT_RESYNC = 3
+
+
+def log_images(lines: Iterable[Text]) -> Dict[Text, Text]:
+    """Map the image of every ``log.txt`` line to the line."""
+    images = {}
+    for line in lines:
+        line = line.strip()
+        if line:
+            images[line.split(maxsplit=1)[0]] = line
+    return images
+
+
+def read_changes(journal: Path) -> List[dict]:
+    try:
+        with open(journal, "r") as fh:
+            return [json.loads(line) for line in fh if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def append_changes(journal: Path, old_log: Text, new_log: Text, digest: Text) -> Optional[dict]:
+    """Append the changes from ``old_log`` to ``new_log`` to ``journal`` and return the entry.
+
+    Nothing is appended, and ``None`` returned, when no line changed.
+    """
+    old, new = log_images(old_log.splitlines()), log_images(new_log.splitlines())
+    entry = {
+        "added": sorted(new.keys() - old.keys()),
+        "removed": sorted(old.keys() - new.keys()),
+        "changed": sorted(image for image in new.keys() & old.keys() if new[image] != old[image]),
+    }
+    if not any(entry.values()):
+        return None
+    entries = read_changes(journal)
+    entry["seq"] = entries[-1]["seq"] + 1 if entries else 1
+    entry["sha256"] = digest
+    entries = entries[-(MAX_ENTRIES - 1):] + [entry]
+    data = "".join(json.dumps(e, sort_keys=True) + "\n" for e in entries)
+    replace_atomic(journal, data.encode(), mode=0o644)
+    return entry
+
+
+def changes_since(entries: List[dict], after: int) -> Optional[Dict[Text, List[Text]]]:
+    """Return the net images added, removed and changed by the entries after ``after``.
+
+    Returns ``None`` when ``entries`` do not include every entry after ``after``.
+    """
+    last = entries[-1]["seq"] if entries else 0
+    first = entries[0]["seq"] if entries else 1
+    if after > last or (after < last and after < first - 1):
+        return None
+    added, removed, changed = set(), set(), set()
+    for entry in entries:
+        if entry["seq"] <= after:
+            continue
+        for image in entry["added"]:
+            if image in removed:
+                removed.discard(image)
+                changed.add(image)
+            else:
+                added.add(image)
+        for image in entry["removed"]:
+            changed.discard(image)
+            if image in added:
+                added.discard(image)
+            else:
+                removed.add(image)
+        changed.update(image for image in entry["changed"] if image not in added)
+    return {"added": sorted(added), "removed": sorted(removed), "changed": sorted(changed)}
+
+
+def main(argv: Optional[List[Text]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--journal", type=Path, default=Path(__file__).resolve().parents[1]/"cvmfs"/"log.changes.jsonl",
+                        help="change journal (default: cvmfs/log.changes.jsonl)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--last-seq", action="store_true", help="print the sequence of the last entry (0 if none)")
+    group.add_argument("--after", type=int, metavar="SEQ",
+                       help="print the net changes after SEQ as '<added|removed|changed> <image>' lines; "
+                            f"exits {EXIT_RESYNC} when the journal does not reach back to SEQ")
+    args = parser.parse_args(argv)
+
+    entries = read_changes(args.journal)
+    if args.last_seq:
+        print(entries[-1]["seq"] if entries else 0)
+        return 0
+    changes = changes_since(entries, args.after)
+    if changes is None:
+        logging.warning(f"{args.journal} has no entries after {args.after}; read the whole log.txt instead")
+        return EXIT_RESYNC
+    for kind in ("added", "removed", "changed"):
+        for image in changes[kind]:
+            print(f"{kind} {image}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
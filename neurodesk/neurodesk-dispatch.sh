@@ -0,0 +1,23 @@
+#!/usr/bin/env bash
+
+# neurodesk-dispatch.sh {args}
+#
+# With `launchers = dispatcher`, the launchers in bin/ are symlinks to this
+# script. It runs the command of the launcher it was invoked as, which
+# bin/.neurodesk-launchers.tsv lists as "<launcher>\t<command>", the way the
+# generated bin/<launcher> script would have: {args} are "$@" of the command.
+
+case "$0" in
+    */*) _table="${0%/*}/.neurodesk-launchers.tsv" ;;
+    *) _table=".neurodesk-launchers.tsv" ;;
+esac
+_launcher="${0##*/}"
+
+_command="$(awk -F '\t' -v launcher="${_launcher}" \
+    '$1 == launcher { sub(/^[^\t]*\t/, ""); print; exit }' "${_table}")"
+
+if [ -z "${_command}" ]; then
+    echo "[ERROR] ${_launcher} is not listed in ${_table}" >&2
+    exit 127
+fi
+eval "${_command}"
@@ -0,0 +1,27 @@
+#!/usr/bin/env bash
+
+# neurodesk-overlay.sh [launcher] [cmd] {args}
+#
+# Launchers of a shared system-layer install run their command through this
+# script, which applies the calling user's overlay. The overlay directory is
+# $NEURODESK_OVERLAY, or ${XDG_CONFIG_HOME:-$HOME/.config}/neurodesk:
+#   overrides/<launcher>  executable run instead, with [cmd] {args} as arguments
+#   sh_prefix             used instead of the sh_prefix of the system install
+
+_script="$(readlink -f "${BASH_SOURCE[0]}")" ## who am i? ##
+_base="$(dirname "$_script")" ## Delete last component from $_script ##
+overlay="${NEURODESK_OVERLAY:-${XDG_CONFIG_HOME:-$HOME/.config}/neurodesk}"
+launcher="$(basename "$1")"
+shift
+
+if [ -x "${overlay}/overrides/${launcher}" ]; then
+    exec "${overlay}/overrides/${launcher}" "$@"
+fi
+
+sh_prefix=""
+if [ -f "${overlay}/sh_prefix" ]; then
+    sh_prefix="$(<"${overlay}/sh_prefix")"
+elif [ -f "${_base}/sh_prefix" ]; then
+    sh_prefix="$(<"${_base}/sh_prefix")"
+fi
+eval "${sh_prefix} \"\$@\""
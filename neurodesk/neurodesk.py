@@ -1,6 +1,7 @@
 import sys
 import argparse
 import configparser
+import json
 from pathlib import Path
 import os
 import signal
@@ -8,6 +9,13 @@ import logging
 
 from neurodesk.build_menu import build_menu
 from neurodesk.build_menu import neurodesk_xml
+from neurodesk.build_menu import InvalidAppMenuError
+from neurodesk.build_menu import merge_mimeinfo_cache
+from neurodesk.build_menu import parse_menu_versions
+from neurodesk.build_menu import LAUNCHER_MODES
+from neurodesk.build_menu import PRUNE_MODES
+from neurodesk.generations import Generations
+from neurodesk import profiling
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s | %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,6 +36,24 @@ CONFIG_FILE = 'config.ini'
 # }
 
 
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid positive integer: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"invalid positive integer: {value!r}")
+    return number
+
+
+def menu_versions_arg(value):
+    try:
+        parse_menu_versions(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
 def get_args():
     parser = argparse.ArgumentParser()
     parser.add_argument('--installdir', action="store")
@@ -36,6 +62,33 @@ def get_args():
     parser.add_argument('--appdir', action="store")
     parser.add_argument('--deskdir', action="store")
     parser.add_argument('--edit', action="store")
+    parser.add_argument('--jobs', action="store", type=positive_int,
+                        help="Write launchers and desktop entries with N concurrent writers")
+    parser.add_argument('--menu-versions', action="store", type=menu_versions_arg,
+                        help="Desktop entries per tool: 'latest', 'all' or the newest N versions")
+    parser.add_argument('--prune', action="store", choices=PRUNE_MODES,
+                        help="Remove files of apps no longer in apps.json (default: yes)")
+    parser.add_argument('--staged', action="store", choices=('yes', 'no'),
+                        help="Build in a staging generation and make it live in one step (default: no)")
+    parser.add_argument('--system-layer', action="store", choices=('yes', 'no'),
+                        help="Build a shared install whose launchers apply per-user overlays (default: no)")
+    parser.add_argument('--overlay-of', action="store",
+                        help="Only set up a per-user overlay of the shared install in this directory")
+    parser.add_argument('--launchers', action="store", choices=LAUNCHER_MODES,
+                        help="Generate a script per launcher, or link launchers to one dispatcher (default: scripts)")
+    parser.add_argument('--check', action="store_true", default=False,
+                        help="Write nothing; print the files a build would add, change and remove as JSON "
+                             "and exit 1 when there are any")
+    parser.add_argument('--watch', action="store_true", default=False,
+                        help="After building, rebuild whenever neurodesk/apps.json changes")
+    parser.add_argument('--rollback', action="store_true", default=False,
+                        help="Make the previous staged generation live again and exit")
+    parser.add_argument('--profile', action="store",
+                        help=f"Write the wall and CPU time of each phase as JSON to this file "
+                             f"(or set {profiling.PROFILE_ENV})")
+    parser.add_argument('--profile-pstats', action="store",
+                        help=f"Run under cProfile and save the stats to this .pstats file "
+                             f"(or set {profiling.PSTATS_ENV})")
     # parser.add_argument('--edit', action="store_true", default=False)
     # parser.add_argument('--lxde', action="store_true", default=False)
     # parser.add_argument('--cli', action="store_true", default=False)
@@ -49,6 +102,33 @@ def main():
         raise OSError
 
     args = get_args()
+    profile_path = args.profile or os.environ.get(profiling.PROFILE_ENV)
+    pstats_path = args.profile_pstats or os.environ.get(profiling.PSTATS_ENV)
+    if not profile_path and not pstats_path:
+        run(args)
+        return
+
+    profiler = profiling.enable()
+    cprofiler = None
+    if pstats_path:
+        import cProfile
+        cprofiler = cProfile.Profile()
+    try:
+        if cprofiler is not None:
+            cprofiler.enable()
+        run(args)
+    finally:
+        if cprofiler is not None:
+            cprofiler.disable()
+            cprofiler.dump_stats(pstats_path)
+            logging.info(f"Wrote cProfile stats to {pstats_path}")
+        profiling.disable()
+        if profile_path:
+            profiler.write(Path(profile_path))
+
+
+def run(args):
+    profiling.phase("config")
     config = configparser.ConfigParser()
     
     config['neurodesk'] = {
@@ -59,7 +139,14 @@ def main():
         'deskdir': '', 
         'edit': '',
         'sh_prefix': '',
-        'singularity_opts': ''
+        'singularity_opts': '',
+        'jobs': '',
+        'menu_versions': '',
+        'prune': '',
+        'staged': '',
+        'system_layer': '',
+        'overlay_of': '',
+        'launchers': '',
         }
     config.read(CONFIG_FILE)
 
@@ -83,19 +170,92 @@ def main():
         config['neurodesk']['deskdir'] = str(args.deskdir)
     if args.edit:
         config['neurodesk']['edit'] = str(args.edit)
+    if args.jobs:
+        config['neurodesk']['jobs'] = str(args.jobs)
+    if args.menu_versions:
+        config['neurodesk']['menu_versions'] = str(args.menu_versions)
+    if args.prune:
+        config['neurodesk']['prune'] = str(args.prune)
+    if args.staged:
+        config['neurodesk']['staged'] = str(args.staged)
+    if args.system_layer:
+        config['neurodesk']['system_layer'] = str(args.system_layer)
+    if args.overlay_of:
+        config['neurodesk']['overlay_of'] = str(args.overlay_of)
+    if args.launchers:
+        config['neurodesk']['launchers'] = str(args.launchers)
 
-    with open(CONFIG_FILE, 'w+') as fh:
-        config.write(fh)
+    if not args.check:
+        with open(CONFIG_FILE, 'w+') as fh:
+            config.write(fh)
 
     installdir = Path(config['neurodesk']['installdir']).resolve(strict=True)
 
-    if not config['neurodesk']['deskenv'] == 'cli' and config['neurodesk']['appmenu']:
+    if args.rollback:
+        try:
+            Generations(installdir).rollback()
+        except RuntimeError as e:
+            logging.error(str(e))
+            sys.exit(1)
+        return
+
+    profiling.phase("neurodesk_xml")
+    if not args.check and not config['neurodesk']['deskenv'] == 'cli' and config['neurodesk']['appmenu']:
         appmenu = Path(config['neurodesk']['appmenu'])
         appmenu_template = installdir/'local-applications.menu.template'
         new_appmenu = installdir/appmenu.name
-        neurodesk_xml(appmenu_template, new_appmenu)
+        try:
+            neurodesk_xml(appmenu_template, new_appmenu)
+        except InvalidAppMenuError as e:
+            logging.error(str(e))
+            logging.error('Exiting ...')
+            sys.exit()
+
+    jobs = positive_int(config['neurodesk']['jobs'] or '1')
+    menu_versions = parse_menu_versions(config['neurodesk']['menu_versions'])
+    prune = config['neurodesk']['prune'] or 'yes'
+    if prune not in PRUNE_MODES:
+        logging.error(f"Invalid prune setting '{prune}', expected one of {', '.join(PRUNE_MODES)}")
+        sys.exit(2)
+    staged = config['neurodesk']['staged'] or 'no'
+    if staged not in ('yes', 'no'):
+        logging.error(f"Invalid staged setting '{staged}', expected yes or no")
+        sys.exit(2)
+    system_layer = config['neurodesk']['system_layer'] or 'no'
+    if system_layer not in ('yes', 'no'):
+        logging.error(f"Invalid system_layer setting '{system_layer}', expected yes or no")
+        sys.exit(2)
+    launchers = config['neurodesk']['launchers'] or 'scripts'
+    if launchers not in LAUNCHER_MODES:
+        logging.error(f"Invalid launchers setting '{launchers}', expected one of {', '.join(LAUNCHER_MODES)}")
+        sys.exit(2)
+    overlay_of = None
+    if config['neurodesk']['overlay_of']:
+        overlay_of = Path(config['neurodesk']['overlay_of']).resolve()
+        if not (overlay_of/'bin').is_dir():
+            logging.error(f"overlay_of {overlay_of} is not a Neurodesk install")
+            sys.exit(2)
+
+    if args.check:
+        summary = build_menu(installdir, config['neurodesk']['deskenv'], config['neurodesk']['sh_prefix'],
+                             jobs, menu_versions, prune, staged == 'yes', system_layer == 'yes', overlay_of,
+                             launchers, check=True)
+        print(json.dumps(summary, indent=2))
+        sys.exit(1 if summary['changed'] else 0)
+
+    def build():
+        build_menu(installdir, config['neurodesk']['deskenv'], config['neurodesk']['sh_prefix'],
+                   jobs, menu_versions, prune, staged == 'yes', system_layer == 'yes', overlay_of, launchers)
+        if config['neurodesk']['deskenv'] != 'cli' and config['neurodesk']['appdir']:
+            try:
+                merge_mimeinfo_cache(Path(config['neurodesk']['appdir']), installdir/'applications')
+            except OSError as e:
+                logging.warning(f"Could not update the MIME cache of {config['neurodesk']['appdir']}: {e}")
 
-    build_menu(installdir, config['neurodesk']['deskenv'], config['neurodesk']['sh_prefix'])
+    build()
+    if args.watch:
+        from neurodesk.watch import watch_catalog
+        watch_catalog(Path('neurodesk/apps.json'), build)
 
 if __name__ == "__main__":
     main()
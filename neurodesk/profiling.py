@@ -0,0 +1,73 @@
+"""Wall and CPU time of the phases of a neurodesk run.
+
+Phases are consecutive: :func:`phase` ends the running phase and starts the
+next one, so the build code only marks where each phase begins. Without an
+active :class:`PhaseProfiler` marking a phase does nothing.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+import time
+from typing import List, Optional, Text
+
+PROFILE_ENV = "NEURODESK_PROFILE"
+PSTATS_ENV = "NEURODESK_PROFILE_PSTATS"
+
+
+class PhaseProfiler:
+    def __init__(self):
+        self.started = time.time()
+        self.phases: List[dict] = []
+        self._name: Optional[Text] = None
+        self._wall = self._wall0 = time.perf_counter()
+        self._cpu = self._cpu0 = time.process_time()
+
+    def phase(self, name: Optional[Text]) -> None:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if self._name is not None:
+            self.phases.append({
+                "name": self._name,
+                "wall_seconds": round(wall - self._wall, 6),
+                "cpu_seconds": round(cpu - self._cpu, 6),
+            })
+        self._name, self._wall, self._cpu = name, wall, cpu
+
+    def report(self) -> dict:
+        self.phase(None)
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            "argv": sys.argv,
+            "pid": os.getpid(),
+            "wall_seconds": round(self._wall - self._wall0, 6),
+            "cpu_seconds": round(self._cpu - self._cpu0, 6),
+            "phases": self.phases,
+        }
+
+    def write(self, path: Path) -> None:
+        with open(path, "w") as fh:
+            json.dump(self.report(), fh, indent=2)
+            fh.write("\n")
+        logging.info(f"Wrote phase profile to {path}")
+
+
+_active: Optional[PhaseProfiler] = None
+
+
+def enable() -> PhaseProfiler:
+    global _active
+    _active = PhaseProfiler()
+    return _active
+
+
+def disable() -> None:
+    global _active
+    _active = None
+
+
+def phase(name: Text) -> None:
+    """End the running phase, if any, and start phase ``name``."""
+    if _active is not None:
+        _active.phase(name)
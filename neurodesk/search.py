@@ -0,0 +1,319 @@
+"""Search the published containers by tool, version, category and command.
+
+``containers.sh PATTERN`` lists the containers of ``cvmfs/log.txt`` that
+match ``PATTERN``. :class:`ContainerIndex` holds a trigram index over the
+tool name, version and categories of every container build, and one over
+the distinct exposed commands (from the ``command-index.tsv`` that module
+reconciliation publishes, see :mod:`neurodesk.which`). A query only compares
+text with the builds and commands that have every trigram of a term, and
+ranks the matches: a term naming the tool ranks above one found in a
+category, which ranks above one found in a command.
+
+The index is built once per change of its sources and kept in the user's
+cache directory, so a query costs a file read and a few set intersections.
+"""
+import argparse
+from array import array
+import json
+import marshal
+import os
+from pathlib import Path
+import sys
+import tempfile
+from typing import Dict, List, Optional, Sequence, Set, Text, Tuple
+
+from neurodesk.which import COMMAND_INDEX, COMMAND_INDEX_ENV
+
+LOG = Path(__file__).resolve().parents[1]/"cvmfs"/"log.txt"
+CACHE_FORMAT = 1
+
+# Score of a term by where it is found; a build scores the sum over terms.
+SCORES = {
+    "tool": 100,
+    "tool prefix": 50,
+    "in tool": 30,
+    "category": 20,
+    "command": 15,
+    "version": 10,
+    "in command": 5,
+}
+
+
+def normalize_category(category: Text) -> Text:
+    return " ".join(category.replace("_", " ").split()).lower()
+
+
+def trigrams(text: Text) -> Set[Text]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home()/".cache")/"neurodesk"
+
+
+class ContainerBuild:
+    """One line of ``log.txt``: a container build and its categories."""
+
+    __slots__ = ("tool", "version", "builddate", "categories")
+
+    def __init__(self, tool: Text, version: Text, builddate: Text, categories: Sequence[Text]):
+        self.tool = tool
+        self.version = version
+        self.builddate = builddate
+        self.categories = tuple(categories)
+
+    @property
+    def image(self) -> Text:
+        return f"{self.tool}_{self.version}_{self.builddate}"
+
+
+def parse_log_line(line: Text) -> Optional[ContainerBuild]:
+    """Parse ``<tool>_<version>_<builddate> categories:<category>,...``."""
+    image, _, rest = line.strip().partition(" ")
+    parts = image.rsplit("_", 2)
+    if len(parts) != 3 or not all(parts):
+        return None
+    categories = rest.split("categories:", 1)[1] if "categories:" in rest else ""
+    return ContainerBuild(
+        *parts, [category.strip() for category in categories.split(",") if category.strip()])
+
+
+def _postings(texts: Sequence[Text]) -> Dict[Text, bytes]:
+    postings: Dict[Text, array] = {}
+    for number, text in enumerate(texts):
+        for trigram in trigrams(text):
+            posting = postings.get(trigram)
+            if posting is None:
+                posting = postings[trigram] = array("I")
+            posting.append(number)
+    return {trigram: posting.tobytes() for trigram, posting in postings.items()}
+
+
+class ContainerIndex:
+    """Container builds in ``log.txt`` order and the commands they expose, indexed by trigram.
+
+    Builds and commands are kept as the ``\\t``-separated records they were
+    read from and only parsed when a query matches them.
+    """
+
+    def __init__(
+        self,
+        builds: Sequence[Text],
+        build_postings: Dict[Text, bytes],
+        commands: Sequence[Text],
+        command_postings: Dict[Text, bytes],
+    ):
+        self.builds = builds
+        self.build_postings = build_postings
+        self.commands = commands
+        self.command_postings = command_postings
+
+    @classmethod
+    def from_sources(cls, log: Path, command_index: Optional[Path] = None) -> "ContainerIndex":
+        builds = []
+        numbers = {}
+        with open(log, "r") as fh:
+            for build in map(parse_log_line, fh):
+                if build is not None:
+                    numbers[f"{build.tool}/{build.version}/{build.builddate}"] = len(builds)
+                    builds.append("\t".join((build.tool, build.version, build.builddate, ",".join(build.categories))))
+        commands = []
+        if command_index is not None and command_index.is_file():
+            with open(command_index, "r") as fh:
+                for line in fh:
+                    command, _, providers = line.rstrip("\n").partition("\t")
+                    provided_by = [str(numbers[p]) for p in providers.split() if p in numbers]
+                    if provided_by:
+                        commands.append(f"{command}\t{' '.join(provided_by)}")
+        return cls(
+            builds,
+            _postings([cls._build_text(record) for record in builds]),
+            commands,
+            _postings([record.split("\t", 1)[0].lower() for record in commands]),
+        )
+
+    @classmethod
+    def load(cls, log: Path = LOG, command_index: Optional[Path] = None, cache: Optional[Path] = None) -> "ContainerIndex":
+        """Return the index of ``log`` and ``command_index``, reusing the one cached in ``cache``.
+
+        The cached index is rebuilt when the size or modification time of
+        either source changed.
+        """
+        if cache is None:
+            return cls.from_sources(log, command_index)
+        sources = [log] + ([command_index] if command_index is not None and command_index.is_file() else [])
+        key = tuple((str(path.resolve()), path.stat().st_size, path.stat().st_mtime_ns) for path in sources)
+        try:
+            with open(cache, "rb") as fh:
+                cached = marshal.loads(fh.read())
+            if cached[0] == CACHE_FORMAT and cached[1] == key:
+                return cls(*cached[2:])
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            pass
+        index = cls.from_sources(log, command_index)
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=cache.parent, prefix=f".{cache.name}.")
+            with os.fdopen(fd, "wb") as fh:
+                marshal.dump((CACHE_FORMAT, key, index.builds, index.build_postings,
+                              index.commands, index.command_postings), fh)
+            os.replace(tmp, cache)
+        except OSError:
+            pass
+        return index
+
+    @staticmethod
+    def _build_text(record: Text) -> Text:
+        tool, version, _, categories = record.split("\t")
+        # Fields are separated by newlines, which no term contains.
+        return "\n".join((tool, version, *map(normalize_category, categories.split(",")))).lower()
+
+    def build(self, number: int) -> ContainerBuild:
+        tool, version, builddate, categories = self.builds[number].split("\t")
+        return ContainerBuild(tool, version, builddate, categories.split(",") if categories else ())
+
+    @staticmethod
+    def _candidates(postings: Dict[Text, bytes], term: Text, count: int) -> Sequence[int]:
+        """Return the numbers of the entries that have every trigram of ``term``."""
+        term_postings = [postings.get(trigram, b"") for trigram in trigrams(term)]
+        if not term_postings:
+            return range(count)
+        term_postings.sort(key=len)
+        candidates = set(array("I", term_postings[0]))
+        for posting in term_postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(array("I", posting))
+        return sorted(candidates)
+
+    def _build_scores(self, term: Text) -> Dict[int, int]:
+        scores = {}
+        numbers: Set[int] = set(self._candidates(self.build_postings, term, len(self.builds)))
+        category_term = term.replace("_", " ")
+        if category_term != term:
+            # Categories are indexed with spaces: functional_imaging.
+            numbers.update(self._candidates(self.build_postings, category_term, len(self.builds)))
+        for number in numbers:
+            tool, version, _, categories = self.builds[number].lower().split("\t")
+            if term == tool:
+                scores[number] = SCORES["tool"]
+            elif tool.startswith(term):
+                scores[number] = SCORES["tool prefix"]
+            elif term in tool:
+                scores[number] = SCORES["in tool"]
+            elif any(category_term in normalize_category(category) for category in categories.split(",")):
+                scores[number] = SCORES["category"]
+            elif term in version:
+                scores[number] = SCORES["version"]
+        return scores
+
+    def _command_matches(self, term: Text) -> Dict[int, List[Text]]:
+        """Map the number of every build exposing a command that contains ``term`` to those commands."""
+        matches: Dict[int, List[Text]] = {}
+        for number in self._candidates(self.command_postings, term, len(self.commands)):
+            command, providers = self.commands[number].split("\t")
+            if term in command.lower():
+                for provider in providers.split():
+                    matches.setdefault(int(provider), []).append(command)
+        return matches
+
+    def search(self, query: Text = "", categories: Sequence[Text] = ()) -> List[Tuple[int, ContainerBuild, List[Text]]]:
+        """Return the ``(score, build, commands)`` of the builds matching every term of ``query``.
+
+        ``commands`` are the exposed commands of the build that matched a term.
+        Matches are ranked by score, then kept in ``log.txt`` order. An empty
+        query matches every build. ``categories`` keeps only the builds in
+        one of them.
+        """
+        scores: Optional[Dict[int, int]] = None
+        matched_commands: Dict[int, List[Text]] = {}
+        for term in query.lower().split():
+            term_scores = self._build_scores(term)
+            for number, commands in self._command_matches(term).items():
+                command_score = SCORES["command" if term in map(str.lower, commands) else "in command"]
+                if command_score > term_scores.get(number, 0):
+                    term_scores[number] = command_score
+                known = matched_commands.setdefault(number, [])
+                known.extend(command for command in commands if command not in known)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {number: score + term_scores[number] for number, score in scores.items() if number in term_scores}
+        if scores is None:
+            scores = dict.fromkeys(range(len(self.builds)), 0)
+
+        wanted = {normalize_category(category) for category in categories}
+        matches = []
+        for number, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+            build = self.build(number)
+            if wanted and not wanted.intersection(map(normalize_category, build.categories)):
+                continue
+            matches.append((score, build, matched_commands.get(number, [])))
+        return matches
+
+    def search_tools(self, pattern: Text = "") -> List[ContainerBuild]:
+        """Return the builds whose tool name contains ``pattern``, in ``log.txt`` order.
+
+        Unlike :meth:`search`, the match is case-sensitive and ignores
+        versions, categories and commands; ``containers.sh --PATTERN``
+        installs exactly these builds.
+        """
+        numbers = self._candidates(self.build_postings, pattern.lower(), len(self.builds))
+        return [
+            build for build in map(self.build, numbers) if pattern in build.tool
+        ]
+
+
+def main(argv: Optional[List[Text]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="neurodesk search", description=__doc__.splitlines()[0])
+    parser.add_argument("query", nargs="*",
+                        help="terms that every listed container matches; 'all' or none lists every container")
+    parser.add_argument("--category", action="append", default=[],
+                        help="only list containers in this category (repeatable)")
+    parser.add_argument("--log", type=Path, default=LOG, help="container list (default: cvmfs/log.txt)")
+    parser.add_argument("--commands", type=Path, default=Path(os.environ.get(COMMAND_INDEX_ENV, COMMAND_INDEX)),
+                        help=f"command index to search commands in, if present (or set {COMMAND_INDEX_ENV})")
+    parser.add_argument("--json", action="store_true", help="print the matches as a JSON list")
+    parser.add_argument("--limit", type=int, default=0, help="print at most this many matches")
+    parser.add_argument("--tool-only", action="store_true",
+                        help="only list containers whose tool name contains the query, in log.txt order")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help=f"do not read or write the index cached in {cache_dir()}")
+    args = parser.parse_args(argv)
+
+    query = " ".join(args.query)
+    if query == "all":
+        query = ""
+    index = ContainerIndex.load(args.log, args.commands, cache_dir()/"search-index" if args.cache else None)
+    if args.tool_only:
+        wanted = {normalize_category(category) for category in args.category}
+        matches = [
+            (0, build, []) for build in index.search_tools(query)
+            if not wanted or wanted.intersection(map(normalize_category, build.categories))
+        ]
+    else:
+        matches = index.search(query, args.category)
+    if args.limit > 0:
+        matches = matches[:args.limit]
+    if args.json:
+        json.dump([
+            {
+                "tool": build.tool,
+                "version": build.version,
+                "builddate": build.builddate,
+                "image": build.image,
+                "categories": list(build.categories),
+                "commands": commands,
+                "score": score,
+            }
+            for score, build, commands in matches
+        ], sys.stdout)
+        sys.stdout.write("\n")
+    else:
+        for _, build, _ in matches:
+            print(f"{build.tool}\t{build.version}\t{build.builddate}\t{','.join(build.categories)}")
+    return 0 if matches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
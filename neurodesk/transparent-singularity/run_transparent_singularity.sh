@@ -140,7 +140,7 @@ if [ -z "$container" ]; then
       echo "Select the container you would like to install:"
       echo "-----------------------------------------------"
       echo "singularity container list:"
-      curl -s https://raw.githubusercontent.com/NeuroDesk/neurodesk/master/cvmfs/log.txt
+      curl -s --compressed https://raw.githubusercontent.com/NeuroDesk/neurodesk/master/cvmfs/log.txt
       echo " "
       echo "-----------------------------------------------"
       echo "usage examples:"
@@ -0,0 +1,145 @@
+"""Update apps.json and the helper scripts of neurocommand without a git pull.
+
+The Update app runs ``build.sh --update --delta``, which calls
+``python3 -m neurodesk.update`` instead of pulling the repository. Each of
+:data:`UPDATE_FILES` is requested with the ETag of the copy fetched before,
+so an unchanged file costs a ``304 Not Modified`` response, and a file is
+only replaced when its content changed. The menu build that follows
+rewrites only the launchers, desktop entries and menu affected by the new
+``apps.json``.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+from typing import Dict, List, Optional, Sequence, Text
+import urllib.error
+import urllib.request
+
+from neurodesk.fsutil import content_digest, file_digest, replace_atomic
+
+UPDATE_URL = "https://raw.githubusercontent.com/NeuroDesk/neurocommand/main"
+UPDATE_URL_ENV = "NEUROCOMMAND_UPDATE_URL"
+
+# Files below the repository root that a delta update refreshes.
+UPDATE_FILES = (
+    "neurodesk/apps.json",
+    "neurodesk/fetch_and_run.sh",
+    "neurodesk/fetch_containers.sh",
+    "neurodesk/configparser.sh",
+    "neurodesk/neurodesk-overlay.sh",
+    "neurodesk/neurodesk-dispatch.sh",
+)
+
+# ETag and content hash of every file fetched, kept in the repository root.
+STATE_FILE = ".delta-update.json"
+
+
+def fetch_if_changed(url: Text, dest: Path, state: Dict[Text, Text], timeout: float = 30) -> bool:
+    """Replace ``dest`` by the content of ``url`` if it changed, and return whether it did.
+
+    ``state`` holds the ETag and content hash of the last fetch of ``dest``
+    and is updated in place. The ETag is only sent while ``dest`` still has
+    the content it was fetched with.
+    """
+    headers = {"Accept-Encoding": "gzip"}
+    if state.get("etag") and dest.exists() and file_digest(dest) == state.get("sha256"):
+        headers["If-None-Match"] = state["etag"]
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            etag = response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return False
+        raise
+
+    digest = content_digest(data)
+    state.clear()
+    if etag:
+        state["etag"] = etag
+    state["sha256"] = digest
+    if dest.exists() and file_digest(dest) == digest:
+        return False
+    replace_atomic(dest, data, mode=0o755 if dest.suffix == ".sh" else 0o644)
+    return True
+
+
+def _read_states(state_path: Path) -> Dict[Text, Dict[Text, Text]]:
+    try:
+        with open(state_path, "r") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable update state {state_path}: {e}")
+        return {}
+
+
+def fetched_files(repo: Path) -> List[Text]:
+    """Return the files of ``repo`` that still hold the content a delta update fetched.
+
+    They are not local changes: ``build.sh`` restores them from git before a
+    full update, since re-applying them from the autostash of ``git pull``
+    would conflict with the upstream commits that changed them.
+    """
+    return [
+        name for name, state in sorted(_read_states(repo/STATE_FILE).items())
+        if state.get("sha256") and (repo/name).is_file() and file_digest(repo/name) == state["sha256"]
+    ]
+
+
+def delta_update(repo: Path, base_url: Text = UPDATE_URL, files: Sequence[Text] = UPDATE_FILES) -> List[Text]:
+    """Fetch the changed ``files`` of ``repo`` from ``base_url`` and return their paths."""
+    state_path = repo/STATE_FILE
+    states = _read_states(state_path)
+
+    changed = []
+    try:
+        for name in files:
+            state = states.setdefault(name, {})
+            if fetch_if_changed(f"{base_url.rstrip('/')}/{name}", repo/name, state):
+                logging.info(f"Updated {name}")
+                changed.append(name)
+    finally:
+        data = json.dumps(states, indent=1, sort_keys=True)
+        replace_atomic(state_path, (data + "\n").encode(), mode=0o644)
+    return changed
+
+
+def main(argv: Optional[List[Text]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", type=Path, default=Path(__file__).resolve().parents[1],
+                        help="neurocommand checkout to update (default: this one)")
+    parser.add_argument("--url", default=os.environ.get(UPDATE_URL_ENV, UPDATE_URL),
+                        help=f"Base URL of the raw repository files (or set {UPDATE_URL_ENV})")
+    parser.add_argument("--fetched", action="store_true",
+                        help="only list the files that still hold the content of a delta update")
+    args = parser.parse_args(argv)
+
+    if args.fetched:
+        for name in fetched_files(args.repo):
+            print(name)
+        return 0
+
+    try:
+        changed = delta_update(args.repo, args.url)
+    except (OSError, urllib.error.URLError) as e:
+        logging.error(f"Delta update from {args.url} failed: {e}")
+        return 1
+    if changed:
+        logging.info(f"Delta update changed {len(changed)} file(s)")
+    else:
+        logging.info("apps.json and the helper scripts are up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s | %(message)s')
+    sys.exit(main())
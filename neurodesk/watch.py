@@ -0,0 +1,198 @@
+"""Rebuild the menu whenever apps.json changes.
+
+``python -m neurodesk --watch`` builds once and then waits for ``apps.json``
+to change. Changes are picked up with inotify where available, or by polling
+the file's stat otherwise. A rebuild only rewrites the files whose content
+changed (see :class:`neurodesk.build_menu.BuildManifest`), so an edit to a
+few tools shows up without regenerating the whole install.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Text, Tuple
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT = struct.Struct("iIII")
+
+# Writers of apps.json (git, cp, editors) produce several events per update;
+# events closer together than this are handled as one change.
+SETTLE_SECONDS = 0.2
+POLL_SECONDS = 1.0
+
+
+class InotifyWatcher:
+    """Report changes of ``path`` with inotify.
+
+    The parent directory is watched, so that replacing the file by a rename
+    is seen as well as writes to it.
+    """
+
+    def __init__(self, path: Path):
+        import ctypes
+        import ctypes.util
+
+        self.path = path
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(self.fd, os.fsencode(path.parent), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno), str(path.parent))
+
+    def wait(self, timeout: float) -> bool:
+        """Return whether ``path`` changed within ``timeout`` seconds."""
+        deadline = time.monotonic() + timeout
+        name = os.fsencode(self.path.name)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.fd], [], [], remaining)[0]:
+                return False
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+            offset = 0
+            changed = False
+            while offset < len(data):
+                _, _, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                changed |= data[offset:offset + length].rstrip(b"\0") == name
+                offset += length
+            if changed:
+                return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollWatcher:
+    """Report changes of ``path`` by comparing its stat every ``interval`` seconds."""
+
+    def __init__(self, path: Path, interval: float = POLL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._signature = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            signature = self._stat()
+            if signature != self._signature:
+                self._signature = signature
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+def file_watcher(path: Path):
+    """Return an :class:`InotifyWatcher` of ``path``, or a :class:`PollWatcher` without inotify."""
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError) as e:
+        logging.info(f"inotify is not available ({e}); polling {path} every {POLL_SECONDS:g}s")
+        return PollWatcher(path)
+
+
+def load_catalog(path: Path) -> Optional[dict]:
+    try:
+        with open(path, "r") as fh:
+            return json.load(fh)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Cannot read {path}: {e}")
+        return None
+
+
+def _catalog_apps(catalog: dict) -> Dict[Text, dict]:
+    apps = {}
+    for menu_name, menu_data in catalog.items():
+        menu_settings = {key: value for key, value in menu_data.items() if key != "apps"}
+        for app_name, app_data in (menu_data.get("apps") or {}).items():
+            apps[app_name] = {"menu": menu_name, "menu_settings": menu_settings, "app": app_data}
+    return apps
+
+
+def catalog_delta(old: dict, new: dict) -> Dict[Text, List[Text]]:
+    """Return the names of the apps added, removed and changed from ``old`` to ``new``.
+
+    An app has changed when its own entry, its menu or the settings of its
+    menu differ.
+    """
+    old_apps = _catalog_apps(old)
+    new_apps = _catalog_apps(new)
+    return {
+        "added": sorted(set(new_apps) - set(old_apps)),
+        "removed": sorted(set(old_apps) - set(new_apps)),
+        "changed": sorted(name for name in set(old_apps) & set(new_apps) if old_apps[name] != new_apps[name]),
+    }
+
+
+def watch_catalog(
+    appsjson: Path,
+    rebuild: Callable[[], None],
+    watcher=None,
+    stop: Optional[threading.Event] = None,
+    settle: float = SETTLE_SECONDS,
+) -> None:
+    """Call ``rebuild`` each time an app of ``appsjson`` changes, until ``stop`` is set.
+
+    Edits that leave every app, its menu and the menu settings as they were,
+    such as reformatting the file, do not rebuild.
+
+    A rebuild that fails is logged, and the next change is rebuilt against
+    the catalog of the last successful build.
+    """
+    watcher = watcher or file_watcher(appsjson)
+    catalog = load_catalog(appsjson)
+    logging.info(f"Watching {appsjson} for changes")
+    try:
+        while stop is None or not stop.is_set():
+            if not watcher.wait(1.0):
+                continue
+            while watcher.wait(settle):
+                pass
+            new_catalog = load_catalog(appsjson)
+            if new_catalog is None:
+                continue
+            delta = catalog_delta(catalog or {}, new_catalog)
+            if not any(delta.values()):
+                # Formatting or key order only; no launcher or menu entry changes.
+                catalog = new_catalog
+                continue
+            logging.info(
+                f"{appsjson} changed: {len(delta['added'])} app(s) added, "
+                f"{len(delta['removed'])} removed, {len(delta['changed'])} changed")
+            start = time.perf_counter()
+            try:
+                rebuild()
+            except Exception:
+                logging.exception("Rebuild failed; waiting for the next change")
+                continue
+            catalog = new_catalog
+            logging.info(f"Menu rebuilt in {time.perf_counter() - start:.2f}s")
+    finally:
+        watcher.close()
@@ -0,0 +1,67 @@
+"""List the containers that provide a command.
+
+``cvmfs/reconcile_module_files.py`` publishes ``containers/command-index.tsv``
+next to the modules on CVMFS: one ``<command>\\t<tool>/<version>/<builddate> ...``
+line per command, sorted by command. :func:`lookup` bisects that file, so a
+query reads a few pages of one file instead of the ``commands.txt`` of every
+container directory.
+"""
+import argparse
+import mmap
+import os
+from pathlib import Path
+import sys
+from typing import List, Optional, Text
+
+COMMAND_INDEX = "/cvmfs/neurodesk.ardc.edu.au/containers/command-index.tsv"
+COMMAND_INDEX_ENV = "NEURODESK_COMMAND_INDEX"
+
+
+def lookup(index: Path, command: Text) -> List[Text]:
+    """Return the ``<tool>/<version>/<builddate>`` of the containers that provide ``command``."""
+    key = command.encode() + b"\t"
+    with open(index, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Every line starting before lo sorts before key, every line
+            # starting at or after hi does not.
+            lo, hi = 0, len(data)
+            while lo < hi:
+                start = data.rfind(b"\n", 0, (lo + hi) // 2) + 1
+                end = data.find(b"\n", start)
+                if end < 0:
+                    end = len(data)
+                if data[start:end] < key:
+                    lo = end + 1
+                else:
+                    hi = start
+            end = data.find(b"\n", lo)
+            line = data[lo:end if end >= 0 else len(data)]
+    if not line.startswith(key):
+        return []
+    return line[len(key):].decode().split()
+
+
+def main(argv: Optional[List[Text]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="neurodesk which", description=__doc__.splitlines()[0])
+    parser.add_argument("command", help="command to look up, e.g. fslmaths")
+    parser.add_argument("--index", type=Path, default=Path(os.environ.get(COMMAND_INDEX_ENV, COMMAND_INDEX)),
+                        help=f"command index to search (or set {COMMAND_INDEX_ENV})")
+    args = parser.parse_args(argv)
+
+    try:
+        containers = lookup(args.index, args.command)
+    except OSError as e:
+        print(f"Cannot read the command index {args.index}: {e}", file=sys.stderr)
+        return 2
+    if not containers:
+        print(f"No container provides {args.command}", file=sys.stderr)
+        return 1
+    for container in containers:
+        print(container)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,25 @@
-"""Generate the menu items."""
-import configparser
-import json
+"""Generate ``log.txt``, the list of published containers, from ``apps.json``.
+
+Each primary container app becomes one ``<name>_<version>_<builddate>
+categories:<category>,...`` line. The lines are rendered in memory, sorted,
+and written in one atomic replace, which is skipped when ``log.txt`` already
+holds them. With a change journal (see :mod:`neurodesk.log_changes`), each
+revision written also appends the images it added, removed and changed.
+"""
+import argparse
 from pathlib import Path
+import sys
 from typing import Text, List, Optional
 
+if __package__ in (None, ""):
+    # Run as neurodesk/write_log.py: import the package, not neurodesk/neurodesk.py.
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
+
+from neurodesk import catalog as app_catalog  # noqa: E402
+from neurodesk.fsutil import content_digest, replace_atomic  # noqa: E402
+from neurodesk.log_changes import append_changes  # noqa: E402
+from neurodesk.catalog import is_primary_container_app  # noqa: E402
+
 APP_LOG_KWARGS = {"version", "exec", "terminal", "apptainer_args"}
 
 
@@ -11,31 +27,15 @@ def app_log_data(app_data: dict) -> dict:
     return {key: app_data[key] for key in APP_LOG_KWARGS if key in app_data}
 
 
-def is_primary_container_app(menu_name: Text, app_name: Text) -> bool:
-    """Return whether an app entry represents the container itself.
-
-    GUI sub-apps conventionally use ``<label>-<container> <version>``. Concrete
-    container names may themselves contain hyphens, so a dash alone cannot
-    distinguish a sub-app from a primary entry.
-    """
-    if "-" not in app_name:
-        return True
-    container_and_version = app_name.rsplit(" ", 1)
-    return (
-        len(container_and_version) == 2
-        and container_and_version[0] == menu_name
-    )
-
-
-def add_app(
+def log_line(
     name: Text,
     version: Text,
     category: Text,
     exec: Text = "",
     apptainer_args: Optional[List[str]] = None,
     terminal: bool = True,
-) -> None:
-    """Add an application to the menu.
+) -> Text:
+    """Return the ``log.txt`` line of an application.
 
     Parameters
     ----------
@@ -50,24 +50,57 @@ def add_app(
     terminal : bool
         If set to ``True``, a terminal is opened when launching the application.
     """
-    log = configparser.ConfigParser()
-    log.optionxform = str
-    log[" " + name.replace(" ", "_") + "_" + version + " categories:" + category] = { }
-    with open('log.txt', "a",) as log_file:
-        log.write(log_file, space_around_delimiters=False)
+    return name.replace(" ", "_") + "_" + version + " categories:" + category
+
+
+def render_log(catalog: app_catalog.Catalog) -> Text:
+    """Return ``log.txt`` for the primary container apps of ``catalog``, sorted."""
+    lines = set()
+    for app in catalog:
+        # Add the primary container entry, not its GUI sub-programs.
+        if app.primary:
+            category_list = ''.join(category + ',' for category in app.menu.categories)
+            lines.add(log_line(app.name, category=category_list, **app_log_data(app.data)))
+    return "".join(line + "\n" for line in sorted(lines))
+
+
+def write_log(path: Path, catalog: app_catalog.Catalog, changes: Optional[Path] = None) -> bool:
+    """Write ``log.txt`` to ``path`` unless it is unchanged, and return whether it was written.
+
+    With ``changes`` the images added, removed and changed are appended to
+    that journal first, so a consumer never sees a ``log.txt`` revision that
+    is missing from it.
+    """
+    data = render_log(catalog).encode()
+    try:
+        with open(path, "rb") as fh:
+            previous = fh.read()
+    except FileNotFoundError:
+        previous = b""
+    if previous == data and path.exists():
+        return False
+    if changes is not None:
+        append_changes(changes, previous.decode(), data.decode(), content_digest(data))
+    replace_atomic(path, data, mode=0o644)
+    return True
+
+
+def main(argv: Optional[List[Text]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps-json", type=Path, default=Path("./neurodesk/apps.json"),
+                        help="apps.json to read (default: ./neurodesk/apps.json)")
+    parser.add_argument("--output", type=Path, default=Path("log.txt"),
+                        help="log file to write (default: ./log.txt)")
+    parser.add_argument("--changes", type=Path,
+                        help="change journal to append the revision to, e.g. cvmfs/log.changes.jsonl")
+    args = parser.parse_args(argv)
+
+    if write_log(args.output, app_catalog.load(args.apps_json), args.changes):
+        print(f"[INFO] Wrote {args.output}")
+    else:
+        print(f"[INFO] {args.output} is up to date")
+    return 0
 
 
 if __name__ == "__main__":
-    # Read applications file
-    # with open(Path("/home/ec2-user/neurodesk/neurodesk/apps.json"), "r") as json_file:
-    with open(Path("./neurodesk/apps.json"), "r") as json_file:
-        menu_entries = json.load(json_file)
-
-    for menu_name, menu_data in menu_entries.items():
-        for app_name, app_data in menu_data.get("apps", {}).items():
-            category_list = ''
-            for category in menu_data.get("categories") or []:
-                category_list = category_list + category + ','
-            # Add the primary container entry, not its GUI sub-programs.
-            if is_primary_container_app(menu_name, app_name):
-                add_app(app_name, category=category_list, **app_log_data(app_data))
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def make_installdir(tmp_path):
+    """Return a factory for empty install directories under ``tmp_path``.
+
+    The shipped menu is copied in unless ``menu`` is false, as
+    ``apps_from_json`` only adds entries to an existing menu.
+    """
+    def make(name="install", menu=True):
+        installdir = tmp_path / name
+        (installdir / "icons").mkdir(parents=True)
+        (installdir / "desktop-directories").mkdir()
+        if menu:
+            shutil.copyfile(
+                ROOT / "neurodesk" / "neurodesk-applications.menu",
+                installdir / "neurodesk-applications.menu",
+            )
+        return installdir
+
+    return make
+
+
+@pytest.fixture
+def installdir(make_installdir):
+    return make_installdir()
+
+
+@pytest.fixture
+def write_apps(tmp_path):
+    """Return a function writing a catalog with one ``<name> 1.0`` app per name.
+
+    The catalog goes to ``tmp_path / "apps.json"`` unless ``path`` is given;
+    the function returns the path it wrote.
+    """
+    def write(apps, path=None):
+        apps_json = path or tmp_path / "apps.json"
+        apps_json.write_text(
+            json.dumps(
+                {
+                    name: {
+                        "apps": {f"{name} 1.0": {"version": "20260101", "exec": ""}},
+                        "categories": ["programming"],
+                    }
+                    for name in apps
+                }
+            )
+        )
+        return apps_json
+
+    return write
@@ -0,0 +1,23 @@
+from benchmarks.bench_build_menu import snapshot, written_since
+from benchmarks.synthetic import synthetic_catalog
+
+
+def test_synthetic_catalog_has_exact_size_and_real_shape():
+    catalog = synthetic_catalog(1000)
+
+    assert sum(len(tool["apps"]) for tool in catalog.values()) == 1000
+    afni = catalog["afni00000"]
+    assert "sumaGUI-afni00000 21.2.00" in afni["apps"]
+    assert afni["apps"]["sumaGUI-afni00000 21.2.00"]["exec"] == "suma"
+    assert afni["categories"]
+
+
+def test_written_since_counts_new_and_replaced_files(tmp_path):
+    (tmp_path / "kept").write_text("same")
+    (tmp_path / "replaced").write_text("old")
+    before = snapshot(tmp_path)
+
+    (tmp_path / "replaced").write_text("newer")
+    (tmp_path / "added").write_text("1")
+
+    assert written_since(before, tmp_path) == (2, 6)
@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from neurodesk.build_menu import build_menu
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    workdir = tmp_path / "work"
+    (workdir / "neurodesk").mkdir(parents=True)
+    for entry in (ROOT / "neurodesk").iterdir():
+        if entry.name != "apps.json":
+            (workdir / "neurodesk" / entry.name).symlink_to(entry)
+    (workdir / "config.ini").touch()
+    monkeypatch.chdir(workdir)
+    return workdir
+
+
+@pytest.fixture
+def build_catalog(workdir, write_apps):
+    return lambda apps: write_apps(apps, workdir / "neurodesk" / "apps.json")
+
+
+@pytest.fixture
+def installdir(make_installdir):
+    # build_menu writes the menu itself, so a fresh install has none.
+    return make_installdir(menu=False)
+
+
+def tree(installdir):
+    return sorted(
+        (os.path.join(dirpath, name), os.lstat(os.path.join(dirpath, name)).st_mtime_ns)
+        for dirpath, dirnames, filenames in os.walk(installdir)
+        for name in dirnames + filenames
+    )
+
+
+def test_check_writes_nothing_and_lists_a_fresh_install(installdir, build_catalog):
+    build_catalog(["afni"])
+    before = tree(installdir)
+
+    summary = build_menu(installdir, "lxde", "", check=True)
+
+    assert tree(installdir) == before
+    assert summary["changed"]
+    assert summary["files"]["change"] == summary["files"]["remove"] == 0
+    assert "bin/afni-1_0.sh" in summary["paths"]["add"]
+    assert "neurodesk-applications.menu" in summary["paths"]["add"]
+    assert summary["bytes"]["add"] > 0
+
+
+def test_check_is_clean_after_a_build(installdir, build_catalog):
+    build_catalog(["afni"])
+    build_menu(installdir, "lxde", "")
+
+    summary = build_menu(installdir, "lxde", "", check=True)
+
+    assert not summary["changed"]
+    assert summary["files"] == {"add": 0, "change": 0, "remove": 0}
+
+
+def test_check_reports_the_delta_of_a_catalog_change(installdir, build_catalog):
+    build_catalog(["afni", "ants"])
+    build_menu(installdir, "lxde", "")
+    build_catalog(["afni", "fsl"])
+    removed = installdir / "bin" / "ants-1_0.sh"
+
+    summary = build_menu(installdir, "lxde", "", check=True)
+
+    assert removed.exists()
+    assert "bin/fsl-1_0.sh" in summary["paths"]["add"]
+    assert "apps.json" in summary["paths"]["change"]
+    assert "bin/ants-1_0.sh" in summary["paths"]["remove"]
+    assert summary["bytes"]["remove"] >= removed.stat().st_size
+    assert build_menu(installdir, "lxde", "", prune="no", check=True)["files"]["remove"] == 0
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from neurodesk import build_menu
+from neurodesk.build_menu import NeurodeskApp, apps_from_json, emit_apps
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def tree(path):
+    return {
+        file.relative_to(path).as_posix(): file.read_bytes().replace(str(path).encode(), b"<installdir>")
+        for file in sorted(path.rglob("*"))
+        if file.is_file()
+    }
+
+
+def test_concurrent_emission_matches_serial_output(tmp_path, make_installdir):
+    apps_json = tmp_path / "apps.json"
+    catalog = json.loads((ROOT / "neurodesk" / "apps.json").read_text())
+    apps_json.write_text(json.dumps(dict(list(catalog.items())[:25])))
+
+    serial = make_installdir("serial")
+    concurrent = make_installdir("concurrent")
+    apps_from_json(False, "lxde", serial, apps_json)
+    apps_from_json(False, "lxde", concurrent, apps_json, jobs=8)
+
+    assert tree(concurrent) == tree(serial)
+    # The path locks only live as long as one concurrent emission.
+    assert build_menu._path_locks is None
+
+
+def test_concurrent_emission_raises_first_failure_in_catalog_order(tmp_path, monkeypatch):
+    apps = [
+        (NeurodeskApp(deskenv="cli", installdir=tmp_path, name=f"demo {index}"), False)
+        for index in range(6)
+    ]
+    emitted = []
+
+    def fake_emit_app(app, menu_entry):
+        emitted.append(app.name)
+        if app.name in ("demo 2", "demo 4"):
+            raise RuntimeError(app.name)
+
+    monkeypatch.setattr(build_menu, "emit_app", fake_emit_app)
+
+    with pytest.raises(RuntimeError, match="demo 2"):
+        emit_apps(apps, jobs=4)
+    assert sorted(emitted) == [f"demo {index}" for index in range(6)]
+    assert build_menu._path_locks is None
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from neurodesk.build_menu import (
+    DISPATCHER,
+    LAUNCHER_TABLE,
+    BuildManifest,
+    LauncherTable,
+    NeurodeskApp,
+    apps_from_json,
+)
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+APPS_JSON = {
+    "fsl": {
+        "apps": {
+            "fsleyesGUI-fsl 6.0.7.16": {"version": "1", "exec": "fsleyes --scene 'ortho view'"},
+            "fsl 6.0.7.16": {"version": "1", "exec": ""},
+        }
+    }
+}
+
+
+@pytest.fixture
+def make_install(make_installdir):
+    def make(name):
+        installdir = make_installdir(name)
+        shutil.copy(ROOT / "neurodesk" / DISPATCHER, installdir / DISPATCHER)
+        fetch_and_run = installdir / "fetch_and_run.sh"
+        fetch_and_run.write_text(
+            '#!/usr/bin/env bash\nprintf "<%s>" "$@"; read -r line; echo " stdin=$line"\n')
+        fetch_and_run.chmod(0o755)
+        return installdir
+
+    return make
+
+
+def build(installdir, apps_json, launchers=None):
+    manifest = BuildManifest(installdir)
+    apps = apps_from_json(True, "cli", installdir, apps_json, "env", manifest, launchers=launchers)
+    if launchers is not None:
+        launchers.write(manifest)
+    manifest.save()
+    return apps, manifest
+
+
+def run_launcher(launcher):
+    result = subprocess.run(
+        [str(launcher), "a b", "$HOME"], input="hello\n", check=True, stdout=subprocess.PIPE, text=True)
+    return result.stdout.replace(str(launcher.parent.parent), "<install>")
+
+
+def test_dispatched_launchers_run_like_generated_scripts(tmp_path, make_install):
+    apps_json = tmp_path / "apps.json"
+    apps_json.write_text(json.dumps(APPS_JSON))
+    scripts = make_install("scripts")
+    dispatched = make_install("dispatched")
+
+    script_apps, _ = build(scripts, apps_json)
+    build(dispatched, apps_json, LauncherTable(dispatched))
+
+    for app in script_apps:
+        launcher = dispatched / "bin" / app.sh_path.name
+        assert os.readlink(launcher) == str(dispatched / DISPATCHER)
+        assert run_launcher(launcher) == run_launcher(app.sh_path)
+    assert run_launcher(dispatched / "bin" / "fsleyesgui-fsl-6_0_7_16.sh") == (
+        "<fsl><6.0.7.16><fsleyes><--scene><ortho view><a b><$HOME> stdin=hello\n")
+    table = (dispatched / "bin" / LAUNCHER_TABLE).read_text().splitlines()
+    assert [line.split("\t")[0] for line in table] == ["fsl-6_0_7_16.sh", "fsleyesgui-fsl-6_0_7_16.sh"]
+
+
+def test_unchanged_dispatcher_build_writes_nothing(tmp_path, make_install):
+    apps_json = tmp_path / "apps.json"
+    apps_json.write_text(json.dumps(APPS_JSON))
+    installdir = make_install("install")
+    build(installdir, apps_json, LauncherTable(installdir))
+
+    _, manifest = build(installdir, apps_json, LauncherTable(installdir))
+
+    assert manifest.written == 0
+
+
+def test_switching_back_to_scripts_replaces_links(tmp_path, make_install):
+    apps_json = tmp_path / "apps.json"
+    apps_json.write_text(json.dumps(APPS_JSON))
+    installdir = make_install("install")
+    dispatcher = (installdir / DISPATCHER).read_text()
+    build(installdir, apps_json, LauncherTable(installdir))
+
+    apps, manifest = build(installdir, apps_json)
+    manifest.prune()
+
+    for app in apps:
+        assert not app.sh_path.is_symlink()
+        assert app.sh_path.read_text().startswith("#!/usr/bin/env bash\n")
+    assert (installdir / DISPATCHER).read_text() == dispatcher
+    assert not (installdir / "bin" / LAUNCHER_TABLE).exists()
+
+
+def test_multiline_command_keeps_a_script(make_install):
+    installdir = make_install("install")
+    launchers = LauncherTable(installdir)
+    app = NeurodeskApp(deskenv="cli", installdir=installdir, name="Help", launchers=launchers)
+    app.app_names()
+
+    app.add_app_sh("echo one\necho two")
+
+    assert not app.sh_path.is_symlink()
+    assert launchers.commands == {}
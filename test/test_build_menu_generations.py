@@ -0,0 +1,80 @@
+import pytest
+
+from neurodesk.build_menu import BuildManifest, apps_from_json
+from neurodesk.generations import Generations
+
+
+def stage_build(installdir, apps_json):
+    generations = Generations(installdir)
+    manifest = BuildManifest(installdir, generations.begin())
+    apps_from_json(False, "lxde", installdir, apps_json, manifest=manifest)
+    manifest.prune()
+    manifest.save()
+    return generations
+
+
+def test_staged_build_is_invisible_until_commit(installdir, write_apps):
+    stage_build(installdir, write_apps(["afni"])).commit()
+    launcher = installdir / "bin" / "afni-1_0.sh"
+
+    assert (installdir / "bin").is_symlink()
+    assert str(installdir / "fetch_and_run.sh") in launcher.read_text()
+    desktop = (installdir / "applications" / "afni-1_0.desktop").read_text()
+    assert f"Exec=/bin/bash {launcher}" in desktop
+
+    generations = stage_build(installdir, write_apps(["afni", "ants"]))
+    assert not (installdir / "bin" / "ants-1_0.sh").exists()
+    assert "Ants" not in (installdir / "neurodesk-applications.menu").read_text()
+
+    generations.commit()
+    assert (installdir / "bin" / "ants-1_0.sh").exists()
+    assert "Ants" in (installdir / "neurodesk-applications.menu").read_text()
+
+
+def test_unchanged_files_are_shared_with_the_previous_generation(installdir, write_apps):
+    stage_build(installdir, write_apps(["afni"])).commit()
+    first = (installdir / "bin" / "afni-1_0.sh").resolve()
+
+    stage_build(installdir, write_apps(["afni", "ants"])).commit()
+
+    current = (installdir / "bin" / "afni-1_0.sh").resolve()
+    assert current != first
+    assert current.stat().st_ino == first.stat().st_ino
+    assert not first.with_name("ants-1_0.sh").exists()
+
+
+def test_rollback_restores_the_previous_generation(installdir, write_apps):
+    stage_build(installdir, write_apps(["afni", "ants"])).commit()
+    with pytest.raises(RuntimeError):
+        Generations(installdir).rollback()
+
+    stage_build(installdir, write_apps(["afni"])).commit()
+    assert not (installdir / "bin" / "ants-1_0.sh").exists()
+
+    Generations(installdir).rollback()
+    assert (installdir / "bin" / "ants-1_0.sh").exists()
+    assert (installdir / "applications" / "ants-1_0.desktop").exists()
+
+
+def test_aborted_build_leaves_live_files_untouched(installdir, write_apps):
+    stage_build(installdir, write_apps(["afni"])).commit()
+    live = sorted(path.name for path in (installdir / "bin").iterdir())
+
+    stage_build(installdir, write_apps(["ants"])).abort()
+
+    assert sorted(path.name for path in (installdir / "bin").iterdir()) == live
+    assert not list((installdir / ".generations").glob(".staging-*"))
+
+
+def test_first_staged_build_migrates_real_directories(installdir, write_apps):
+    apps_json = write_apps(["afni"])
+    manifest = BuildManifest(installdir)
+    apps_from_json(False, "lxde", installdir, apps_json, manifest=manifest)
+    manifest.save()
+
+    stage_build(installdir, apps_json).commit()
+
+    for name in ("bin", "applications", "icons", "neurodesk-applications.menu"):
+        assert (installdir / name).is_symlink()
+    assert (installdir / "bin" / "afni-1_0.sh").exists()
+    assert Generations.in_use(installdir)
@@ -0,0 +1,59 @@
+import os
+
+from neurodesk.build_menu import ICON_STORE, BuildManifest, install_icon
+
+
+def make_icons(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "neurodesk.png").write_bytes(b"fallback icon")
+    (src / "afni.png").write_bytes(b"afni icon")
+    icons = tmp_path / "install" / "icons"
+    icons.mkdir(parents=True)
+    return src, icons
+
+
+def test_identical_icons_share_one_store_object(tmp_path):
+    src, icons = make_icons(tmp_path)
+
+    for name in ("alpha.png", "beta.png", "gamma.png"):
+        install_icon(src / "neurodesk.png", icons / name)
+    install_icon(src / "afni.png", icons / "afni.png")
+
+    store_objects = list((icons / ICON_STORE).iterdir())
+    assert len(store_objects) == 2
+    assert os.path.samefile(icons / "alpha.png", icons / "gamma.png")
+    assert not os.path.samefile(icons / "alpha.png", icons / "afni.png")
+    assert (icons / "beta.png").read_bytes() == b"fallback icon"
+    # The store never shares an inode with the source icons.
+    assert not any(os.path.samefile(obj, src / "neurodesk.png") for obj in store_objects)
+
+
+def test_reinstall_does_not_rewrite_linked_icons(tmp_path):
+    src, icons = make_icons(tmp_path)
+    manifest = BuildManifest(icons.parent)
+    install_icon(src / "afni.png", icons / "afni.png", manifest)
+    manifest.save()
+
+    manifest = BuildManifest(icons.parent)
+    install_icon(src / "afni.png", icons / "afni.png", manifest)
+
+    assert manifest.written == 0
+    assert manifest.skipped == 2
+
+
+def test_falls_back_to_symlink_then_copy(tmp_path, monkeypatch):
+    src, icons = make_icons(tmp_path)
+
+    def no_link(*args, **kwargs):
+        raise OSError("links not supported")
+
+    monkeypatch.setattr(os, "link", no_link)
+    install_icon(src / "afni.png", icons / "symlinked.png")
+    assert (icons / "symlinked.png").is_symlink()
+    assert (icons / "symlinked.png").read_bytes() == b"afni icon"
+
+    monkeypatch.setattr(os, "symlink", no_link)
+    install_icon(src / "afni.png", icons / "copied.png")
+    assert not (icons / "copied.png").is_symlink()
+    assert (icons / "copied.png").read_bytes() == b"afni icon"
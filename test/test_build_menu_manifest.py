@@ -0,0 +1,50 @@
+from neurodesk.build_menu import BuildManifest, NeurodeskApp
+
+
+def build_app(tmp_path, exec="fsleyes"):
+    (tmp_path / "icons").mkdir(exist_ok=True)
+    manifest = BuildManifest(tmp_path)
+    app = NeurodeskApp(
+        deskenv="lxde",
+        installdir=tmp_path,
+        name="fsleyesGUI-fsl 6.0.7.16",
+        category="fsl",
+        exec=exec,
+        manifest=manifest,
+    )
+    app.app_names()
+    app.add_app_sh()
+    app.add_app_menu()
+    manifest.save()
+    return app, manifest
+
+
+def test_unchanged_outputs_are_not_rewritten(tmp_path):
+    app, manifest = build_app(tmp_path)
+    assert manifest.written == 4
+    mtime = app.sh_path.stat().st_mtime_ns
+
+    app, manifest = build_app(tmp_path)
+    assert manifest.written == 0
+    assert manifest.skipped == 4
+    assert app.sh_path.stat().st_mtime_ns == mtime
+
+
+def test_changed_content_is_rewritten(tmp_path):
+    build_app(tmp_path)
+
+    app, manifest = build_app(tmp_path, exec="fsl")
+
+    assert manifest.written == 1
+    assert app.sh_path.read_text().rstrip().endswith('fsl "$@"')
+
+
+def test_externally_modified_output_is_restored(tmp_path):
+    app, _ = build_app(tmp_path)
+    expected = app.sh_path.read_text()
+    app.sh_path.write_text("#!/usr/bin/env bash\nexit 1\n")
+
+    app, manifest = build_app(tmp_path)
+
+    assert manifest.written == 1
+    assert app.sh_path.read_text() == expected
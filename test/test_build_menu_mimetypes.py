@@ -1,8 +1,9 @@
 import configparser
+import json
 from pathlib import Path
 import shlex
 
-from neurodesk.build_menu import EXEC_MIMETYPES, NeurodeskApp
+from neurodesk.build_menu import EXEC_MIMETYPES, NeurodeskApp, merge_mimeinfo_cache, write_applications_caches
 
 
 def make_app(tmp_path, name, exec):
@@ -84,3 +85,57 @@ def test_wrapper_script_omits_empty_exec_argument(tmp_path):
     command = Path(app.sh_path).read_text().splitlines()[1]
     assert command.endswith('fetch_and_run.sh tool_arm64 1.2.3 "$@"')
     assert "''" not in command
+
+
+def test_mimeinfo_cache_lists_newest_handler_first(tmp_path):
+    apps = [
+        make_app(tmp_path, "libreofficeWriterGUI-libreoffice 7.6.4", "lowriter"),
+        make_app(tmp_path, "libreofficeWriterGUI-libreoffice 26.2.4", "lowriter"),
+        make_app(tmp_path, "fsleyesGUI-fsl 6.0.7.16", "fsleyes"),
+    ]
+
+    write_applications_caches(tmp_path / "applications", apps)
+
+    cache = configparser.ConfigParser(interpolation=None)
+    cache.optionxform = str
+    cache.read(tmp_path / "applications" / "mimeinfo.cache")
+    assert cache["MIME Cache"]["application/msword"] == (
+        "neurodesk-libreofficewritergui-libreoffice-26_2_4.desktop;"
+        "neurodesk-libreofficewritergui-libreoffice-7_6_4.desktop;"
+    )
+    assert set(cache["MIME Cache"]) == set(EXEC_MIMETYPES["lowriter"])
+
+
+def test_desktop_summary_lists_every_entry(tmp_path):
+    app = make_app(tmp_path, "fsleyesGUI-fsl 6.0.7.16", "fsleyes")
+
+    write_applications_caches(tmp_path / "applications", [app])
+
+    summary = json.loads((tmp_path / "applications" / "neurodesk-desktop-entries.json").read_text())
+    entry = summary["entries"]["neurodesk-fsleyesgui-fsl-6_0_7_16.desktop"]
+    assert entry["Exec"] == f"/bin/bash {app.sh_path}"
+    assert entry["Categories"] == "libreoffice"
+
+
+def test_mimeinfo_cache_is_merged_into_the_appdir(tmp_path):
+    appdir = tmp_path / "share-applications"
+    appdir.mkdir()
+    (appdir / "mimeinfo.cache").write_text(
+        "[MIME Cache]\n"
+        "application/msword=writer.desktop;neurodesk-stale.desktop;\n"
+        "text/plain=gedit.desktop;\n"
+    )
+    app = make_app(tmp_path, "libreofficeWriterGUI-libreoffice 26.2.4", "lowriter")
+    write_applications_caches(tmp_path / "applications", [app])
+
+    assert merge_mimeinfo_cache(appdir, tmp_path / "applications")
+    assert not merge_mimeinfo_cache(appdir, tmp_path / "applications")
+
+    cache = configparser.ConfigParser(interpolation=None)
+    cache.optionxform = str
+    cache.read(appdir / "mimeinfo.cache")
+    assert cache["MIME Cache"]["application/msword"] == (
+        "writer.desktop;neurodesk-libreofficewritergui-libreoffice-26_2_4.desktop;"
+    )
+    assert cache["MIME Cache"]["text/plain"] == "gedit.desktop;"
+    assert set(cache["MIME Cache"]) == set(EXEC_MIMETYPES["lowriter"]) | {"text/plain"}
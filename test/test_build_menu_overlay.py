@@ -0,0 +1,148 @@
+import os
+import pwd
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from neurodesk.build_menu import (
+    OVERLAY_HELPER,
+    BuildManifest,
+    NeurodeskApp,
+    apps_from_json,
+    build_menu,
+    overlay_dir,
+    overlay_sh_prefix,
+)
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def system_layer(make_installdir):
+    """Return the system layer and the launcher of one app built into it."""
+    system = make_installdir("system")
+    shutil.copy(ROOT / "neurodesk" / OVERLAY_HELPER, system / OVERLAY_HELPER)
+    (system / "sh_prefix").write_text("env LAYER=system\n")
+    fetch_and_run = system / "fetch_and_run.sh"
+    fetch_and_run.write_text('#!/usr/bin/env bash\necho "${LAYER:-none}|$*"\n')
+    fetch_and_run.chmod(0o755)
+    app = NeurodeskApp(
+        deskenv="lxde",
+        installdir=system,
+        name="fsleyesGUI-fsl 6.0.7.16",
+        sh_prefix=overlay_sh_prefix(system),
+        exec="fsleyes",
+    )
+    app.app_names()
+    app.add_app_sh()
+    return system, app.sh_path
+
+
+def run_launcher(launcher, overlay):
+    env = dict(os.environ, NEURODESK_OVERLAY=str(overlay))
+    result = subprocess.run(
+        ["bash", str(launcher), "a b"], env=env, check=True, stdout=subprocess.PIPE, text=True)
+    return result.stdout.strip()
+
+
+def test_system_launcher_uses_system_prefix_without_overlay(tmp_path, system_layer):
+    _, launcher = system_layer
+
+    assert run_launcher(launcher, tmp_path / "overlay") == "system|fsl 6.0.7.16 fsleyes a b"
+
+
+def test_user_sh_prefix_replaces_system_prefix(tmp_path, system_layer):
+    _, launcher = system_layer
+    overlay = tmp_path / "overlay"
+    overlay.mkdir()
+    (overlay / "sh_prefix").write_text("env LAYER=user\n")
+
+    assert run_launcher(launcher, overlay) == "user|fsl 6.0.7.16 fsleyes a b"
+
+
+def test_user_override_runs_instead_of_launcher(tmp_path, system_layer):
+    system, launcher = system_layer
+    override = tmp_path / "overlay" / "overrides" / launcher.name
+    override.parent.mkdir(parents=True)
+    override.write_text('#!/usr/bin/env bash\necho "override|$4 $5"\n')
+    override.chmod(0o755)
+
+    assert run_launcher(launcher, tmp_path / "overlay") == "override|fsleyes a b"
+
+
+def test_overlay_links_system_layer_and_prunes_earlier_build(tmp_path, monkeypatch, system_layer, make_installdir, write_apps):
+    system, _ = system_layer
+    user = make_installdir("user", menu=False)
+    apps_json = write_apps(["afni"])
+    manifest = BuildManifest(user)
+    apps_from_json(True, "cli", user, apps_json, manifest=manifest)
+    manifest.save()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.ini").write_text("[neurodesk]\n")
+    monkeypatch.setenv("NEURODESK_OVERLAY", str(tmp_path / "overlay"))
+
+    build_menu(user, "lxde", "env LAYER=user", overlay_of=system)
+
+    assert os.readlink(user / "bin") == str(system / "bin")
+    assert os.readlink(user / "fetch_and_run.sh") == str(system / "fetch_and_run.sh")
+    assert not os.path.lexists(user / "applications")
+    assert (tmp_path / "overlay" / "sh_prefix").read_text() == "env LAYER=user\n"
+    assert (user / "config.ini").exists()
+
+
+def test_overlay_under_sudo_goes_to_the_invoking_user(tmp_path, monkeypatch, system_layer, make_installdir):
+    system, _ = system_layer
+    user = make_installdir("user", menu=False)
+    home = tmp_path / "home" / "alice"
+    home.mkdir(parents=True)
+    alice = pwd.struct_passwd(("alice", "x", os.getuid(), os.getgid(), "", str(home), "/bin/bash"))
+    monkeypatch.setattr(pwd, "getpwnam", {"alice": alice}.__getitem__)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.ini").write_text("[neurodesk]\n")
+    monkeypatch.delenv("NEURODESK_OVERLAY", raising=False)
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path / "root"))
+    monkeypatch.setenv("SUDO_USER", "alice")
+
+    build_menu(user, "lxde", "env LAYER=user", overlay_of=system)
+
+    overlay = home / ".config" / "neurodesk"
+    assert overlay_dir() == overlay
+    assert (overlay / "sh_prefix").read_text() == "env LAYER=user\n"
+    assert (overlay / "sh_prefix").stat().st_uid == os.getuid()
+    assert not (tmp_path / "root").exists()
+
+    monkeypatch.setenv("SUDO_USER", "nobody-known")
+    assert overlay_dir() == tmp_path / "root" / ".config" / "neurodesk"
+
+
+def test_system_layer_runs_compound_launcher_commands(tmp_path, system_layer):
+    system, _ = system_layer
+    app = NeurodeskApp(deskenv="cli", installdir=system, name="Update", sh_prefix=overlay_sh_prefix(system))
+    app.app_names()
+    app.add_app_sh(f"cd {system}; echo \"$LAYER|$PWD\"; echo done")
+
+    assert run_launcher(app.sh_path, tmp_path / "overlay").splitlines() == [f"system|{system}", "done"]
+
+
+def test_system_layer_update_launcher_runs_the_update(tmp_path, monkeypatch):
+    system = tmp_path / "system"
+    system.mkdir()
+    neurocommand = system / "neurocommand"
+    neurocommand.mkdir()
+    (neurocommand / "build.sh").write_text('echo "update $*"\n')
+    checkout = tmp_path / "checkout"
+    checkout.mkdir()
+    (checkout / "neurodesk").symlink_to(ROOT / "neurodesk")
+    (checkout / "config.ini").write_text("[neurodesk]\n")
+    monkeypatch.chdir(checkout)
+
+    build_menu(system, "cli", "env LAYER=system", system_layer=True)
+
+    env = dict(os.environ, NEURODESK_OVERLAY=str(tmp_path / "overlay"))
+    result = subprocess.run(
+        ["bash", str(system / "bin" / "update.sh")], env=env, input="\n", check=True, stdout=subprocess.PIPE, text=True)
+    assert result.stdout.strip() == "update --update --delta --runsudo"
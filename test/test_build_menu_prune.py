@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from neurodesk.build_menu import BuildManifest, apps_from_json
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def build(installdir, apps_json, prune="yes"):
+    manifest = BuildManifest(installdir)
+    apps_from_json(False, "lxde", installdir, apps_json, manifest=manifest)
+    result = None
+    if prune == "no":
+        manifest.keep_orphans()
+    else:
+        result = manifest.prune(dry_run=prune == "dry-run")
+    manifest.save()
+    return result
+
+
+def owned_files(installdir, name):
+    return [
+        installdir / "bin" / f"{name}-1_0.sh",
+        installdir / "applications" / f"{name}-1_0.desktop",
+        installdir / "desktop-directories" / "apps" / f"{name}.directory",
+    ]
+
+
+def test_removed_app_files_are_pruned(installdir, write_apps):
+    build(installdir, write_apps(["afni", "ants"]))
+    removed = owned_files(installdir, "ants")
+    expected_bytes = sum(path.stat().st_size for path in removed)
+
+    files, reclaimed = build(installdir, write_apps(["afni"]))
+
+    # The icon link is pruned too, but its store object is freed separately.
+    assert files == 5
+    assert reclaimed == expected_bytes + (ROOT / "neurodesk/icons/ants.png").stat().st_size
+    assert not any(path.exists() for path in removed)
+    assert not (installdir / "icons" / "ants.png").exists()
+    assert all(path.exists() for path in owned_files(installdir, "afni"))
+
+
+def test_dry_run_keeps_orphans_owned_until_pruned(installdir, write_apps):
+    build(installdir, write_apps(["afni", "ants"]))
+
+    files, _ = build(installdir, write_apps(["afni"]), prune="dry-run")
+    assert files == 5
+    assert all(path.exists() for path in owned_files(installdir, "ants"))
+
+    build(installdir, write_apps(["afni"]), prune="no")
+    files, _ = build(installdir, write_apps(["afni"]))
+    assert files == 5
+    assert not any(path.exists() for path in owned_files(installdir, "ants"))
+
+
+def test_modified_orphans_are_kept(installdir, write_apps):
+    build(installdir, write_apps(["afni", "ants"]))
+    launcher = installdir / "bin" / "ants-1_0.sh"
+    launcher.write_text("#!/usr/bin/env bash\necho customised\n")
+
+    files, _ = build(installdir, write_apps(["afni"]))
+
+    assert files == 4
+    assert launcher.read_text().endswith("customised\n")
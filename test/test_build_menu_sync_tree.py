@@ -0,0 +1,61 @@
+import os
+
+from neurodesk.build_menu import sync_tree
+
+
+def make_source(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "run.sh").write_text("#!/usr/bin/env bash\necho run\n")
+    (src / "run.sh").chmod(0o755)
+    (src / "sub" / "notes.txt").write_text("notes\n")
+    return src
+
+
+def test_first_sync_copies_files_with_mode_and_mtime(tmp_path):
+    src = make_source(tmp_path)
+    dest = tmp_path / "dest"
+
+    assert sync_tree(src, dest) == (2, 0)
+
+    assert (dest / "sub" / "notes.txt").read_text() == "notes\n"
+    assert (dest / "run.sh").stat().st_mode & 0o777 == 0o755
+    assert (dest / "run.sh").stat().st_mtime_ns == (src / "run.sh").stat().st_mtime_ns
+
+
+def test_unchanged_tree_is_not_touched(tmp_path):
+    src = make_source(tmp_path)
+    dest = tmp_path / "dest"
+    sync_tree(src, dest)
+    inode = (dest / "run.sh").stat().st_ino
+
+    assert sync_tree(src, dest) == (0, 0)
+    assert (dest / "run.sh").stat().st_ino == inode
+
+
+def test_changed_and_removed_files_are_synced(tmp_path):
+    src = make_source(tmp_path)
+    dest = tmp_path / "dest"
+    sync_tree(src, dest)
+    (src / "run.sh").write_text("#!/usr/bin/env bash\necho changed\n")
+    (src / "sub" / "notes.txt").unlink()
+    (dest / "local.txt").write_text("stale\n")
+
+    assert sync_tree(src, dest) == (1, 2)
+
+    assert "changed" in (dest / "run.sh").read_text()
+    assert not (dest / "sub" / "notes.txt").exists()
+    assert not (dest / "local.txt").exists()
+
+
+def test_checksum_detects_content_change_with_same_size_and_mtime(tmp_path):
+    src = make_source(tmp_path)
+    dest = tmp_path / "dest"
+    sync_tree(src, dest)
+    st = (src / "sub" / "notes.txt").stat()
+    (src / "sub" / "notes.txt").write_text("NOTES\n")
+    os.utime(src / "sub" / "notes.txt", ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert sync_tree(src, dest) == (0, 0)
+    assert sync_tree(src, dest, checksum=True) == (1, 0)
+    assert (dest / "sub" / "notes.txt").read_text() == "NOTES\n"
@@ -0,0 +1,74 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from neurodesk.build_menu import apps_from_json, newest_versions, parse_menu_versions
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("", None), ("all", None), ("latest", 1), ("Latest", 1), ("3", 3)],
+)
+def test_parse_menu_versions(value, expected):
+    assert parse_menu_versions(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "newest"])
+def test_parse_menu_versions_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_menu_versions(value)
+
+
+def test_newest_versions_ranks_by_version_not_rebuild_date():
+    apps = {
+        "demo 5.3.0": {"version": "20260818"},
+        "demoGUI-demo 5.3.0": {"version": "20260818"},
+        "demo 7.10.1": {"version": "20240101"},
+        "demo 7.9.0": {"version": "20230101"},
+    }
+
+    assert newest_versions(apps, 1) == {"7.10.1"}
+    assert newest_versions(apps, 2) == {"7.10.1", "7.9.0"}
+
+
+def test_latest_mode_keeps_launchers_for_every_version(tmp_path):
+    (tmp_path / "icons").mkdir()
+    (tmp_path / "desktop-directories").mkdir()
+    shutil.copyfile(
+        ROOT / "neurodesk" / "neurodesk-applications.menu",
+        tmp_path / "neurodesk-applications.menu",
+    )
+    apps_json = tmp_path / "apps.json"
+    apps_json.write_text(
+        json.dumps(
+            {
+                "demo": {
+                    "apps": {
+                        "demo 1.0": {"version": "20250101", "exec": ""},
+                        "viewerGUI-demo 1.0": {"version": "20250101", "exec": "viewer"},
+                        "demo 2.0": {"version": "20260101", "exec": ""},
+                        "viewerGUI-demo 2.0": {"version": "20260101", "exec": "viewer"},
+                    },
+                    "categories": ["programming"],
+                }
+            }
+        )
+    )
+
+    apps_from_json(False, "lxde", tmp_path, apps_json, menu_versions=1)
+
+    assert sorted(path.name for path in (tmp_path / "bin").iterdir()) == [
+        "demo-1_0.sh",
+        "demo-2_0.sh",
+        "viewergui-demo-1_0.sh",
+        "viewergui-demo-2_0.sh",
+    ]
+    assert sorted(path.name for path in (tmp_path / "applications").iterdir()) == [
+        "demo-2_0.desktop",
+        "viewergui-demo-2_0.desktop",
+    ]
@@ -0,0 +1,49 @@
+import json
+import shutil
+import xml.etree.ElementTree as et
+from pathlib import Path
+
+from benchmarks import bench_menu_xml
+from neurodesk.build_menu import apps_from_json
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_single_pass_menu_matches_per_submenu_rewrite(tmp_path):
+    submenus = bench_menu_xml.synthetic_submenus(12)
+
+    single_pass = bench_menu_xml.single_pass(submenus)
+    legacy = bench_menu_xml.legacy_per_submenu(submenus, tmp_path / "legacy.menu")
+
+    assert single_pass == legacy
+
+
+def test_apps_from_json_writes_menu_once_with_all_submenus(tmp_path):
+    shutil.copyfile(
+        ROOT / "neurodesk" / "neurodesk-applications.menu",
+        tmp_path / "neurodesk-applications.menu",
+    )
+    (tmp_path / "icons").mkdir()
+    (tmp_path / "desktop-directories").mkdir()
+    apps_json = tmp_path / "apps.json"
+    apps_json.write_text(
+        json.dumps(
+            {
+                "demo": {
+                    "apps": {"demo 1.0": {"version": "20260101", "exec": ""}},
+                    "categories": ["functional imaging", "programming"],
+                }
+            }
+        )
+    )
+
+    apps_from_json(False, "lxde", tmp_path, apps_json)
+
+    root = et.parse(tmp_path / "neurodesk-applications.menu").getroot()
+    parents = {
+        menu_el.find("Name").text
+        for menu_el in root.iter("Menu")
+        if any(child.findtext("Name") == "Demo" for child in menu_el.findall("Menu"))
+    }
+    assert parents == {"All Applications", "Functional Imaging", "Programming"}
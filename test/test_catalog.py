@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from neurodesk import catalog
+from neurodesk.catalog import Catalog
+
+
+APPS = {
+    "fsl": {
+        "apps": {
+            "fsl 6.0.7.16": {"version": "20250101", "exec": ""},
+            "fsleyesGUI-fsl 6.0.7.16": {"version": "20250101", "exec": "fsleyes"},
+        },
+        "categories": ["functional imaging", "structural imaging"],
+    },
+    "hidden": {
+        "apps": {
+            "hidden 1.0": {"version": "20240101", "exec": ""},
+            "hidden 2.0": {"version": "20240202", "exec": "", "show_in_menu": True},
+        },
+        "categories": ["programming"],
+        "show_in_menu": False,
+        "show_in_applist": False,
+    },
+}
+
+
+def test_indexes_apps_by_container_version_and_category():
+    apps = Catalog(APPS)
+
+    assert [app.name for app in apps] == [
+        "fsl 6.0.7.16", "fsleyesGUI-fsl 6.0.7.16", "hidden 1.0", "hidden 2.0"]
+    assert [app.name for app in apps.by_container_version["fsl", "6.0.7.16"]] == [
+        "fsl 6.0.7.16", "fsleyesGUI-fsl 6.0.7.16"]
+    assert len(apps.by_category["programming"]) == 2
+    assert apps.builddate("hidden", "2.0") == "20240202"
+    assert apps.builddate("hidden", "3.0") == ""
+
+
+def test_gui_sub_app_runs_in_its_container_but_is_not_primary():
+    app = Catalog(APPS).get("fsleyesGUI-fsl 6.0.7.16")
+
+    assert (app.container, app.version, app.builddate) == ("fsl", "6.0.7.16", "20250101")
+    assert app.app_id == "fsleyesGUI-fsl_6.0.7.16"
+    assert not app.primary
+    assert Catalog(APPS).by_image["fsl_6.0.7.16_20250101"].name == "fsl 6.0.7.16"
+
+
+def test_apps_inherit_menu_visibility():
+    apps = Catalog(APPS)
+
+    assert not apps.get("hidden 1.0").show_in_menu
+    assert apps.get("hidden 2.0").show_in_menu
+    assert not apps.get("hidden 2.0").show_in_applist
+    assert apps.get("fsl 6.0.7.16").show_in_applist
+
+
+def test_load_reuses_the_catalog_until_apps_json_changes(tmp_path):
+    appsjson = tmp_path / "apps.json"
+    appsjson.write_text(json.dumps(APPS))
+
+    first = catalog.load(appsjson)
+    assert catalog.load(appsjson) is first
+
+    appsjson.write_text(json.dumps({"fsl": APPS["fsl"]}))
+    assert [app.name for app in catalog.load(appsjson)] == ["fsl 6.0.7.16", "fsleyesGUI-fsl 6.0.7.16"]
+
+
+def test_load_rejects_a_non_object(tmp_path):
+    appsjson = tmp_path / "apps.json"
+    appsjson.write_text("[]")
+
+    with pytest.raises(ValueError, match="must contain a JSON object"):
+        catalog.load(appsjson)
@@ -1,5 +1,7 @@
+import gzip
 import json
 from pathlib import Path
+import shlex
 import subprocess
 
 from cvmfs import json_gen
@@ -25,6 +27,26 @@ def test_checked_in_applist_matches_current_log(tmp_path):
     assert json.loads(APPLIST.read_text()) == json.loads(generated_applist.read_text())
 
 
+def test_publish_artifacts_writes_compressed_copies_once(tmp_path):
+    applist = tmp_path / "applist.json"
+    log = tmp_path / "log.txt"
+    applist.write_text(json.dumps({"list": [{"application": "afni_1_2", "categories": ["x"]}]}, indent=4))
+    log.write_text("afni_1_2 categories:x,\n")
+
+    manifest = json_gen.publish_artifacts([applist, log])
+
+    assert (tmp_path / "applist.min.json").read_text() == '{"list":[{"application":"afni_1_2","categories":["x"]}]}'
+    assert json.loads(gzip.decompress((tmp_path / "applist.min.json.gz").read_bytes())) == json.loads(applist.read_text())
+    assert gzip.decompress((tmp_path / "log.txt.gz").read_bytes()) == log.read_bytes()
+    assert manifest["log.txt.gz"]["content"] == "log.txt"
+    assert manifest["log.txt.gz"]["encoding"] == "gzip"
+    assert json.loads((tmp_path / "manifest.json").read_text()) == manifest
+
+    mtime = (tmp_path / "log.txt.gz").stat().st_mtime_ns
+    assert json_gen.publish_artifacts([applist, log]) == manifest
+    assert (tmp_path / "log.txt.gz").stat().st_mtime_ns == mtime
+
+
 def test_hidden_app_remains_hidden_after_build_date_changes(tmp_path):
     apps_json = tmp_path / "apps.json"
     log = tmp_path / "log.txt"
@@ -69,10 +91,47 @@ def test_stratum_sync_publishes_log_and_applist_together():
     script = SYNC_SCRIPT.read_text()
 
     assert 'python3 "$repo_path/cvmfs/json_gen.py"' in script
-    assert 'local generated_rel_paths=("cvmfs/log.txt" "cvmfs/applist.json")' in script
+    assert 'GENERATED_METADATA=("cvmfs/log.txt" "cvmfs/applist.json" "cvmfs/log.changes.jsonl")' in script
+    assert 'for path in "${GENERATED_METADATA[@]}"; do' in script
     assert 'git -C "$repo_path" add "${generated_rel_paths[@]}"' in script
 
 
+def sync_state_is_current(repo, state, seq):
+    script = f"""
+eval "$(sed -n -e '/^GENERATED_METADATA=/p' -e '/^sync_state_is_current()/,/^}}/p' {shlex.quote(str(SYNC_SCRIPT))})"
+sync_state_is_current {shlex.quote(str(repo))} {shlex.quote(str(state))} {shlex.quote(seq)}
+"""
+    return subprocess.run(["bash", "-c", script]).returncode == 0
+
+
+def commit(repo, path, text):
+    (repo / path).parent.mkdir(parents=True, exist_ok=True)
+    (repo / path).write_text(text)
+    subprocess.run(["git", "add", path], cwd=repo, check=True)
+    subprocess.run(
+        ["git", "-c", "user.name=Sync Test", "-c", "user.email=test@example.com", "commit", "--quiet", "-m", path],
+        cwd=repo, check=True)
+    return subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def test_sync_state_ignores_the_metadata_commit_of_the_sync(tmp_path):
+    repo = tmp_path / "neurocommand"
+    repo.mkdir()
+    subprocess.run(["git", "init", "--quiet"], cwd=repo, check=True)
+    synced = commit(repo, "build.sh", "echo build\n")
+    state = tmp_path / "sync-state"
+    state.write_text(f"3 {synced}\n")
+
+    assert sync_state_is_current(repo, state, "3")
+    commit(repo, "cvmfs/log.txt", "afni_1_2 categories:x,\n")
+    commit(repo, "cvmfs/log.changes.jsonl", "{}\n")
+    assert sync_state_is_current(repo, state, "3")
+    assert not sync_state_is_current(repo, state, "4")
+    commit(repo, "neurodesk/transparent-singularity/ts.sh", "echo\n")
+    assert not sync_state_is_current(repo, state, "3")
+    assert not sync_state_is_current(repo, tmp_path / "missing", "3")
+
+
 def test_stratum_sync_uses_tested_retrieval_scripts_without_nectar_gate():
     script = SYNC_SCRIPT.read_text()
 
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import http.server
+import json
+import threading
+
+import pytest
+
+from neurodesk.update import STATE_FILE, delta_update
+
+
+class RepoHandler(http.server.BaseHTTPRequestHandler):
+    files = {}
+    requests = []
+
+    def do_GET(self):
+        name = self.path.lstrip("/")
+        self.requests.append((name, self.headers.get("If-None-Match")))
+        if name not in self.files:
+            self.send_error(404)
+            return
+        data = self.files[name]
+        etag = f'"{hashlib.sha1(data).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = gzip.compress(data) if "gzip" in self.headers.get("Accept-Encoding", "") else data
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        if body is not data:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    RepoHandler.files = {}
+    RepoHandler.requests = []
+    httpd = http.server.HTTPServer(("127.0.0.1", 0), RepoHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", RepoHandler
+    httpd.shutdown()
+
+
+def test_only_changed_files_are_replaced(tmp_path, server):
+    url, handler = server
+    files = ("neurodesk/apps.json", "neurodesk/fetch_and_run.sh")
+    (tmp_path / "neurodesk").mkdir()
+    (tmp_path / "neurodesk" / "apps.json").write_text("{}")
+    handler.files = {files[0]: json.dumps({"afni": {}}).encode(), files[1]: b"#!/usr/bin/env bash\n"}
+
+    assert delta_update(tmp_path, url, files) == list(files)
+    assert (tmp_path / files[0]).read_text() == '{"afni": {}}'
+    assert (tmp_path / files[1]).stat().st_mode & 0o777 == 0o755
+
+    handler.requests.clear()
+    assert delta_update(tmp_path, url, files) == []
+    assert all(etag for _, etag in handler.requests)
+
+    handler.files[files[0]] = json.dumps({"afni": {}, "fsl": {}}).encode()
+    assert delta_update(tmp_path, url, files) == [files[0]]
+
+
+def test_locally_modified_file_is_fetched_again(tmp_path, server):
+    url, handler = server
+    files = ("neurodesk/apps.json",)
+    (tmp_path / "neurodesk").mkdir()
+    handler.files = {files[0]: b'{"afni": {}}'}
+    delta_update(tmp_path, url, files)
+    (tmp_path / files[0]).write_text("{}")
+
+    handler.requests.clear()
+    assert delta_update(tmp_path, url, files) == list(files)
+    assert handler.requests == [(files[0], None)]
+    assert json.loads((tmp_path / STATE_FILE).read_text())[files[0]]["etag"]
+
+
+def test_missing_file_raises(tmp_path, server):
+    url, _ = server
+    (tmp_path / "neurodesk").mkdir()
+
+    with pytest.raises(OSError):
+        delta_update(tmp_path, url, ("neurodesk/apps.json",))
@@ -1,7 +1,12 @@
+import json
+import os
 import shlex
 import subprocess
 from pathlib import Path
 
+from neurodesk import catalog
+from neurodesk.build_menu import write_builddate_table
+
 
 ROOT = Path(__file__).resolve().parents[1]
 SCRIPT = ROOT / "neurodesk" / "fetch_and_run.sh"
@@ -35,6 +40,7 @@ container_bin={shlex.quote(str(container_bin))}
 local_containers={shlex.quote(str(local_containers))}
 export calls container_bin local_containers
 export NEURODESKTOP_LOCAL_CONTAINERS="$local_containers"
+export XDG_CACHE_HOME={shlex.quote(str(tmp_path / "cache"))}
 
 module() {{
     printf '%s\\n' "$*" >> "$calls"
@@ -75,6 +81,59 @@ grep -qx -- '--ignore-cache avail demo/1.0' "$calls"
     assert result.returncode == 0, result.stderr + result.stdout
 
 
+def test_fetch_and_run_finds_installed_module_in_index_without_lmod(tmp_path):
+    calls = tmp_path / "module-calls.log"
+    container_bin = tmp_path / "demo_1.0"
+    local_containers = tmp_path / "neurodesktop-containers"
+    module_index = tmp_path / "cache" / "neurodesk" / "module-avail.tsv"
+    container_bin.mkdir()
+    (local_containers / "modules" / "demo").mkdir(parents=True)
+    (local_containers / "modules" / "demo" / "1.0").write_text("")
+
+    script = f"""
+set -euo pipefail
+calls={shlex.quote(str(calls))}
+container_bin={shlex.quote(str(container_bin))}
+local_containers={shlex.quote(str(local_containers))}
+export calls container_bin local_containers
+export NEURODESKTOP_LOCAL_CONTAINERS="$local_containers"
+export XDG_CACHE_HOME={shlex.quote(str(tmp_path / "cache"))}
+
+module() {{
+    printf '%s\\n' "$*" >> "$calls"
+    case "$1" in
+        use)
+            return 0
+            ;;
+        --ignore-cache)
+            printf '%s\\n' "$3"
+            return 0
+            ;;
+        load)
+            if [[ "$2" == "demo/1.0" ]]; then
+                export PATH="$container_bin:$PATH"
+                return 0
+            fi
+            ;;
+    esac
+    printf 'unexpected module call: %s\\n' "$*" >&2
+    return 42
+}}
+export -f module
+
+bash {shlex.quote(str(SCRIPT))} demo 1.0 true
+! grep -q -- 'avail' "$calls"
+rm "$local_containers/modules/demo/1.0"
+bash {shlex.quote(str(SCRIPT))} demo 1.0 true
+grep -qx -- '--ignore-cache avail demo/1.0' "$calls"
+"""
+
+    result = run_bash(script)
+
+    assert result.returncode == 0, result.stderr + result.stdout
+    assert module_index.read_text().splitlines()[1:] == []
+
+
 def test_fetch_and_run_explicit_builddate_enforces_dated_container(tmp_path):
     isolated_neurodesk = tmp_path / "neurodesk"
     isolated_neurodesk.mkdir()
@@ -112,6 +171,7 @@ new_container={shlex.quote(str(new_container))}
 local_containers={shlex.quote(str(local_containers))}
 export calls fetch_marker old_container new_container local_containers
 export NEURODESKTOP_LOCAL_CONTAINERS="$local_containers"
+export XDG_CACHE_HOME={shlex.quote(str(tmp_path / "cache"))}
 
 module() {{
     printf '%s\\n' "$*" >> "$calls"
@@ -151,6 +211,40 @@ grep -qx -- 'fetch demo 1.0 20260519' "$calls"
     assert result.returncode == 0, result.stderr + result.stdout
 
 
+def resolve_builddate(base, name, version):
+    script = f"""
+_base={shlex.quote(str(base))}
+eval "$(sed -n '/^resolve_builddate()/,/^}}/p' {shlex.quote(str(SCRIPT))})"
+resolve_builddate {shlex.quote(name)} {shlex.quote(version)}
+"""
+    result = run_bash(script)
+    assert result.returncode == 0, result.stderr + result.stdout
+    return result.stdout.strip()
+
+
+def test_resolve_builddate_reads_the_table_written_next_to_apps_json(tmp_path):
+    apps_json = tmp_path / "apps.json"
+    apps_json.write_text(json.dumps({
+        "demo": {"apps": {
+            "demo 1.0": {"version": "20260519", "exec": ""},
+            "demoGUI-demo 1.0": {"version": "20260519", "exec": "demo-gui"},
+        }},
+        "niftyreg": {"apps": {"niftyreg 1.4.0": {"version": "20220819", "exec": ""}}},
+    }))
+    write_builddate_table(tmp_path / "builddates.tsv", catalog.load(apps_json))
+    lines = (tmp_path / "builddates.tsv").read_text().splitlines()
+
+    assert lines[1:] == sorted(lines[1:])
+    assert resolve_builddate(tmp_path, "niftyreg", "1.4.0") == "20220819"
+    assert resolve_builddate(tmp_path, "demo", "1.0") == "20260519"
+    assert resolve_builddate(tmp_path, "demo", "2.0") == ""
+
+    # A table older than apps.json is not trusted.
+    (tmp_path / "builddates.tsv").write_text("demo\t1.0\t20990101\n")
+    os.utime(tmp_path / "builddates.tsv", (0, 0))
+    assert resolve_builddate(tmp_path, "demo", "1.0") == "20260519"
+
+
 def test_fetch_containers_rejects_missing_builddate():
     result = subprocess.run(
         ["bash", str(FETCH_CONTAINERS), "brainvisa", "6.0.36"],
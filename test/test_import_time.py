@@ -0,0 +1,19 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.bench_import_time import LAZY_MODULES
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_cli_startup_does_not_import_lazy_modules():
+    code = (
+        "import sys, neurodesk.neurodesk\n"
+        f"print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, check=True, stdout=subprocess.PIPE, text=True)
+
+    assert result.stdout.strip() == ""
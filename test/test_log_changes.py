@@ -0,0 +1,59 @@
+import json
+
+from neurodesk import catalog
+from neurodesk.log_changes import EXIT_RESYNC, changes_since, main, read_changes
+from neurodesk.write_log import write_log
+
+
+def write_apps(path, apps):
+    path.write_text(json.dumps({
+        name: {
+            "apps": {f"{name} {version}": {"version": builddate, "exec": ""}},
+            "categories": categories,
+        }
+        for name, version, builddate, categories in apps
+    }))
+    return catalog.load(path)
+
+
+def test_each_log_revision_appends_its_changes(tmp_path):
+    apps_json, log, journal = tmp_path / "apps.json", tmp_path / "log.txt", tmp_path / "log.changes.jsonl"
+
+    write_log(log, write_apps(apps_json, [("afni", "24.3.00", "20241003", ["functional imaging"])]), journal)
+    write_log(log, write_apps(apps_json, [
+        ("afni", "24.3.00", "20241003", ["functional imaging", "programming"]),
+        ("fsl", "6.0.7.22", "20250901", ["structural imaging"]),
+    ]), journal)
+    assert not write_log(log, catalog.load(apps_json), journal)
+    write_log(log, write_apps(apps_json, [("fsl", "6.0.7.22", "20250901", ["structural imaging"])]), journal)
+
+    entries = read_changes(journal)
+    assert [entry["seq"] for entry in entries] == [1, 2, 3]
+    assert entries[0]["added"] == ["afni_24.3.00_20241003"]
+    assert entries[1] == dict(
+        entries[1], added=["fsl_6.0.7.22_20250901"], changed=["afni_24.3.00_20241003"], removed=[])
+    assert entries[2]["removed"] == ["afni_24.3.00_20241003"]
+
+
+def test_changes_since_nets_out_entries_and_detects_gaps():
+    entries = [
+        {"seq": 4, "added": ["a_1_20250101", "b_1_20250101"], "removed": [], "changed": []},
+        {"seq": 5, "added": [], "removed": ["a_1_20250101", "c_1_20240101"], "changed": ["b_1_20250101"]},
+        {"seq": 6, "added": ["c_1_20240101"], "removed": [], "changed": []},
+    ]
+
+    assert changes_since(entries, 3) == {"added": ["b_1_20250101"], "removed": [], "changed": ["c_1_20240101"]}
+    assert changes_since(entries, 5) == {"added": ["c_1_20240101"], "removed": [], "changed": []}
+    assert changes_since(entries, 6) == {"added": [], "removed": [], "changed": []}
+    assert changes_since(entries, 2) is None
+    assert changes_since(entries, 7) is None
+
+
+def test_cli_prints_changes_or_asks_for_a_full_resync(tmp_path, capsys):
+    journal = tmp_path / "log.changes.jsonl"
+    journal.write_text(json.dumps({"seq": 1, "added": ["a_1_20250101"], "removed": ["b_1_20240101"], "changed": []}) + "\n")
+
+    assert main(["--journal", str(journal), "--after", "0"]) == 0
+    assert main(["--journal", str(journal), "--last-seq"]) == 0
+    assert capsys.readouterr().out == "added a_1_20250101\nremoved b_1_20240101\n1\n"
+    assert main(["--journal", str(journal), "--after", "2"]) == EXIT_RESYNC
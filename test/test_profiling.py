@@ -0,0 +1,23 @@
+import json
+
+from neurodesk import profiling
+
+
+def test_phases_are_consecutive_and_reported(tmp_path):
+    profiler = profiling.enable()
+    try:
+        profiling.phase("first")
+        profiling.phase("second")
+    finally:
+        profiling.disable()
+    profiler.write(tmp_path / "profile.json")
+
+    report = json.loads((tmp_path / "profile.json").read_text())
+    assert [phase["name"] for phase in report["phases"]] == ["first", "second"]
+    assert report["wall_seconds"] >= sum(phase["wall_seconds"] for phase in report["phases"]) - 1e-6
+    assert all(phase["cpu_seconds"] >= 0 for phase in report["phases"])
+
+
+def test_phase_without_profiler_is_a_no_op():
+    profiling.phase("ignored")
+    assert profiling._active is None
@@ -0,0 +1,107 @@
+import json
+import os
+from pathlib import Path
+import subprocess
+
+from neurodesk.search import ContainerIndex, main
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+LOG = """\
+afni_24.3.00_20250101 categories:functional imaging,
+fsl_6.0.7.16_20250101 categories:diffusion imaging,functional imaging,
+fsl_gpu_arm64_6.0.7_20260721 categories:diffusion imaging,
+mrtrix3_3.0.4_20240101 categories:diffusion imaging,
+"""
+
+COMMANDS = """\
+3dcalc\tafni/24.3.00/20250101
+dwi2fsl\tmrtrix3/3.0.4/20240101
+fslmaths\tfsl/6.0.7.16/20250101 fsl_gpu_arm64/6.0.7/20260721
+"""
+
+
+def write_sources(tmp_path):
+    log = tmp_path / "log.txt"
+    commands = tmp_path / "command-index.tsv"
+    log.write_text(LOG)
+    commands.write_text(COMMANDS)
+    return log, commands
+
+
+def images(matches):
+    return [build.image for _, build, _ in matches]
+
+
+def test_tool_matches_rank_above_categories_and_commands(tmp_path):
+    index = ContainerIndex.from_sources(*write_sources(tmp_path))
+
+    matches = index.search("fsl")
+
+    assert images(matches) == [
+        "fsl_6.0.7.16_20250101", "fsl_gpu_arm64_6.0.7_20260721", "mrtrix3_3.0.4_20240101"]
+    assert [score for score, _, _ in matches] == [100, 50, 5]
+    assert matches[2][2] == ["dwi2fsl"]
+
+
+def test_every_term_has_to_match(tmp_path):
+    index = ContainerIndex.from_sources(*write_sources(tmp_path))
+
+    assert images(index.search("diffusion fslmaths")) == [
+        "fsl_6.0.7.16_20250101", "fsl_gpu_arm64_6.0.7_20260721"]
+    assert images(index.search("functional_imaging 24")) == ["afni_24.3.00_20250101"]
+    assert images(index.search("3d")) == ["afni_24.3.00_20250101"]
+    assert index.search("freesurfer") == []
+
+
+def test_empty_query_lists_builds_in_log_order_within_categories(tmp_path):
+    index = ContainerIndex.from_sources(*write_sources(tmp_path))
+
+    assert images(index.search()) == [line.split()[0] for line in LOG.splitlines()]
+    assert images(index.search("", ["Diffusion_Imaging"])) == [
+        "fsl_6.0.7.16_20250101", "fsl_gpu_arm64_6.0.7_20260721", "mrtrix3_3.0.4_20240101"]
+
+
+def test_tool_only_search_ignores_categories_and_commands(tmp_path):
+    index = ContainerIndex.from_sources(*write_sources(tmp_path))
+
+    assert [build.image for build in index.search_tools("fsl")] == [
+        "fsl_6.0.7.16_20250101", "fsl_gpu_arm64_6.0.7_20260721"]
+    assert index.search_tools("diffusion") == []
+    assert index.search_tools("FSL") == []
+    assert len(index.search_tools()) == len(LOG.splitlines())
+
+
+def test_tool_only_cli_lists_tool_matches_in_log_order(tmp_path, capsys):
+    log, commands = write_sources(tmp_path)
+
+    assert main(["--tool-only", "--no-cache", "--log", str(log), "--commands", str(commands), "3"]) == 0
+    assert [line.split("\t")[0] for line in capsys.readouterr().out.splitlines()] == ["mrtrix3"]
+
+
+def test_cached_index_is_rebuilt_when_the_log_changes(tmp_path):
+    log, commands = write_sources(tmp_path)
+    cache = tmp_path / "cache" / "search-index"
+
+    ContainerIndex.load(log, commands, cache)
+    assert cache.exists()
+    assert images(ContainerIndex.load(log, commands, cache).search("afni")) == ["afni_24.3.00_20250101"]
+
+    log.write_text(LOG + "afni_25.0.00_20250601 categories:functional imaging,\n")
+    assert images(ContainerIndex.load(log, commands, cache).search("afni")) == [
+        "afni_24.3.00_20250101", "afni_25.0.00_20250601"]
+
+
+def test_containers_sh_prints_json(tmp_path):
+    env = dict(os.environ, XDG_CACHE_HOME=str(tmp_path / "cache"))
+
+    result = subprocess.run(
+        ["bash", "containers.sh", "--json", "mrtrix3", "--category", "diffusion imaging"],
+        cwd=ROOT, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    matches = json.loads(result.stdout)
+    assert matches[0]["tool"] == "mrtrix3"
+    assert all(entry["tool"].startswith("mrtrix3") for entry in matches)
+    assert all("diffusion imaging" in entry["categories"] for entry in matches)
@@ -30,7 +30,7 @@ MENU = """<!DOCTYPE Menu PUBLIC "-//freedesktop//DTD Menu 1.0//EN"
 
 BUILD_MENU = """def build_menu(installdir):
     if installdir:
-        write_directory_file("Existing Imaging", directories_path, icon_dir)
+        write_directory_file("Existing Imaging", directories_path, icon_dir, manifest)
 
     appsjson = Path("neurodesk/apps.json")
 """
@@ -95,7 +95,7 @@ def test_sync_adds_new_category_to_every_required_location(tmp_path):
     assert "<Name>Fetal Imaging</Name>" in menu.read_text()
     assert "<Category>fetal-imaging</Category>" in menu.read_text()
     assert (
-        'write_directory_file("Fetal Imaging", directories_path, icon_dir)'
+        'write_directory_file("Fetal Imaging", directories_path, icon_dir, manifest)'
         in build_menu.read_text()
     )
     assert '    "Fetal Imaging",' in icon_test.read_text()
@@ -1,8 +1,11 @@
 import os
 import shutil
 import subprocess
+import sys
 from pathlib import Path
 
+from neurodesk.update import delta_update
+
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -156,3 +159,117 @@ def test_image_build_does_not_patch_tracked_neurocommand_scripts():
     ]
 
     assert fetch_script_rewrites == []
+
+
+def test_delta_update_skips_git_pull(tmp_path):
+    _, work, upstream = make_update_fixture(tmp_path)
+    push_upstream_fetch_and_run_update(upstream)
+    head = run(["git", "rev-parse", "HEAD"], cwd=work).stdout
+    env = python_noop_env(tmp_path)
+
+    result = subprocess.run(
+        ["bash", "build.sh", "--update", "--delta", "--cli"],
+        cwd=work,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr + result.stdout
+    assert run(["git", "rev-parse", "HEAD"], cwd=work).stdout == head
+
+
+def test_failed_delta_update_falls_back_to_git_pull(tmp_path):
+    _, work, upstream = make_update_fixture(tmp_path)
+    push_upstream_fetch_and_run_update(upstream)
+    env = python_noop_env(tmp_path)
+    (tmp_path / "bin" / "python3").write_text(
+        '#!/bin/sh\n[ "$2" = neurodesk.update ] && exit 1\nexit 0\n')
+
+    result = subprocess.run(
+        ["bash", "build.sh", "--update", "--delta", "--cli"],
+        cwd=work,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr + result.stdout
+    assert "Delta update failed" in result.stdout
+    assert run(["git", "rev-parse", "HEAD"], cwd=work).stdout == run(
+        ["git", "rev-parse", "origin/main"], cwd=work
+    ).stdout
+
+
+def commit_upstream_apps_json(upstream, data):
+    (upstream / "neurodesk" / "apps.json").write_text(data)
+    run(["git", "add", "neurodesk/apps.json"], cwd=upstream)
+    run(
+        [
+            "git",
+            "-c",
+            "user.name=Neurocommand Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "--quiet",
+            "-m",
+            "update apps.json",
+        ],
+        cwd=upstream,
+    )
+    run(["git", "push", "--quiet", "origin", "HEAD:main"], cwd=upstream)
+
+
+def test_full_update_after_delta_update_does_not_conflict(tmp_path):
+    _, work, upstream = make_update_fixture(tmp_path)
+    commit_upstream_apps_json(upstream, '{"afni": {}}\n')
+    run(["git", "pull", "--quiet"], cwd=work)
+    commit_upstream_apps_json(upstream, '{"fsl": {}}\n')
+    env = python_noop_env(tmp_path)
+    env["PYTHONPATH"] = str(ROOT)
+    (tmp_path / "bin" / "python3").write_text(
+        f'#!/bin/sh\n[ "$2" = neurodesk.update ] && exec {sys.executable} "$@"\nexit 0\n')
+
+    # The delta update fetches the upstream apps.json into the checkout ...
+    delta_update(work, upstream.as_uri(), ("neurodesk/apps.json",))
+    assert (work / "neurodesk" / "apps.json").read_text() == '{"fsl": {}}\n'
+    # ... and upstream changes it again before the next full update.
+    commit_upstream_apps_json(upstream, '{"fsl": {}, "spm": {}}\n')
+
+    result = subprocess.run(
+        ["bash", "build.sh", "--update", "--cli"],
+        cwd=work,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr + result.stdout
+    assert (work / "neurodesk" / "apps.json").read_text() == '{"fsl": {}, "spm": {}}\n'
+    assert run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=work).stdout == ""
+    assert run(["git", "stash", "list"], cwd=work).stdout == ""
+
+
+def test_full_update_pulls_when_delta_files_cannot_be_listed(tmp_path):
+    _, work, upstream = make_update_fixture(tmp_path)
+    push_upstream_fetch_and_run_update(upstream)
+    env = python_noop_env(tmp_path)
+    pythonpath = tmp_path / "pythonpath"
+    (tmp_path / "bin" / "python3").write_text(
+        f'#!/bin/sh\n[ "$2" = neurodesk.update ] && echo "$PYTHONPATH" > {pythonpath} && exit 1\nexit 0\n')
+
+    result = subprocess.run(
+        ["bash", str(work / "build.sh"), "--update", "--cli"],
+        cwd=work,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr + result.stdout
+    assert "Could not list the files of an earlier delta update" in result.stdout
+    assert pythonpath.read_text().strip().split(":")[0] == str(work)
+    assert run(["git", "rev-parse", "HEAD"], cwd=work).stdout == run(
+        ["git", "rev-parse", "origin/main"], cwd=work
+    ).stdout
@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from neurodesk.build_menu import InvalidAppMenuError
+from neurodesk.watch import InotifyWatcher, PollWatcher, catalog_delta, watch_catalog
+
+
+CATALOG = {
+    "fsl": {"apps": {"fsl 6.0.7.16": {"version": "1", "exec": ""}}},
+    "afni": {"apps": {"afni 24.3.00": {"version": "1", "exec": ""}}},
+}
+
+
+def write_json(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def test_catalog_delta_lists_added_removed_and_changed_apps():
+    new = json.loads(json.dumps(CATALOG))
+    new["fsl"]["apps"]["fsl 6.0.7.18"] = {"version": "1", "exec": ""}
+    del new["afni"]
+    new["fsl"]["categories"] = ["functional imaging"]
+
+    assert catalog_delta(CATALOG, new) == {
+        "added": ["fsl 6.0.7.18"],
+        "removed": ["afni 24.3.00"],
+        "changed": ["fsl 6.0.7.16"],
+    }
+
+
+def test_poll_watcher_sees_replaced_file(tmp_path):
+    appsjson = tmp_path / "apps.json"
+    write_json(appsjson, CATALOG)
+    watcher = PollWatcher(appsjson, interval=0.01)
+
+    assert not watcher.wait(0.05)
+    write_json(appsjson, {})
+    assert watcher.wait(1.0)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watcher_ignores_other_files(tmp_path):
+    appsjson = tmp_path / "apps.json"
+    write_json(appsjson, CATALOG)
+    watcher = InotifyWatcher(appsjson)
+    try:
+        (tmp_path / "webapps.json").write_text("{}")
+        assert not watcher.wait(0.1)
+        write_json(appsjson, {})
+        assert watcher.wait(1.0)
+    finally:
+        watcher.close()
+
+
+def test_watch_rebuilds_only_when_apps_change(tmp_path):
+    appsjson = tmp_path / "apps.json"
+    write_json(appsjson, CATALOG)
+    stop = threading.Event()
+    rebuilds = []
+    watcher = PollWatcher(appsjson, interval=0.01)
+    thread = threading.Thread(
+        target=watch_catalog, args=(appsjson, lambda: rebuilds.append(time.monotonic()), watcher, stop, 0.05))
+    thread.start()
+    try:
+        write_json(appsjson, CATALOG)
+        time.sleep(0.3)
+        assert rebuilds == []
+
+        write_json(appsjson, dict(CATALOG, spm={"apps": {"spm12 r7771": {"version": "1", "exec": ""}}}))
+        deadline = time.monotonic() + 2
+        while not rebuilds and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(rebuilds) == 1
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_watch_keeps_running_when_a_rebuild_fails(tmp_path):
+    appsjson = tmp_path / "apps.json"
+    write_json(appsjson, CATALOG)
+    stop = threading.Event()
+    rebuilds = []
+
+    def rebuild():
+        rebuilds.append(time.monotonic())
+        if len(rebuilds) == 1:
+            raise InvalidAppMenuError("invalid appmenu")
+
+    watcher = PollWatcher(appsjson, interval=0.01)
+    thread = threading.Thread(target=watch_catalog, args=(appsjson, rebuild, watcher, stop, 0.05))
+    thread.start()
+    try:
+        time.sleep(0.1)
+        for count, name in enumerate(("spm", "ants"), start=1):
+            write_json(appsjson, dict(CATALOG, **{name: {"apps": {f"{name} 1.0": {"version": "1", "exec": ""}}}}))
+            deadline = time.monotonic() + 2
+            while len(rebuilds) < count and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(rebuilds) == count
+        assert thread.is_alive()
+    finally:
+        stop.set()
+        thread.join()
+
+
+class ChangeOnceWatcher:
+    """Replace apps.json by ``text`` on the first wait, then set ``stop``."""
+
+    def __init__(self, path, text, stop=None):
+        self.path = path
+        self.text = text
+        self.stop = stop
+        self.closed = False
+
+    def wait(self, timeout):
+        if self.text is None:
+            if self.stop is not None:
+                self.stop.set()
+            return False
+        self.path.write_text(self.text)
+        self.text = None
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("exit_exception", [SystemExit, KeyboardInterrupt])
+def test_exit_during_a_rebuild_ends_the_watch(tmp_path, exit_exception):
+    appsjson = tmp_path / "apps.json"
+    write_json(appsjson, CATALOG)
+    watcher = ChangeOnceWatcher(
+        appsjson, json.dumps(dict(CATALOG, spm={"apps": {"spm 1.0": {"version": "1", "exec": ""}}})))
+
+    def rebuild():
+        raise exit_exception()
+
+    with pytest.raises(exit_exception):
+        watch_catalog(appsjson, rebuild, watcher, threading.Event(), 0)
+    assert watcher.closed
+
+
+def test_reformatted_catalog_is_not_rebuilt(tmp_path):
+    appsjson = tmp_path / "apps.json"
+    write_json(appsjson, CATALOG)
+    stop = threading.Event()
+    rebuilds = []
+    reordered = dict(reversed(list(CATALOG.items())))
+    watcher = ChangeOnceWatcher(appsjson, json.dumps(reordered, indent=4), stop)
+
+    watch_catalog(appsjson, lambda: rebuilds.append(1), watcher, stop, 0)
+
+    assert rebuilds == []
@@ -0,0 +1,74 @@
+import importlib.util
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+from neurodesk.which import lookup
+
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = ROOT / "cvmfs" / "reconcile_module_files.py"
+
+spec = importlib.util.spec_from_file_location("reconcile_module_files", SCRIPT)
+reconcile_module_files = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = reconcile_module_files
+spec.loader.exec_module(reconcile_module_files)
+
+
+def publish_index(tmp_path, containers):
+    repo_root = tmp_path / "cvmfs"
+    log_path = tmp_path / "log.txt"
+    for image, commands in containers.items():
+        container = repo_root / "containers" / image
+        container.mkdir(parents=True)
+        (container / "commands.txt").write_text(commands)
+    log_path.write_text("".join(f"{image} categories:programming,\n" for image in containers))
+    changes = reconcile_module_files.plan_module_reconciliation(repo_root, log_path)
+    reconcile_module_files.apply_changes(changes)
+    return repo_root / "containers" / reconcile_module_files.COMMAND_INDEX
+
+
+def test_index_lists_the_containers_of_every_command(tmp_path):
+    index = publish_index(tmp_path, {
+        "fsl_6.0.7.16_20250101": "fsl\nfslmaths\nbet\n",
+        "fsl_6.0.7.18_20250601": "fslmaths\nbet\n",
+        "ants_2.5.0_20240101": "antsRegistration\nbad command\n",
+    })
+
+    lines = index.read_text().splitlines()
+    assert lines == sorted(lines)
+    assert "bet\tfsl/6.0.7.16/20250101 fsl/6.0.7.18/20250601" in lines
+    assert lookup(index, "fslmaths") == ["fsl/6.0.7.16/20250101", "fsl/6.0.7.18/20250601"]
+    assert lookup(index, "fsl") == ["fsl/6.0.7.16/20250101"]
+    assert lookup(index, "antsRegistration") == ["ants/2.5.0/20240101"]
+    assert lookup(index, "bad") == []
+    assert lookup(index, "fslm") == []
+    assert lookup(index, "zzz") == []
+
+
+def test_lookup_bisects_a_large_index(tmp_path):
+    index = tmp_path / "command-index.tsv"
+    commands = sorted(f"cmd{i}" for i in range(5000))
+    index.write_text("".join(f"{command}\ttool/{command}/20250101\n" for command in commands))
+
+    for command in (commands[0], commands[2500], commands[-1]):
+        assert lookup(index, command) == [f"tool/{command}/20250101"]
+    assert lookup(index, "cmd") == []
+    assert lookup(tmp_path / "command-index.tsv", "cmd99999") == []
+
+
+def test_neurodesk_which_prints_the_providing_containers(tmp_path):
+    index = publish_index(tmp_path, {"fsl_6.0.7.16_20250101": "fslmaths\n"})
+    env = dict(os.environ, NEURODESK_COMMAND_INDEX=str(index))
+
+    found = subprocess.run(
+        [sys.executable, "-m", "neurodesk", "which", "fslmaths"],
+        cwd=ROOT, env=env, capture_output=True, text=True)
+    missing = subprocess.run(
+        [sys.executable, "-m", "neurodesk", "which", "bet"],
+        cwd=ROOT, env=env, capture_output=True, text=True)
+
+    assert found.returncode == 0, found.stderr
+    assert found.stdout == "fsl/6.0.7.16/20250101\n"
+    assert missing.returncode == 1
@@ -1,4 +1,8 @@
-from neurodesk.write_log import is_primary_container_app
+import json
+import os
+
+from neurodesk import catalog
+from neurodesk.write_log import is_primary_container_app, write_log
 
 
 def test_hyphenated_named_variant_is_a_primary_container_app():
@@ -9,3 +13,41 @@ def test_hyphenated_named_variant_is_a_primary_container_app():
 
 def test_gui_sub_app_is_not_a_primary_container_app():
     assert not is_primary_container_app("fsl", "fsleyesGUI-fsl 6.0.7.22")
+
+
+def write_apps(tmp_path):
+    apps_json = tmp_path / "apps.json"
+    apps_json.write_text(json.dumps({
+        "fsl": {
+            "apps": {
+                "fsl 6.0.7.22": {"version": "20250901", "exec": ""},
+                "fsleyesGUI-fsl 6.0.7.22": {"version": "20250901", "exec": "fsleyes"},
+            },
+            "categories": ["functional imaging", "structural imaging"],
+        },
+        "afni": {
+            "apps": {"afni 24.3.00": {"version": "20241003", "exec": ""}},
+            "categories": ["functional imaging"],
+        },
+    }))
+    return apps_json
+
+
+def test_log_lists_primary_containers_sorted(tmp_path):
+    log = tmp_path / "log.txt"
+
+    assert write_log(log, catalog.load(write_apps(tmp_path)))
+    assert log.read_text() == (
+        "afni_24.3.00_20241003 categories:functional imaging,\n"
+        "fsl_6.0.7.22_20250901 categories:functional imaging,structural imaging,\n"
+    )
+
+
+def test_unchanged_log_is_not_rewritten(tmp_path):
+    log = tmp_path / "log.txt"
+    apps = catalog.load(write_apps(tmp_path))
+    write_log(log, apps)
+    os.utime(log, (0, 0))
+
+    assert not write_log(log, apps)
+    assert log.stat().st_mtime == 0